@@ -1,60 +1,342 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+import json
 import logging
 
 from services.forecasting_service import ForecastingService
-from models.forecast_models import ForecastRequest, ForecastResponse, TrendAnalysis
+from services.forecast_encoding import (
+    JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE, negotiate_media_type, arrow_available,
+    encode_arrow, encode_float32
+)
+from models.forecast_models import (
+    ForecastRequest, ForecastResponse, TrendAnalysis, ForecastJob, ForecastJobResults, ForecastModel,
+    BatchForecastRequest, DemandQuantileRequest, HierarchicalForecastRequest, SaleEventBatch, ScenarioRequest
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize forecasting service
+# Initialize forecasting service (worker count comes from FORECAST_WORKERS)
 forecasting_service = ForecastingService()
 
+def _negotiate(accept: Optional[str]) -> str:
+    """Resolve the Accept header to a forecast response format"""
+    media_type = negotiate_media_type(accept)
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Supported formats: JSON, Arrow IPC stream, packed float32")
+    if media_type == ARROW_MEDIA_TYPE and not arrow_available():
+        raise HTTPException(status_code=406, detail="Arrow responses require pyarrow on the server")
+    return media_type
+
+def _binary_response(
+    media_type: str,
+    product_ids: List[str],
+    arrays: Dict[str, Any],
+    metadata: Dict[str, Any]
+) -> Response:
+    """Encode forecast arrays straight from NumPy, skipping float-to-text conversion"""
+    encode = encode_arrow if media_type == ARROW_MEDIA_TYPE else encode_float32
+    return Response(content=encode(product_ids, arrays, metadata), media_type=media_type)
+
+@router.on_event("startup")
+async def start_forecast_materialization():
+    """Keep the precomputed forecast store populated"""
+    forecasting_service.start_materialization_schedule()
+
+@router.on_event("shutdown")
+async def shutdown_forecasting_service():
+    """Stop forecasting worker processes with the application"""
+    forecasting_service.shutdown()
+
 @router.post("/generate", response_model=ForecastResponse)
-async def generate_forecast(
-    request: ForecastRequest,
-    background_tasks: BackgroundTasks
-):
+async def generate_forecast(request: ForecastRequest):
     """
     Generate demand forecast for specified products and time period
     """
     try:
         logger.info(f"Generating forecast for {len(request.product_ids)} products")
         
-        # Add to background tasks for processing
-        background_tasks.add_task(
-            forecasting_service.generate_forecast_async,
+        # Queued by priority class, so dashboard requests are not stuck behind large batches
+        job = forecasting_service.submit_forecast_job(
             request.product_ids,
             request.forecast_period,
-            request.include_external_signals
+            request.model,
+            request.include_external_signals,
+            request.priority,
+            request.tenant_id or request.store_id,
+            request.deadline_seconds,
+            request.confidence_level
         )
         
+        estimated_seconds = forecasting_service.estimate_job_duration(len(request.product_ids))
         return ForecastResponse(
-            message="Forecast generation started",
-            forecast_id=f"fc_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            status="processing",
-            estimated_completion=datetime.now() + timedelta(minutes=5)
+            message=f"Forecast generation queued as {job.priority.value}",
+            forecast_id=job.forecast_id,
+            status=job.status.value,
+            estimated_completion=datetime.now() + timedelta(seconds=estimated_seconds)
         )
     except Exception as e:
         logger.error(f"Error generating forecast: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch", response_model=Dict[str, Any])
+async def get_batch_forecasts(request: BatchForecastRequest, accept: Optional[str] = Header(None)):
+    """
+    Get forecasts for many products in one call, as JSON or a binary format chosen via Accept
+    """
+    media_type = _negotiate(accept)
+    try:
+        batch = await forecasting_service.get_batch_forecasts(
+            request.product_ids, request.days, request.model.value,
+            request.latency_budget_ms / 1000 if request.latency_budget_ms else None,
+            request.confidence_level
+        )
+        if media_type != JSON_MEDIA_TYPE:
+            return _binary_response(media_type, batch["product_ids"], batch, {
+                "forecast_period": request.days,
+                "confidence_level": batch["confidence_level"],
+                "model": batch["model"],
+                "model_version": batch["model_version"],
+                "fallback_model": batch["fallback_model"],
+                "fallback_model_version": batch["fallback_model_version"],
+                "sources": batch["sources"],
+                "failed": batch["failed"],
+                "last_updated": datetime.now().isoformat()
+            })
+        return {
+            "forecast_period": request.days,
+            "confidence_level": batch["confidence_level"],
+            "model": batch["model"],
+            "model_version": batch["model_version"],
+            "fallback_model": batch["fallback_model"],
+            "fallback_model_version": batch["fallback_model_version"],
+            "forecasts": [
+                {
+                    "product_id": product_id,
+                    "predictions": batch["yhat"][i].tolist(),
+                    "confidence_intervals": {
+                        "lower": batch["yhat_lower"][i].tolist(),
+                        "upper": batch["yhat_upper"][i].tolist()
+                    },
+                    "source": batch["sources"][i]
+                }
+                for i, product_id in enumerate(batch["product_ids"])
+            ],
+            "failed": batch["failed"],
+            "last_updated": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error fetching batch forecasts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/hierarchical", response_model=Dict[str, Any])
+async def generate_hierarchical_forecast(request: HierarchicalForecastRequest):
+    """
+    Forecast across region, store and category levels with coherent reconciliation
+    """
+    try:
+        result = await forecasting_service.generate_hierarchical_forecast(
+            product_ids=request.product_ids,
+            store_id=request.store_id,
+            category=request.category,
+            forecast_period=request.forecast_period.value,
+            model=request.model.value,
+            method=request.method.value,
+            level=request.level.value
+        )
+        return {
+            **{key: value for key, value in result.items() if key != "levels"},
+            "levels": {
+                level: [
+                    {
+                        "key": key,
+                        "forecast": float(nodes["yhat"][i].mean()),
+                        "predictions": nodes["yhat"][i].tolist(),
+                        "confidence_intervals": {
+                            "lower": nodes["yhat_lower"][i].tolist(),
+                            "upper": nodes["yhat_upper"][i].tolist()
+                        }
+                    }
+                    for i, key in enumerate(nodes["keys"])
+                ]
+                for level, nodes in result["levels"].items()
+            },
+            "generated_at": datetime.now().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error generating hierarchical forecast: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/scenarios", response_model=Dict[str, Any])
+async def run_forecast_scenarios(request: ScenarioRequest):
+    """
+    Recompute final forecasts and confidence intervals under what-if signal adjustments
+    """
+    try:
+        result = await forecasting_service.run_scenarios(
+            [scenario.model_dump() for scenario in request.scenarios],
+            product_ids=request.product_ids,
+            forecast_period=request.forecast_period.value,
+            model=request.model.value,
+            confidence_level=request.confidence_level
+        )
+        arrays = ('final_forecast', 'lower_bound', 'upper_bound', 'social', 'weather', 'events')
+        return {
+            **result,
+            "base_forecast": result["base_forecast"].tolist(),
+            "baseline": {
+                name: value.tolist() if name in arrays else value
+                for name, value in result["baseline"].items()
+            },
+            "scenarios": [
+                {name: value.tolist() if name in arrays else value for name, value in scenario.items()}
+                for scenario in result["scenarios"]
+            ],
+            "base_generated_at": result["base_generated_at"].isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running forecast scenarios: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/quantiles", response_model=Dict[str, Any])
+async def get_demand_quantiles(request: DemandQuantileRequest):
+    """
+    Lead-time demand quantiles and safety stock per product at several service levels
+    """
+    try:
+        result = await forecasting_service.get_demand_quantiles(
+            request.product_ids, request.days, request.service_levels, request.model.value
+        )
+        return {
+            "lead_time_days": request.days,
+            "service_levels": result["service_levels"],
+            "products": [
+                {
+                    "product_id": product_id,
+                    "mean_demand": float(result["mean_demand"][i]),
+                    "std_demand": float(result["std_demand"][i]),
+                    "quantiles": result["quantiles"][:, i].tolist(),
+                    "safety_stock": result["safety_stock"][:, i].tolist(),
+                    "source": result["sources"][i]
+                }
+                for i, product_id in enumerate(result["product_ids"])
+            ],
+            "failed": result["failed"],
+            "last_updated": datetime.now().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error computing demand quantiles: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/sales/events")
+async def record_sales_events(batch: SaleEventBatch):
+    """
+    Record live sales and report any demand spikes they reveal
+    """
+    try:
+        result = await forecasting_service.record_sales(batch.events)
+        return {
+            **result,
+            "spike_count": len(result["spikes"]),
+            "last_updated": datetime.now().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error recording sales events: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{forecast_id}", response_model=ForecastJobResults)
+async def get_forecast_job(forecast_id: str, offset: int = 0, limit: int = 100):
+    """
+    Get forecast job status and a page of its results
+    """
+    job = forecasting_service.jobs.get_results(forecast_id, offset=max(offset, 0), limit=min(max(limit, 1), 1000))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Forecast job {forecast_id} not found")
+    return job
+
+@router.post("/jobs/{forecast_id}/cancel", response_model=ForecastJob)
+async def cancel_forecast_job(forecast_id: str):
+    """
+    Cancel a queued or running forecast job; results produced so far are kept
+    """
+    job = forecasting_service.jobs.get(forecast_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Forecast job {forecast_id} not found")
+    if not forecasting_service.cancel_forecast_job(forecast_id):
+        raise HTTPException(status_code=409, detail=f"Forecast job {forecast_id} already {job.status.value}")
+    return forecasting_service.jobs.get(forecast_id)
+
+@router.get("/jobs/{forecast_id}/stream")
+async def stream_forecast_job(forecast_id: str):
+    """
+    Stream forecast job progress and results as newline-delimited JSON
+    """
+    if forecasting_service.jobs.get(forecast_id) is None:
+        raise HTTPException(status_code=404, detail=f"Forecast job {forecast_id} not found")
+    
+    async def events():
+        async for event in forecasting_service.jobs.stream(forecast_id):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @router.get("/{product_id}", response_model=Dict[str, Any])
-async def get_product_forecast(product_id: str, days: int = 30):
+async def get_product_forecast(
+    product_id: str,
+    days: int = 30,
+    latency_budget_ms: Optional[int] = Query(None, ge=1),
+    confidence_level: Optional[float] = Query(None, gt=0, lt=1),
+    accept: Optional[str] = Header(None)
+):
     """
-    Get forecast for a specific product
+    Get forecast for a specific product, as JSON or a binary format chosen via Accept.
+    If the model misses latency_budget_ms, a fast fallback model answers with source "fallback".
     """
+    media_type = _negotiate(accept)
     try:
-        forecast_data = await forecasting_service.get_product_forecast(product_id, days)
+        forecast_data = await forecasting_service.get_product_forecast(
+            product_id, days, latency_budget_ms / 1000 if latency_budget_ms else None, confidence_level
+        )
+        if media_type != JSON_MEDIA_TYPE:
+            intervals = forecast_data["confidence_intervals"]
+            return _binary_response(media_type, [product_id], {
+                "yhat": forecast_data["predictions"][None, :],
+                "yhat_lower": intervals["lower"][None, :],
+                "yhat_upper": intervals["upper"][None, :]
+            }, {
+                "forecast_period": days,
+                "confidence_level": forecast_data["confidence_level"],
+                "period_forecasts": forecast_data["period_forecasts"],
+                "model": forecast_data["model"],
+                "model_version": forecast_data["model_version"],
+                "source": forecast_data["source"],
+                "last_updated": forecast_data["generated_at"].isoformat()
+            })
         return {
             "product_id": product_id,
             "forecast_period": days,
-            "predictions": forecast_data["predictions"],
-            "confidence_intervals": forecast_data["confidence_intervals"],
-            "last_updated": datetime.now().isoformat()
+            "predictions": forecast_data["predictions"].tolist(),
+            "confidence_intervals": {
+                "lower": forecast_data["confidence_intervals"]["lower"].tolist(),
+                "upper": forecast_data["confidence_intervals"]["upper"].tolist()
+            },
+            "confidence_level": forecast_data["confidence_level"],
+            "period_forecasts": forecast_data["period_forecasts"],
+            "model": forecast_data["model"],
+            "model_version": forecast_data["model_version"],
+            "source": forecast_data["source"],
+            "last_updated": forecast_data["generated_at"].isoformat()
         }
     except Exception as e:
         logger.error(f"Error fetching forecast for product {product_id}: {e}")
@@ -76,6 +358,8 @@ async def get_trend_analysis(
             time_period=time_period
         )
         return trends
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -117,34 +401,86 @@ async def get_weather_signals(location: str, product_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/accuracy/metrics")
-async def get_forecast_accuracy():
+async def get_forecast_accuracy(model: ForecastModel = ForecastModel.PROPHET):
     """
     Get forecast accuracy metrics
     """
     try:
-        metrics = await forecasting_service.get_accuracy_metrics()
+        metrics = await forecasting_service.get_accuracy_metrics(model.value)
         return {
+            "model": model.value,
+            "model_version": metrics["model_version"],
             "mape": metrics["mape"],
             "rmse": metrics["rmse"],
             "mae": metrics["mae"],
             "overall_accuracy": metrics["overall_accuracy"],
-            "last_evaluation": datetime.now().isoformat()
+            "last_evaluation": metrics["last_evaluation"].isoformat()
         }
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching accuracy metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/accuracy/backtest")
+async def run_backtest(background_tasks: BackgroundTasks):
+    """
+    Trigger rolling-origin backtesting of all forecasting models
+    """
+    try:
+        background_tasks.add_task(forecasting_service.run_backtests)
+        return {
+            "message": "Backtesting started",
+            "status": "processing"
+        }
+    except Exception as e:
+        logger.error(f"Error starting backtest: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/models/cache")
+async def get_model_cache_stats():
+    """
+    Get fitted-model cache statistics
+    """
+    return forecasting_service.get_cache_stats()
+
+@router.get("/models/generation")
+async def get_model_generation():
+    """
+    Get the model generation serving forecasts and the status of the latest retraining
+    """
+    return forecasting_service.get_model_generation()
+
+@router.post("/materialize")
+async def materialize_forecasts(background_tasks: BackgroundTasks, model: Optional[ForecastModel] = None):
+    """
+    Trigger precomputation of forecasts for all active products
+    """
+    try:
+        background_tasks.add_task(
+            forecasting_service.materialize_forecasts,
+            model.value if model else None
+        )
+        return {
+            "message": "Forecast materialization started",
+            "status": "processing"
+        }
+    except Exception as e:
+        logger.error(f"Error starting forecast materialization: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/models/retrain")
-async def retrain_models(background_tasks: BackgroundTasks):
+async def retrain_models():
     """
-    Trigger model retraining
+    Trigger model retraining; the new generation replaces the serving one only if it backtests as well
     """
     try:
-        background_tasks.add_task(forecasting_service.retrain_models)
+        retraining = forecasting_service.start_retraining()
         return {
-            "message": "Model retraining started",
+            "message": f"Model retraining for generation {retraining['generation']} in progress",
             "status": "processing",
-            "estimated_completion": datetime.now() + timedelta(hours=2)
+            "retraining": retraining,
+            "estimated_completion": retraining['started_at'] + timedelta(hours=2)
         }
     except Exception as e:
         logger.error(f"Error starting model retraining: {e}")
@@ -1,3 +1,9 @@
+import time
+import sys
+
+# Measured before any other import so the startup report covers them all
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -12,6 +18,7 @@ from api.suppliers import router as suppliers_router
 from services.forecasting_service import ForecastingService
 from services.inventory_service import InventoryService
 from services.notification_service import NotificationService
+from services.engine_registry import engines
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +48,29 @@ app.include_router(inventory_router, prefix="/api/inventory", tags=["Inventory"]
 app.include_router(customers_router, prefix="/api/customers", tags=["Customers"])
 app.include_router(suppliers_router, prefix="/api/suppliers", tags=["Suppliers"])
 
+import_seconds = time.perf_counter() - _import_started
+ready_seconds = None
+
+@app.on_event("startup")
+async def report_startup_time():
+    """Log how long the worker took to become ready"""
+    global ready_seconds
+    ready_seconds = time.perf_counter() - _import_started
+    logger.info(f"Backend ready in {ready_seconds:.2f}s (imports {import_seconds:.2f}s)")
+
+@app.get("/health/startup")
+async def startup_report():
+    """Startup timing and which forecasting engines have been loaded"""
+    return {
+        "import_seconds": import_seconds,
+        "ready_seconds": ready_seconds,
+        "engines": engines.report(),
+        "heavy_modules_loaded": [
+            name for name in ("prophet", "xgboost", "sklearn", "tensorflow")
+            if name in sys.modules
+        ]
+    }
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
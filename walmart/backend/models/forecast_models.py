@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime, date
 from enum import Enum
 
@@ -9,6 +9,27 @@ class ForecastPeriod(str, Enum):
     QUARTER = "quarter"
     YEAR = "year"
 
+class ForecastModel(str, Enum):
+    PROPHET = "prophet"
+    ETS = "ets"
+    SEASONAL_NAIVE = "seasonal_naive"
+    XGBOOST = "xgboost"
+
+class ReconciliationMethod(str, Enum):
+    TOP_DOWN = "top_down"
+    MIDDLE_OUT = "middle_out"
+
+class HierarchyLevel(str, Enum):
+    REGION = "region"
+    CATEGORY = "category"
+    STORE = "store"
+    STORE_CATEGORY = "store_category"
+
+class JobPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    REPLENISHMENT = "replenishment"
+    BATCH = "batch"
+
 class SignalType(str, Enum):
     POS = "pos"
     SOCIAL = "social"
@@ -22,6 +43,63 @@ class ForecastRequest(BaseModel):
     confidence_level: float = Field(default=0.95, ge=0.8, le=0.99, description="Confidence level")
     store_id: Optional[str] = Field(None, description="Specific store ID")
     category: Optional[str] = Field(None, description="Product category")
+    model: ForecastModel = Field(default=ForecastModel.PROPHET, description="Forecasting model")
+    priority: Optional[JobPriority] = Field(None, description="Scheduling class (default: interactive for small requests, batch for large ones)")
+    tenant_id: Optional[str] = Field(None, description="Tenant sharing scheduler capacity fairly with others (default: store_id)")
+    deadline_seconds: Optional[float] = Field(None, gt=0, description="Seconds after which an unfinished job expires")
+
+class BatchForecastRequest(BaseModel):
+    product_ids: List[str] = Field(..., min_length=1, max_length=5000, description="Product IDs to fetch forecasts for")
+    days: int = Field(default=30, ge=1, le=365, description="Number of days to forecast")
+    model: ForecastModel = Field(default=ForecastModel.PROPHET, description="Model for products without a materialized forecast")
+    latency_budget_ms: Optional[int] = Field(None, ge=1, description="Milliseconds to wait for the model before serving the fast fallback model")
+    confidence_level: float = Field(default=0.95, gt=0, lt=1, description="Coverage of the returned confidence intervals")
+
+class DemandQuantileRequest(BaseModel):
+    product_ids: List[str] = Field(..., min_length=1, max_length=5000, description="Product IDs to compute demand quantiles for")
+    days: int = Field(default=7, ge=1, le=365, description="Replenishment lead time in days")
+    service_levels: List[float] = Field(default=[0.8, 0.9, 0.95, 0.99], min_length=1, max_length=20, description="Service levels to compute quantiles and safety stock for")
+    model: ForecastModel = Field(default=ForecastModel.ETS, description="Model for products without a materialized forecast")
+
+class HierarchicalForecastRequest(BaseModel):
+    product_ids: Optional[List[str]] = Field(None, description="Products to include (default: all active products)")
+    store_id: Optional[str] = Field(None, description="Restrict the hierarchy to one store")
+    category: Optional[str] = Field(None, description="Restrict the hierarchy to one product category")
+    forecast_period: ForecastPeriod = Field(default=ForecastPeriod.MONTH, description="Forecast period")
+    model: ForecastModel = Field(default=ForecastModel.ETS, description="Model fitted at the reconciliation level")
+    method: ReconciliationMethod = Field(default=ReconciliationMethod.MIDDLE_OUT, description="Reconciliation method")
+    level: HierarchyLevel = Field(default=HierarchyLevel.STORE, description="Level fitted for middle-out reconciliation")
+
+class SaleEvent(BaseModel):
+    store_id: str = Field(..., description="Store where the sale happened")
+    product_id: str = Field(..., description="Product sold")
+    quantity: float = Field(..., gt=0, description="Units sold")
+    timestamp: Optional[datetime] = Field(None, description="Time of sale (default: now)")
+
+    @field_validator('timestamp')
+    @classmethod
+    def to_local_time(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Sales days are local calendar days, so offsets are converted to local naive time"""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone().replace(tzinfo=None)
+        return value
+
+class ScenarioAdjustment(BaseModel):
+    name: str = Field(..., description="Scenario label")
+    social: Optional[Union[float, List[float]]] = Field(None, description="Social adjustment: one value, or one per product (default: current signal)")
+    weather: Optional[Union[float, List[float]]] = Field(None, description="Weather adjustment: one value, or one per product (default: current signal)")
+    events: Optional[Union[float, List[float]]] = Field(None, description="Event adjustment: one value, or one per product (default: current signal)")
+    relative: bool = Field(default=False, description="Add the values to current signals instead of replacing them")
+
+class ScenarioRequest(BaseModel):
+    product_ids: Optional[List[str]] = Field(None, max_length=5000, description="Products to evaluate (default: all active products)")
+    forecast_period: ForecastPeriod = Field(default=ForecastPeriod.MONTH, description="Forecast period")
+    model: ForecastModel = Field(default=ForecastModel.ETS, description="Model behind the base forecasts")
+    scenarios: List[ScenarioAdjustment] = Field(..., min_length=1, max_length=50, description="What-if signal scenarios")
+    confidence_level: float = Field(default=0.95, gt=0, lt=1, description="Coverage of the scenario confidence intervals")
+
+class SaleEventBatch(BaseModel):
+    events: List[SaleEvent] = Field(..., min_length=1, max_length=10000, description="Sales to record")
 
 class ForecastResponse(BaseModel):
     message: str
@@ -79,6 +157,7 @@ class EventSignal(BaseModel):
 
 class ModelAccuracy(BaseModel):
     model_name: str
+    model_version: Optional[str] = None
     mape: float = Field(..., ge=0.0)
     rmse: float = Field(..., ge=0.0)
     mae: float = Field(..., ge=0.0)
@@ -104,4 +183,35 @@ class MultiSignalForecast(BaseModel):
     final_forecast: float
     signal_weights: Dict[SignalType, float]
     confidence_interval: Dict[str, float]
-    generated_at: datetime 
\ No newline at end of file
+    generated_at: datetime
+    processing_time: Optional[float] = None
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+
+class ForecastJob(BaseModel):
+    forecast_id: str
+    status: JobStatus
+    model: ForecastModel
+    forecast_period: ForecastPeriod
+    product_ids: List[str]
+    priority: JobPriority = JobPriority.INTERACTIVE
+    tenant_id: str = "default"
+    deadline: Optional[datetime] = None
+    total_products: int
+    completed_products: int = 0
+    failed_products: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+class ForecastJobResults(ForecastJob):
+    offset: int
+    limit: int
+    results: List[MultiSignalForecast]
\ No newline at end of file
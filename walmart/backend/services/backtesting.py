@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from services.engine_registry import BATCH_MODELS, GLOBAL_MODELS, engines
+from services.forecast_engine import ForecastEngine
+
+logger = logging.getLogger(__name__)
+
+def rolling_origins(n_days: int, n_folds: int, horizon: int, step: int) -> List[int]:
+    """Day indices where each fold's training window ends, oldest first"""
+    origins = [n_days - horizon - step * k for k in reversed(range(n_folds))]
+    if origins[0] <= 2 * horizon:
+        raise ValueError(f"Not enough history ({n_days} days) for {n_folds} folds of {horizon} days")
+    return origins
+
+def compute_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    """MAPE (%), RMSE and MAE over every fold, SKU and day at once"""
+    errors = predicted - actual
+    nonzero = actual != 0
+    percentage_errors = np.abs(errors[nonzero] / actual[nonzero])
+    mape = float(percentage_errors.mean() * 100) if percentage_errors.size else 0.0
+
+    return {
+        'mape': mape,
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'overall_accuracy': float(np.clip(1 - mape / 100, 0, 1))
+    }
+
+class BacktestEngine:
+    """Rolling-origin cross-validation of forecasting models across many SKUs"""
+
+    def __init__(self, engine: ForecastEngine, n_folds: int = 4, horizon: int = 30, step: int = 30):
+        self.engine = engine
+        self.n_folds = n_folds
+        self.horizon = horizon
+        self.step = step
+
+    async def backtest(self, model: str, history: np.ndarray, start_date: Any) -> Dict[str, Any]:
+        """Backtest a model on a (SKU x day) history and return error metrics"""
+        history = np.asarray(history, dtype=np.float64)
+        n_skus, n_days = history.shape
+        origins = rolling_origins(n_days, self.n_folds, self.horizon, self.step)
+
+        if model in BATCH_MODELS:
+            forecast_batch = engines.get(model).forecast_batch
+            predicted = await asyncio.gather(*(
+                asyncio.to_thread(forecast_batch, history[:, :origin], self.horizon, model)
+                for origin in origins
+            ))
+            predicted = np.stack([fold['yhat'] for fold in predicted])
+        elif model in GLOBAL_MODELS:
+            predicted = np.stack([
+                await asyncio.to_thread(self._backtest_global, history[:, :origin], start_date)
+                for origin in origins
+            ])
+        elif model == 'prophet':
+            # Each SKU's folds run as one task, spread across the process pool
+            backtest_prophet = engines.get('prophet').backtest_prophet
+            dates = pd.date_range(start=start_date, periods=n_days, freq='D')
+            per_sku = await asyncio.gather(*(
+                self.engine.run(
+                    backtest_prophet, pd.DataFrame({'ds': dates, 'y': series}), origins, self.horizon
+                )
+                for series in history
+            ))
+            predicted = np.stack(per_sku, axis=1)
+        else:
+            raise ValueError(f"Cannot backtest unknown model: {model}")
+
+        # (fold x SKU x day) actuals aligned with the predictions
+        actual = np.stack([history[:, origin:origin + self.horizon] for origin in origins])
+        metrics = compute_metrics(actual, predicted)
+        logger.info(f"Backtested {model} on {n_skus} SKUs x {len(origins)} folds: MAPE {metrics['mape']:.2f}%")
+
+        return {
+            **metrics,
+            'training_data_size': int(n_skus * origins[-1]),
+            'test_data_size': int(actual.size)
+        }
+
+    def _backtest_global(self, train: np.ndarray, start_date: Any) -> np.ndarray:
+        global_model = engines.get('xgboost').GlobalXGBoostForecaster().fit(train, start_date)
+        return global_model.forecast(train, start_date, self.horizon)['yhat']
@@ -0,0 +1,221 @@
+import logging
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from services.forecast_engine import DEFAULT_CONFIDENCE, DRIFT_LIMIT, ewma_drift, interval_bounds
+
+logger = logging.getLogger(__name__)
+
+# Days of recent history a drifted Holt-Winters state is refit on
+DRIFT_REFIT_DAYS = 16 * 7
+
+def seasonal_naive_drift(
+    history: np.ndarray,
+    horizon: int,
+    season_length: int = 7
+) -> Dict[str, np.ndarray]:
+    """Seasonal-naive-with-drift forecast for every row of a (SKU x day) matrix at once"""
+    history = np.asarray(history, dtype=np.float64)
+    n_days = history.shape[1]
+    if n_days <= season_length:
+        raise ValueError(f"Need more than {season_length} days of history, got {n_days}")
+
+    steps = np.arange(1, horizon + 1)
+    drift = (history[:, -1] - history[:, 0]) / (n_days - 1)
+
+    # Repeat the last observed season and add the average daily drift
+    last_season = history[:, -season_length:]
+    season_index = (steps - 1) % season_length
+    yhat = last_season[:, season_index] + drift[:, None] * steps
+
+    # One-season-ahead naive errors give the scale of the forecast error
+    residuals = history[:, season_length:] - history[:, :-season_length]
+    sigma = residuals.std(axis=1)
+    sigma_h = sigma[:, None] * np.sqrt((steps - 1) // season_length + 1)
+
+    return {'yhat': yhat, 'sigma': sigma_h}
+
+class HoltWintersState:
+    """Additive Holt-Winters smoothing state for many SKUs, advanced as new days arrive"""
+
+    def __init__(
+        self,
+        level: np.ndarray,
+        trend: np.ndarray,
+        seasonal: np.ndarray,
+        sq_error: np.ndarray,
+        n_errors: np.ndarray,
+        n_days: int,
+        drift: np.ndarray,
+        season_length: int = 7,
+        alpha: float = 0.2,
+        beta: float = 0.01,
+        gamma: float = 0.1
+    ):
+        self.level = level
+        self.trend = trend
+        # Day-major (season slot x SKU) so each time step's SKU vector is contiguous
+        self.seasonal = seasonal
+        self.sq_error = sq_error
+        self.n_errors = n_errors
+        self.n_days = n_days
+        self.drift = drift
+        self.season_length = season_length
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+
+    @classmethod
+    def initialize(
+        cls,
+        history: np.ndarray,
+        start_day: int = 0,
+        season_length: int = 7,
+        **params: float
+    ) -> "HoltWintersState":
+        """Fit the state on a (SKU x day) history whose first column is day start_day"""
+        history = np.asarray(history, dtype=np.float64)
+        n_skus, n_days = history.shape
+        if n_days < 2 * season_length:
+            raise ValueError(f"Need at least {2 * season_length} days of history, got {n_days}")
+
+        # Initialise state from the first two seasons
+        first = history[:, :season_length]
+        second = history[:, season_length:2 * season_length]
+        level = first.mean(axis=1)
+        trend = (second.mean(axis=1) - level) / season_length
+        seasonal = np.roll(first - level[:, None], start_day % season_length, axis=1)
+
+        state = cls(
+            level, trend, np.ascontiguousarray(seasonal.T), np.zeros(n_skus), np.zeros(n_skus),
+            start_day + season_length, np.zeros(n_skus), season_length, **params
+        )
+        state._smooth(history[:, season_length:])
+        # Drift is monitored from the end of the fit onwards
+        state.drift = np.zeros(n_skus)
+        return state
+
+    def update(self, new_values: np.ndarray) -> "HoltWintersState":
+        """Advance every SKU over its next (SKU x day) observations, tracking forecast drift"""
+        new_values = np.asarray(new_values, dtype=np.float64)
+        if new_values.shape[1] == 0:
+            return self
+
+        # One-step errors standardized by the fit's error scale before these days
+        sigma = np.maximum(np.sqrt(self.sq_error / np.maximum(self.n_errors, 1)), 1e-9)
+        errors = self._smooth(new_values)
+        self.drift = ewma_drift(self.drift, errors / sigma[:, None])
+        return self
+
+    def _smooth(self, values: np.ndarray) -> np.ndarray:
+        """Run the smoothing recursions over new days and return their one-step errors"""
+        by_day = np.ascontiguousarray(values.T)
+        errors = np.empty_like(by_day)
+        level, trend, seasonal = self.level, self.trend, self.seasonal.copy()
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+
+        for i, y in enumerate(by_day):
+            s = (self.n_days + i) % self.season_length
+            error = y - (level + trend + seasonal[s])
+            errors[i] = error
+
+            previous_level = level
+            level = alpha * (y - seasonal[s]) + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous_level) + (1 - beta) * trend
+            seasonal[s] = gamma * (y - level) + (1 - gamma) * seasonal[s]
+
+        self.level, self.trend, self.seasonal = level, trend, seasonal
+        self.sq_error = self.sq_error + (errors ** 2).sum(axis=0)
+        self.n_errors = self.n_errors + len(by_day)
+        self.n_days += len(by_day)
+        return errors.T
+
+    @property
+    def drifted(self) -> np.ndarray:
+        """SKUs whose recent errors are biased enough to warrant a refit"""
+        return np.abs(self.drift) > DRIFT_LIMIT
+
+    def forecast(self, horizon: int) -> Dict[str, np.ndarray]:
+        """Point forecasts and their standard deviations for the next horizon days"""
+        steps = np.arange(1, horizon + 1)
+        season_index = (self.n_days + steps - 1) % self.season_length
+        yhat = self.level[:, None] + self.trend[:, None] * steps + self.seasonal[season_index].T
+
+        # Approximate h-step variance of the additive model
+        sigma = np.sqrt(self.sq_error / self.n_errors)
+        variance_growth = 1 + (steps - 1) * self.alpha ** 2 * (1 + steps * self.beta)
+        sigma_h = sigma[:, None] * np.sqrt(variance_growth)
+
+        return {'yhat': yhat, 'sigma': sigma_h}
+
+    def split(self) -> List["HoltWintersState"]:
+        """One single-SKU state per row, so SKUs can be stored and regrouped independently"""
+        return [
+            HoltWintersState(
+                self.level[i:i + 1], self.trend[i:i + 1], self.seasonal[:, i:i + 1].copy(),
+                self.sq_error[i:i + 1], self.n_errors[i:i + 1], self.n_days, self.drift[i:i + 1],
+                self.season_length, self.alpha, self.beta, self.gamma
+            )
+            for i in range(len(self.level))
+        ]
+
+    @classmethod
+    def concatenate(cls, states: Sequence["HoltWintersState"]) -> "HoltWintersState":
+        """Stack states that have seen the same days into one multi-SKU state"""
+        first = states[0]
+        if any(state.n_days != first.n_days for state in states):
+            raise ValueError("Can only stack states that have seen the same days")
+        return cls(
+            np.concatenate([state.level for state in states]),
+            np.concatenate([state.trend for state in states]),
+            np.concatenate([state.seasonal for state in states], axis=1),
+            np.concatenate([state.sq_error for state in states]),
+            np.concatenate([state.n_errors for state in states]),
+            first.n_days,
+            np.concatenate([state.drift for state in states]),
+            first.season_length, first.alpha, first.beta, first.gamma
+        )
+
+def holt_winters(
+    history: np.ndarray,
+    horizon: int,
+    season_length: int = 7,
+    alpha: float = 0.2,
+    beta: float = 0.01,
+    gamma: float = 0.1
+) -> Dict[str, np.ndarray]:
+    """Additive Holt-Winters exponential smoothing over a (SKU x day) matrix in one pass"""
+    state = HoltWintersState.initialize(
+        history, season_length=season_length, alpha=alpha, beta=beta, gamma=gamma
+    )
+    return state.forecast(horizon)
+
+def forecast_batch(
+    history: np.ndarray,
+    horizon: int,
+    model: str = 'ets',
+    season_length: int = 7
+) -> Dict[str, np.ndarray]:
+    """Forecast all SKUs with a vectorized model and attach default intervals"""
+    if model == 'ets':
+        result = holt_winters(history, horizon, season_length=season_length)
+    elif model == 'seasonal_naive':
+        result = seasonal_naive_drift(history, horizon, season_length=season_length)
+    else:
+        raise ValueError(f"Unknown batch forecasting model: {model}")
+    return with_intervals(result)
+
+def with_intervals(
+    result: Dict[str, np.ndarray],
+    confidence_level: float = DEFAULT_CONFIDENCE
+) -> Dict[str, np.ndarray]:
+    """Clip point forecasts at zero and attach intervals from their standard deviations"""
+    yhat = np.maximum(result['yhat'], 0)
+    yhat_lower, yhat_upper = interval_bounds(yhat, result['sigma'], confidence_level)
+    return {
+        'yhat': yhat,
+        'yhat_lower': yhat_lower,
+        'yhat_upper': yhat_upper,
+        'sigma': result['sigma']
+    }
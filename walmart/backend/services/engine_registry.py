@@ -0,0 +1,58 @@
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+BATCH_MODELS = ('ets', 'seasonal_naive')
+GLOBAL_MODELS = ('xgboost',)
+
+class EngineRegistry:
+    """Imports forecasting engine modules, and their heavy ML dependencies, on first use"""
+
+    def __init__(self, engines: Dict[str, str]):
+        self.engines = engines
+        self._modules: Dict[str, ModuleType] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ModuleType:
+        """Return the module implementing an engine, importing it if needed"""
+        module = self._modules.get(name)
+        if module is not None:
+            return module
+
+        if name not in self.engines:
+            raise ValueError(f"Unknown forecasting engine: {name}")
+
+        with self._lock:
+            if name not in self._modules:
+                started = time.perf_counter()
+                self._modules[name] = importlib.import_module(self.engines[name])
+                self._load_seconds[name] = time.perf_counter() - started
+                logger.info(f"Loaded {name} forecasting engine in {self._load_seconds[name]:.2f}s")
+        return self._modules[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._modules
+
+    def report(self) -> Dict[str, Any]:
+        """Which engines are loaded and how long each took to import"""
+        return {
+            name: {
+                'module': module_name,
+                'loaded': name in self._modules,
+                'load_seconds': self._load_seconds.get(name)
+            }
+            for name, module_name in self.engines.items()
+        }
+
+engines = EngineRegistry({
+    'prophet': 'services.prophet_engine',
+    'ets': 'services.batch_forecaster',
+    'seasonal_naive': 'services.batch_forecaster',
+    'xgboost': 'services.global_forecaster'
+})
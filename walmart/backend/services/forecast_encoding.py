@@ -0,0 +1,83 @@
+import json
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+JSON_MEDIA_TYPE = 'application/json'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+FLOAT32_MEDIA_TYPE = 'application/x-forecast-float32'
+SUPPORTED_MEDIA_TYPES = (JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE, FLOAT32_MEDIA_TYPE)
+
+# Column order used by both binary formats
+ARRAY_COLUMNS = ('yhat', 'yhat_lower', 'yhat_upper')
+
+def negotiate_media_type(accept: Optional[str]) -> Optional[str]:
+    """Pick the supported media type the client prefers, or None if none is acceptable"""
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    ranked = []
+    for position, part in enumerate(accept.split(',')):
+        media_type, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(ranked):
+        if media_type in ('*/*', 'application/*'):
+            return JSON_MEDIA_TYPE
+        if media_type in SUPPORTED_MEDIA_TYPES:
+            return media_type
+    return None
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def encode_arrow(product_ids: List[str], arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]) -> bytes:
+    """Encode (product x day) arrays as an Arrow IPC stream with one fixed-size list column per array"""
+    import pyarrow as pa
+
+    days = arrays['yhat'].shape[1]
+    columns = [pa.array(product_ids, type=pa.string())]
+    for name in ARRAY_COLUMNS:
+        values = np.ascontiguousarray(arrays[name], dtype=np.float32).reshape(-1)
+        columns.append(pa.FixedSizeListArray.from_arrays(pa.array(values), days))
+
+    table = pa.Table.from_arrays(
+        columns,
+        names=['product_id', *ARRAY_COLUMNS],
+        metadata={key: json.dumps(value) for key, value in metadata.items()}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def encode_float32(product_ids: List[str], arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]) -> bytes:
+    """Encode (product x day) arrays as a JSON header followed by packed little-endian float32 buffers
+
+    Layout: uint32 header length, UTF-8 JSON header, then yhat, yhat_lower and
+    yhat_upper as row-major (product x day) float32 blocks.
+    """
+    n_products, days = arrays['yhat'].shape
+    header = json.dumps({
+        **metadata,
+        'product_ids': list(product_ids),
+        'shape': [n_products, days],
+        'dtype': '<f4',
+        'arrays': list(ARRAY_COLUMNS)
+    }).encode('utf-8')
+
+    buffers = [np.ascontiguousarray(arrays[name], dtype='<f4').tobytes() for name in ARRAY_COLUMNS]
+    return b''.join([struct.pack('<I', len(header)), header, *buffers])
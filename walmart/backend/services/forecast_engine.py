@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORECAST_HORIZONS = {
+    'week': 7,
+    'month': 30,
+    'quarter': 90,
+    'year': 365
+}
+MAX_FORECAST_HORIZON = max(FORECAST_HORIZONS.values())
+
+# EWMA control chart on standardized one-step forecast errors; a model has
+# drifted once the smoothed error leaves its 3-sigma band
+DRIFT_SMOOTHING = 0.1
+DRIFT_LIMIT = 3 * np.sqrt(DRIFT_SMOOTHING / (2 - DRIFT_SMOOTHING))
+
+# Interval coverage when a caller does not ask for one
+DEFAULT_CONFIDENCE = 0.95
+
+# True inside replenishment and batch work, whose fits must leave workers free for interactive ones
+_background: ContextVar[bool] = ContextVar('forecast_background', default=False)
+
+@contextmanager
+def background_work() -> Iterator[None]:
+    """Mark fits started in this context, and in tasks created within it, as background work"""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+def in_background() -> bool:
+    return _background.get()
+
+def z_score(confidence_level: float) -> float:
+    """Standard normal multiplier of a two-sided interval with this coverage"""
+    return NormalDist().inv_cdf(0.5 + confidence_level / 2)
+
+def interval_bounds(
+    yhat: np.ndarray,
+    sigma: np.ndarray,
+    confidence_level: float = DEFAULT_CONFIDENCE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower (clipped at zero) and upper interval bounds from the normal predictive distribution"""
+    margin = z_score(confidence_level) * np.asarray(sigma)
+    return np.maximum(yhat - margin, 0), yhat + margin
+
+def lead_time_quantiles(
+    yhat: np.ndarray,
+    sigma: np.ndarray,
+    service_levels: Sequence[float]
+) -> Dict[str, np.ndarray]:
+    """Quantiles of total demand over the days of each (SKU x day) row, one row per service level
+
+    Daily errors are treated as independent, so the total's standard deviation
+    is sqrt(sum sigma^2), the usual basis for sigma * z * sqrt(L) safety stock.
+    """
+    mean = np.asarray(yhat, dtype=np.float64).sum(axis=1)
+    std = np.sqrt((np.asarray(sigma, dtype=np.float64) ** 2).sum(axis=1))
+    z = np.array([NormalDist().inv_cdf(level) for level in service_levels])
+    safety_stock = np.maximum(z[:, None] * std, 0)
+    return {
+        'mean_demand': mean,
+        'std_demand': std,
+        'quantiles': mean + safety_stock,
+        'safety_stock': safety_stock
+    }
+
+def period_means(yhat: np.ndarray) -> Dict[str, float]:
+    """Average daily forecast for every period covered by one prediction array"""
+    cumulative = np.cumsum(yhat)
+    return {
+        period: float(cumulative[days - 1] / days)
+        for period, days in FORECAST_HORIZONS.items()
+        if days <= len(yhat)
+    }
+
+def ewma_drift(drift: Any, z: np.ndarray, smoothing: float = DRIFT_SMOOTHING) -> Any:
+    """Advance the drift statistic over new standardized errors (days on the last axis)"""
+    n_new = z.shape[-1]
+    weights = smoothing * (1 - smoothing) ** np.arange(n_new - 1, -1, -1)
+    return (1 - smoothing) ** n_new * drift + z @ weights
+
+class ForecastEngine:
+    """Process pool that runs CPU-bound model fits off the event loop
+
+    The pool's queue is FIFO, so background work is admitted through a cap
+    that keeps reserved_workers free; an interactive fit then never queues
+    behind more than the background fits already running.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, reserved_workers: Optional[int] = None):
+        self.max_workers = (
+            max_workers
+            or int(os.getenv('FORECAST_WORKERS', '0'))
+            or os.cpu_count()
+            or 1
+        )
+        reserved_workers = (
+            reserved_workers if reserved_workers is not None
+            else int(os.getenv('SCHEDULER_RESERVED_SLOTS', '1'))
+        )
+        self.background_workers = max(self.max_workers - reserved_workers, 1)
+        self._background_slots = asyncio.Semaphore(self.background_workers)
+        self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use so idle services never spawn processes"""
+        if self._executor is None:
+            logger.info(f"Starting forecast process pool with {self.max_workers} workers")
+            # Spawned workers do not inherit the event loop or Stan threads of the parent
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable function in the process pool and await its result"""
+        loop = asyncio.get_running_loop()
+        if not in_background():
+            return await loop.run_in_executor(self.executor, func, *args)
+        async with self._background_slots:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from models.forecast_models import (
+    ForecastJob, ForecastJobResults, JobPriority, JobStatus, MultiSignalForecast
+)
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.EXPIRED)
+
+class _JobRecord:
+    def __init__(self, job: ForecastJob):
+        self.job = job
+        self.results: List[MultiSignalForecast] = []
+        self.updated = asyncio.Event()
+
+    def notify(self):
+        # Wake every waiter, then arm a fresh event for the next update
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+class ForecastJobRegistry:
+    """Tracks forecast jobs, their per-product progress and their results"""
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, _JobRecord]" = OrderedDict()
+
+    def create(
+        self,
+        product_ids: List[str],
+        forecast_period: str,
+        model: str,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        tenant_id: str = 'default',
+        deadline: Optional[datetime] = None
+    ) -> ForecastJob:
+        """Register a new queued job"""
+        forecast_id = f"fc_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        job = ForecastJob(
+            forecast_id=forecast_id,
+            status=JobStatus.QUEUED,
+            model=model,
+            forecast_period=forecast_period,
+            product_ids=list(product_ids),
+            priority=priority,
+            tenant_id=tenant_id,
+            deadline=deadline,
+            total_products=len(product_ids),
+            created_at=datetime.now()
+        )
+        self._jobs[forecast_id] = _JobRecord(job)
+        self._evict()
+        return job
+
+    def _evict(self):
+        """Drop the oldest finished jobs beyond max_jobs"""
+        excess = len(self._jobs) - self.max_jobs
+        for forecast_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[forecast_id].job.status in FINISHED_STATUSES:
+                del self._jobs[forecast_id]
+                excess -= 1
+
+    def get(self, forecast_id: str) -> Optional[ForecastJob]:
+        """Get a job's current status"""
+        record = self._jobs.get(forecast_id)
+        return record.job if record else None
+
+    def get_results(self, forecast_id: str, offset: int = 0, limit: int = 100) -> Optional[ForecastJobResults]:
+        """Get a job's status with one page of its results"""
+        record = self._jobs.get(forecast_id)
+        if record is None:
+            return None
+        return ForecastJobResults(
+            **record.job.model_dump(),
+            offset=offset,
+            limit=limit,
+            results=record.results[offset:offset + limit]
+        )
+
+    def _update(self, forecast_id: str, **changes: Any):
+        record = self._jobs[forecast_id]
+        record.job = record.job.model_copy(update=changes)
+        record.notify()
+
+    def mark_started(self, forecast_id: str):
+        self._update(forecast_id, status=JobStatus.PROCESSING, started_at=datetime.now())
+
+    def add_result(self, forecast_id: str, forecast: MultiSignalForecast):
+        record = self._jobs[forecast_id]
+        record.results.append(forecast)
+        self._update(forecast_id, completed_products=len(record.results))
+
+    def mark_completed(self, forecast_id: str):
+        job = self._jobs[forecast_id].job
+        self._update(
+            forecast_id,
+            status=JobStatus.COMPLETED,
+            failed_products=job.total_products - job.completed_products,
+            completed_at=datetime.now()
+        )
+
+    def mark_failed(self, forecast_id: str, error: str):
+        job = self._jobs[forecast_id].job
+        self._update(
+            forecast_id,
+            status=JobStatus.FAILED,
+            failed_products=job.total_products - job.completed_products,
+            completed_at=datetime.now(),
+            error=error
+        )
+
+    def mark_cancelled(self, forecast_id: str, status: JobStatus, reason: str):
+        """Stop a job early (cancelled or past its deadline), keeping the results it already has"""
+        job = self._jobs[forecast_id].job
+        self._update(
+            forecast_id,
+            status=status,
+            failed_products=job.total_products - job.completed_products,
+            completed_at=datetime.now(),
+            error=reason
+        )
+
+    async def stream(self, forecast_id: str, keepalive: float = 15.0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield progress events and each result as it lands, ending when the job finishes"""
+        record = self._jobs.get(forecast_id)
+        if record is None:
+            return
+
+        sent = 0
+        while True:
+            updated = record.updated
+            job = record.job
+            for forecast in record.results[sent:]:
+                yield {'event': 'result', 'data': forecast.model_dump(mode='json')}
+            sent = len(record.results)
+            yield {'event': 'progress', 'data': job.model_dump(mode='json', exclude={'product_ids'})}
+
+            if job.status in FINISHED_STATUSES:
+                return
+
+            try:
+                await asyncio.wait_for(updated.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent / 'forecast_store'
+# sigma is the predictive standard deviation, from which intervals of any coverage follow
+ARRAYS = ('yhat', 'yhat_lower', 'yhat_upper', 'sigma')
+
+class ForecastSnapshot:
+    """One materialized run: (product x day) float32 arrays plus a product index"""
+
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+        self.index = {product_id: row for row, product_id in enumerate(meta['product_ids'])}
+        self.generated_at = datetime.fromisoformat(meta['generated_at'])
+
+    @property
+    def horizon(self) -> int:
+        return self.arrays['yhat'].shape[1]
+
+    def age_seconds(self) -> float:
+        return (datetime.now() - self.generated_at).total_seconds()
+
+class ForecastStore:
+    """Materialized forecasts, published as immutable snapshots and read via memory maps"""
+
+    def __init__(self, root_dir: Optional[str] = None):
+        self.root_dir = Path(root_dir or os.getenv('FORECAST_STORE_DIR') or DEFAULT_STORE_DIR)
+        self._snapshot: Optional[ForecastSnapshot] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Optional[ForecastSnapshot]:
+        """The current snapshot, loaded from disk on first access"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._snapshot = self._load_current()
+                    self._loaded = True
+        return self._snapshot
+
+    def _load_current(self) -> Optional[ForecastSnapshot]:
+        pointer = self.root_dir / 'CURRENT'
+        if not pointer.exists():
+            return None
+        snapshot_dir = self.root_dir / pointer.read_text().strip()
+        try:
+            meta = json.loads((snapshot_dir / 'index.json').read_text())
+            missing = set(ARRAYS) - set(meta['arrays'])
+            if missing:
+                # Written before these arrays existed; the next materialization replaces it
+                logger.info(f"Ignoring forecast snapshot {snapshot_dir} without {', '.join(sorted(missing))}")
+                return None
+            arrays = {
+                name: np.load(snapshot_dir / f"{name}.npy", mmap_mode='r')
+                for name in meta['arrays']
+            }
+            return ForecastSnapshot(meta, arrays)
+        except Exception as e:
+            logger.warning(f"Could not load forecast snapshot {snapshot_dir}: {e}")
+            return None
+
+    def publish(
+        self,
+        product_ids: List[str],
+        arrays: Dict[str, np.ndarray],
+        model: str,
+        model_version: str,
+        generated_at: Optional[datetime] = None
+    ) -> ForecastSnapshot:
+        """Write a new snapshot and make it current in one atomic pointer swap"""
+        generated_at = generated_at or datetime.now()
+        name = f"snapshot-{generated_at.strftime('%Y%m%d%H%M%S%f')}"
+        snapshot_dir = self.root_dir / name
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        for array_name, values in arrays.items():
+            np.save(snapshot_dir / f"{array_name}.npy", np.asarray(values, dtype=np.float32))
+
+        meta = {
+            'product_ids': list(product_ids),
+            'model': model,
+            'model_version': model_version,
+            'generated_at': generated_at.isoformat(),
+            'arrays': list(arrays)
+        }
+        (snapshot_dir / 'index.json').write_text(json.dumps(meta))
+
+        tmp_pointer = self.root_dir / 'CURRENT.tmp'
+        tmp_pointer.write_text(name)
+        os.replace(tmp_pointer, self.root_dir / 'CURRENT')
+
+        snapshot = ForecastSnapshot(meta, {
+            array_name: np.load(snapshot_dir / f"{array_name}.npy", mmap_mode='r')
+            for array_name in arrays
+        })
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded = True
+
+        self._remove_old_snapshots(keep={name})
+        logger.info(f"Published forecast snapshot {name} for {len(product_ids)} products")
+        return snapshot
+
+    def _remove_old_snapshots(self, keep: set):
+        # Keep the previous snapshot too, in case a reader still has it mapped
+        snapshots = sorted(p for p in self.root_dir.glob('snapshot-*') if p.is_dir())
+        for path in snapshots[:-2]:
+            if path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def get(self, product_id: str, days: int) -> Optional[Dict[str, Any]]:
+        """Materialized daily forecast for a product, or None if it is not covered"""
+        snapshot = self.snapshot
+        if snapshot is None or days > snapshot.horizon:
+            return None
+        row = snapshot.index.get(product_id)
+        if row is None:
+            return None
+
+        return {
+            **{name: snapshot.arrays[name][row, :days] for name in snapshot.arrays},
+            'model': snapshot.meta['model'],
+            'model_version': snapshot.meta['model_version'],
+            'generated_at': snapshot.generated_at,
+            'age_seconds': snapshot.age_seconds()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Describe the current snapshot"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {'root_dir': str(self.root_dir), 'products': 0}
+        return {
+            'root_dir': str(self.root_dir),
+            'products': len(snapshot.index),
+            'horizon': snapshot.horizon,
+            'model': snapshot.meta['model'],
+            'model_version': snapshot.meta['model_version'],
+            'generated_at': snapshot.generated_at.isoformat(),
+            'age_seconds': snapshot.age_seconds()
+        }
+
+_default_store: Optional[ForecastStore] = None
+
+def get_forecast_store() -> ForecastStore:
+    """Shared forecast store for all services in this process"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ForecastStore()
+    return _default_store
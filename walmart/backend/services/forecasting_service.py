@@ -1,69 +1,301 @@
 import asyncio
 import logging
+import os
+import threading
+import time
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Mapping, Sequence, Tuple
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-import xgboost as xgb
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 import json
+import zlib
+from contextlib import nullcontext
 
 from models.forecast_models import (
     ForecastData, SocialSignal, WeatherSignal, EventSignal,
-    MultiSignalForecast, ModelAccuracy, TrendAnalysis
+    MultiSignalForecast, ModelAccuracy, TrendAnalysis, ForecastJob, JobPriority, SaleEvent
 )
+from services.forecast_jobs import ForecastJobRegistry
+from services.job_scheduler import ForecastJobScheduler
+from services.forecast_engine import (
+    ForecastEngine, FORECAST_HORIZONS, MAX_FORECAST_HORIZON, DEFAULT_CONFIDENCE, DRIFT_LIMIT,
+    background_work, ewma_drift, in_background, interval_bounds, lead_time_quantiles, period_means, z_score
+)
+from services.engine_registry import BATCH_MODELS, GLOBAL_MODELS, engines
+from services.model_cache import ModelCache
+from services.model_generation import ModelGeneration
+from services.model_store import ModelArtifactStore
+from services.sales_store import DEFAULT_STORE_ID, get_sales_store
+from services.signal_service import (
+    SIGNALS, SignalService, apply_adjustments, scenario_adjustments, weather_adjustment
+)
+from services.backtesting import BacktestEngine, compute_metrics
+from services.single_flight import SingleFlight
+from services.forecast_store import ARRAYS, get_forecast_store
+from services.hierarchy import LEVELS, ForecastHierarchy
+from services.trend_analysis import analyze_matrix, parse_time_period
+from services.spike_detector import get_spike_detector
 
 logger = logging.getLogger(__name__)
 
 class ForecastingService:
-    def __init__(self):
-        self.models = {}
+    def __init__(self, max_workers: Optional[int] = None):
+        self.engine = ForecastEngine(max_workers=max_workers)
+        self.forecast_timings = {}
+        self.jobs = ForecastJobRegistry()
+        self.scheduler = ForecastJobScheduler(self.jobs, self._run_job_chunk)
+        # Requests up to this size default to the interactive class, larger ones to batch
+        self.interactive_max_products = int(os.getenv('INTERACTIVE_MAX_PRODUCTS', '100'))
+        self.batch_chunk_size = int(os.getenv('SCHEDULER_CHUNK_SIZE', '500'))
+        self.signals = SignalService()
+        self.backtester = BacktestEngine(self.engine)
+        self._accuracy = None
+        self._backtest_task = None
+        self.models = ModelCache()
+        self.trend_cache = ModelCache(max_size=256, ttl_seconds=3600)
+        # Base forecasts and current signals that what-if scenarios are applied to
+        self.scenario_bases = ModelCache(
+            max_size=64, ttl_seconds=float(os.getenv('SCENARIO_CACHE_TTL', '900'))
+        )
+        self.spike_detector = get_spike_detector()
+        # How far ahead of the server clock a sale timestamp may be
+        self.sale_clock_skew = float(os.getenv('SALE_CLOCK_SKEW_SECONDS', '300'))
+        self.inflight = SingleFlight()
+        self.forecasts = get_forecast_store()
+        self.max_forecast_age = float(os.getenv('FORECAST_MAX_AGE', str(36 * 3600)))
+        # Default latency budget for on-demand forecasts (None waits for the full model)
+        self.latency_budget = float(os.getenv('FORECAST_LATENCY_BUDGET_MS', '0')) / 1000 or None
+        self.fallback_model = os.getenv('FALLBACK_MODEL', 'ets')
+        self.fallback_count = 0
+        self._materialization_task = None
+        self.artifacts = ModelArtifactStore()
         self.signal_weights = {
             'pos': 0.4,
             'social': 0.2,
             'weather': 0.2,
             'events': 0.2
         }
-        self.model_versions = {
+        self.generation = ModelGeneration(1, {
             'prophet': '1.0.0',
             'xgboost': '1.0.0',
+            'ets': '1.0.0',
+            'seasonal_naive': '1.0.0',
             'ensemble': '1.0.0'
+        })
+        # Retraining builds the next generation on its own workers so serving never queues behind it
+        self.retrain_engine = ForecastEngine(
+            max_workers=int(os.getenv('RETRAIN_WORKERS', '0')) or max(1, self.engine.max_workers // 4)
+        )
+        # Trailing days each candidate's trained models are scored on before it can serve
+        self.retrain_holdout_days = int(os.getenv('RETRAIN_HOLDOUT_DAYS', '30'))
+        self.retrain_tolerance = float(os.getenv('RETRAIN_MAPE_TOLERANCE', '0.05'))
+        self.retrain_status = {'state': 'idle'}
+        self._retrain_task = None
+        # Trailing days of sales that set each leaf's share of its group
+        self.proportion_days = 91
+        # Per-product state carried between refreshes so new sales update models incrementally.
+        # ETS states are advanced on worker threads, so every change to them takes the lock
+        self.ets_states = {}
+        self._ets_lock = threading.Lock()
+        self.warm_starts = {}
+        self.update_counts = {
+            'ets_incremental': 0,
+            'ets_full_fit': 0,
+            'ets_drift_refit': 0,
+            'prophet_warm_start': 0,
+            'prophet_full_fit': 0,
+            'prophet_drift_refit': 0
         }
+    
+    @property
+    def model_versions(self) -> Mapping[str, str]:
+        """Model versions of the generation currently serving requests"""
+        return self.generation.versions
         
     async def generate_forecast_async(
         self,
         product_ids: List[str],
         forecast_period: str,
-        include_external_signals: bool = True
+        include_external_signals: bool = True,
+        model: str = 'prophet',
+        confidence_level: float = DEFAULT_CONFIDENCE
     ):
         """Generate forecasts asynchronously for multiple products"""
         try:
-            logger.info(f"Starting async forecast generation for {len(product_ids)} products")
+            logger.info(
+                f"Starting async {model} forecast generation for {len(product_ids)} products "
+                f"on {self.engine.max_workers} workers"
+            )
+            started = time.perf_counter()
             
-            # Generate forecasts for each product
+            # Collect forecasts as each product finishes
             forecasts = []
-            for product_id in product_ids:
-                forecast = await self._generate_single_forecast(
-                    product_id, forecast_period, include_external_signals
-                )
+            async for forecast in self.stream_forecasts(
+                product_ids, forecast_period, include_external_signals, model,
+                confidence_level=confidence_level
+            ):
                 forecasts.append(forecast)
                 
             # Store forecasts
             await self._store_forecasts(forecasts)
             
-            logger.info(f"Completed forecast generation for {len(product_ids)} products")
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Completed forecast generation for {len(forecasts)}/{len(product_ids)} products "
+                f"in {elapsed:.2f}s ({len(forecasts) / max(elapsed, 1e-9):.1f} products/s)"
+            )
             return forecasts
             
         except Exception as e:
             logger.error(f"Error in async forecast generation: {e}")
             raise
     
+    def submit_forecast_job(
+        self,
+        product_ids: List[str],
+        forecast_period: str,
+        model: str = 'prophet',
+        include_external_signals: bool = True,
+        priority: Optional[JobPriority] = None,
+        tenant_id: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+        confidence_level: float = DEFAULT_CONFIDENCE
+    ) -> ForecastJob:
+        """Register a forecast job and queue it with the scheduler"""
+        if priority is None:
+            priority = (
+                JobPriority.INTERACTIVE if len(product_ids) <= self.interactive_max_products
+                else JobPriority.BATCH
+            )
+        deadline = datetime.now() + timedelta(seconds=deadline_seconds) if deadline_seconds else None
+        job = self.jobs.create(
+            product_ids, forecast_period, model, priority, tenant_id or 'default', deadline
+        )
+        
+        # Prophet chunks fill the workers their class may use once, so other classes
+        # never queue behind a whole batch
+        if model != 'prophet':
+            chunk_size = self.batch_chunk_size
+        elif priority is JobPriority.INTERACTIVE:
+            chunk_size = self.engine.max_workers
+        else:
+            chunk_size = self.engine.background_workers
+        chunks = [job.product_ids[i:i + chunk_size] for i in range(0, len(job.product_ids), chunk_size)]
+        self.scheduler.submit(job, chunks, {
+            'priority': priority,
+            'forecast_period': forecast_period,
+            'model': model,
+            'include_external_signals': include_external_signals,
+            'generation': self.generation,
+            'confidence_level': confidence_level
+        })
+        return self.jobs.get(job.forecast_id)
+    
+    def cancel_forecast_job(self, forecast_id: str) -> bool:
+        """Cancel a queued or running forecast job, keeping results it already produced"""
+        return self.scheduler.cancel(forecast_id)
+    
+    async def _run_job_chunk(
+        self,
+        forecast_id: str,
+        product_ids: List[str],
+        priority: JobPriority,
+        forecast_period: str,
+        model: str,
+        include_external_signals: bool,
+        generation: ModelGeneration,
+        confidence_level: float
+    ):
+        """Forecast one scheduled chunk of a job, recording its results"""
+        # Each chunk runs as its own task, so the marking covers only this chunk's fits
+        marking = background_work() if priority is not JobPriority.INTERACTIVE else nullcontext()
+        with marking:
+            forecasts = []
+            async for forecast in self.stream_forecasts(
+                product_ids, forecast_period, include_external_signals, model, generation, confidence_level
+            ):
+                forecasts.append(forecast)
+                self.jobs.add_result(forecast_id, forecast)
+            
+            await self._store_forecasts(forecasts)
+    
+    def estimate_job_duration(self, product_count: int) -> float:
+        """Estimate seconds to forecast product_count products from recent per-product timings"""
+        if not self.forecast_timings:
+            return 300.0
+        mean_time = sum(self.forecast_timings.values()) / len(self.forecast_timings)
+        return product_count * mean_time / self.engine.max_workers
+    
+    async def stream_forecasts(
+        self,
+        product_ids: List[str],
+        forecast_period: str,
+        include_external_signals: bool = True,
+        model: str = 'prophet',
+        generation: Optional[ModelGeneration] = None,
+        confidence_level: float = DEFAULT_CONFIDENCE
+    ) -> AsyncIterator[MultiSignalForecast]:
+        """Yield forecasts in completion order while model fits run across the process pool"""
+        # Every product in the run uses the generation serving when it started
+        generation = generation or self.generation
+        if model in BATCH_MODELS or model in GLOBAL_MODELS:
+            # Vectorized and global models forecast the whole batch in one pass
+            for forecast in await self._generate_batch_forecasts(
+                product_ids, forecast_period, include_external_signals, model, generation, confidence_level
+            ):
+                yield forecast
+            return
+        
+        if include_external_signals:
+            # One batched signal lookup warms the cache for every per-product task
+            await self._get_signal_adjustments(product_ids)
+        
+        tasks = [
+            asyncio.ensure_future(self._timed_forecast(
+                product_id, forecast_period, include_external_signals, generation, confidence_level
+            ))
+            for product_id in product_ids
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                forecast = await next_done
+                if forecast is not None:
+                    yield forecast
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _timed_forecast(
+        self,
+        product_id: str,
+        forecast_period: str,
+        include_external_signals: bool,
+        generation: ModelGeneration,
+        confidence_level: float
+    ) -> Optional[MultiSignalForecast]:
+        """Generate a single forecast and record how long it took"""
+        started = time.perf_counter()
+        try:
+            forecast = await self._generate_single_forecast(
+                product_id, forecast_period, include_external_signals, generation, confidence_level
+            )
+        except Exception:
+            # Already logged by _generate_single_forecast; one bad SKU must not sink the batch
+            return None
+        
+        elapsed = time.perf_counter() - started
+        self.forecast_timings[product_id] = elapsed
+        forecast.processing_time = elapsed
+        logger.debug(f"Forecast for {product_id} completed in {elapsed:.3f}s")
+        return forecast
+    
     async def _generate_single_forecast(
         self,
         product_id: str,
         forecast_period: str,
-        include_external_signals: bool
+        include_external_signals: bool,
+        generation: ModelGeneration,
+        confidence_level: float = DEFAULT_CONFIDENCE
     ) -> MultiSignalForecast:
         """Generate forecast for a single product"""
         try:
@@ -71,17 +303,413 @@ class ForecastingService:
             historical_data = await self._get_historical_data(product_id)
             
             # Generate base forecast using Prophet
-            base_forecast = await self._generate_prophet_forecast(historical_data, forecast_period)
+            base_forecast = await self._generate_prophet_forecast(
+                product_id, historical_data, forecast_period, generation
+            )
+            
+            return await self._apply_external_signals(
+                product_id, base_forecast, include_external_signals,
+                confidence_level=confidence_level
+            )
+            
+        except Exception as e:
+            logger.error(f"Error generating forecast for product {product_id}: {e}")
+            raise
+    
+    async def _generate_batch_forecasts(
+        self,
+        product_ids: List[str],
+        forecast_period: str,
+        include_external_signals: bool,
+        model: str,
+        generation: ModelGeneration,
+        confidence_level: float = DEFAULT_CONFIDENCE
+    ) -> List[MultiSignalForecast]:
+        """Generate forecasts for many products with a vectorized (SKU x day) model"""
+        try:
+            started = time.perf_counter()
+            
+            periods = FORECAST_HORIZONS.get(forecast_period, 365)
+            result = await self._forecast_matrix(product_ids, periods, model, generation)
+            base_forecasts = result['yhat'].mean(axis=1)
+            adjustments = {}
+            if include_external_signals:
+                adjustments = await self._get_signal_adjustments(product_ids)
+            
+            per_product_time = (time.perf_counter() - started) / max(len(product_ids), 1)
+            forecasts = []
+            for product_id, base_forecast in zip(product_ids, base_forecasts):
+                forecast = await self._apply_external_signals(
+                    product_id, float(base_forecast), include_external_signals,
+                    adjustments.get(product_id), confidence_level
+                )
+                forecast.processing_time = per_product_time
+                self.forecast_timings[product_id] = per_product_time
+                forecasts.append(forecast)
+            
+            return forecasts
+            
+        except Exception as e:
+            logger.error(f"Error generating {model} batch forecasts: {e}")
+            raise
+    
+    async def _forecast_matrix(
+        self,
+        product_ids: List[str],
+        horizon: int,
+        model: str,
+        generation: ModelGeneration
+    ) -> Dict[str, np.ndarray]:
+        """Daily forecasts as (product x day) arrays from a vectorized or global model"""
+        if model == 'ets':
+            state = await asyncio.to_thread(
+                self._advance_ets_states, product_ids, DEFAULT_STORE_ID, generation.versions['ets']
+            )
+            return engines.get(model).with_intervals(state.forecast(horizon))
+        
+        history, start_date = await self._get_history_matrix(product_ids)
+        if model in GLOBAL_MODELS:
+            global_model = await self._get_global_model(generation)
+            return await asyncio.to_thread(global_model.forecast, history, start_date, horizon)
+        
+        batch_forecaster = engines.get(model)
+        return await asyncio.to_thread(batch_forecaster.forecast_batch, history, horizon, model)
+    
+    def _advance_ets_states(
+        self,
+        product_ids: List[str],
+        store_id: str,
+        version: str
+    ) -> Any:
+        """Bring each product's Holt-Winters state up to yesterday, smoothing only days it has not seen"""
+        batch_forecaster = engines.get('ets')
+        sales_store = get_sales_store()
+        # Today's partial sales would be smoothed once and never revisited
+        end = sales_store.last_closed_day()
+        n_days = len(sales_store.get_dates(end=end))
+        
+        # Group products by the first day their saved state has not seen (0 = no usable state).
+        # States are held locally so pruning a retired generation cannot pull them from under us
+        groups = {}
+        advanced = {}
+        for product_id in dict.fromkeys(product_ids):
+            state = self.ets_states.get((product_id, store_id, version))
+            start = state.n_days if state is not None and state.n_days <= n_days else 0
+            groups.setdefault(start, []).append(product_id)
+            advanced[product_id] = state
+        
+        for start, group in groups.items():
+            if start == n_days:
+                # Already up to date
+                continue
+            if start == 0:
+                history = sales_store.get_matrix(group, store_id, end=end)
+                states = batch_forecaster.HoltWintersState.initialize(history).split()
+                self.update_counts['ets_full_fit'] += len(group)
+            else:
+                combined = batch_forecaster.HoltWintersState.concatenate(
+                    [advanced[product_id] for product_id in group]
+                )
+                combined.update(sales_store.get_matrix(group, store_id, start=sales_store.dates[start], end=end))
+                states = combined.split()
+                self.update_counts['ets_incremental'] += len(group)
+                
+                # Products whose recent errors drifted are refit on a recent window only
+                drifted = [i for i, flag in enumerate(combined.drifted) if flag]
+                if drifted:
+                    window_start = max(n_days - batch_forecaster.DRIFT_REFIT_DAYS, 0)
+                    refit = batch_forecaster.HoltWintersState.initialize(
+                        sales_store.get_matrix(
+                            [group[i] for i in drifted], store_id, start=sales_store.dates[window_start], end=end
+                        ),
+                        start_day=window_start
+                    ).split()
+                    for i, state in zip(drifted, refit):
+                        states[i] = state
+                    self.update_counts['ets_drift_refit'] += len(drifted)
+                    logger.info(f"Refitting ETS for {len(drifted)} products after forecast drift")
+            
+            with self._ets_lock:
+                for product_id, state in zip(group, states):
+                    self.ets_states[(product_id, store_id, version)] = state
+            advanced.update(zip(group, states))
+        
+        return batch_forecaster.HoltWintersState.concatenate(
+            [advanced[product_id] for product_id in product_ids]
+        )
+    
+    async def _forecast_daily(
+        self,
+        product_ids: List[str],
+        horizon: int,
+        model: str,
+        generation: ModelGeneration,
+        latency_budget: Optional[float] = None
+    ) -> Tuple[List[str], Dict[str, np.ndarray], List[str]]:
+        """Daily forecasts for many products with any model, skipping products that fail
+        
+        Products not done within latency_budget seconds are returned separately
+        as late; their fits keep running in the background and land in the cache.
+        """
+        empty = {name: np.empty((0, horizon)) for name in ARRAYS}
+        if model in BATCH_MODELS:
+            result = await self._forecast_matrix(product_ids, horizon, model, generation)
+            return list(product_ids), {name: result[name] for name in ARRAYS}, []
+        if model in GLOBAL_MODELS:
+            # Training is shielded in single-flight and attaches the model to the generation,
+            # so a timeout leaves it finishing for the next request
+            try:
+                result = await asyncio.wait_for(
+                    self._forecast_matrix(product_ids, horizon, model, generation), latency_budget
+                )
+            except asyncio.TimeoutError:
+                return [], empty, list(product_ids)
+            return list(product_ids), {name: result[name] for name in ARRAYS}, []
+        
+        async def predict(product_id: str) -> pd.DataFrame:
+            data = await self._get_historical_data(product_id)
+            entry = await self._get_fitted_model(product_id, data, generation)
+            return await self._predict_fitted_model(entry, horizon)
+        
+        tasks = [asyncio.ensure_future(predict(product_id)) for product_id in product_ids]
+        if tasks:
+            await asyncio.wait(tasks, timeout=latency_budget)
+        succeeded, late = [], []
+        for product_id, task in zip(product_ids, tasks):
+            if not task.done():
+                # Fits and predictions are shielded in single-flight and finish on their own
+                task.cancel()
+                late.append(product_id)
+            elif task.exception() is not None:
+                logger.error(f"Error forecasting product {product_id}: {task.exception()}")
+            else:
+                succeeded.append((product_id, task.result()))
+        
+        return [product_id for product_id, _ in succeeded], {
+            name: np.stack([frame[name].to_numpy() for _, frame in succeeded])
+            if succeeded else empty[name]
+            for name in ARRAYS
+        }, late
+    
+    async def _fallback_forecast(
+        self,
+        product_ids: List[str],
+        horizon: int,
+        generation: ModelGeneration
+    ) -> Dict[str, np.ndarray]:
+        """Forecasts from the cheap vectorized fallback model for products whose model ran late"""
+        self.fallback_count += len(product_ids)
+        result = await self._forecast_matrix(product_ids, horizon, self.fallback_model, generation)
+        return {name: np.asarray(result[name][:, :horizon], dtype=np.float64) for name in ARRAYS}
+    
+    async def generate_hierarchical_forecast(
+        self,
+        product_ids: Optional[List[str]] = None,
+        store_id: Optional[str] = None,
+        category: Optional[str] = None,
+        forecast_period: str = 'month',
+        model: str = 'ets',
+        method: str = 'middle_out',
+        level: str = 'store'
+    ) -> Dict[str, Any]:
+        """Forecast a store x product hierarchy by fitting one level and reconciling the others"""
+        try:
+            generation = self.generation
+            level = 'total' if method == 'top_down' else level
+            if level not in LEVELS:
+                raise ValueError(f"Unknown hierarchy level: {level}")
+            
+            hierarchy = await self._build_hierarchy(product_ids, store_id, category)
+            if not hierarchy.leaves:
+                raise ValueError("No store and product series match the request")
+            
+            sales_store = get_sales_store()
+            history = await asyncio.to_thread(
+                sales_store.get_series_matrix, hierarchy.leaves, None, sales_store.last_closed_day()
+            )
+            horizon = FORECAST_HORIZONS.get(forecast_period, MAX_FORECAST_HORIZON)
+            
+            # One model per group at the chosen level instead of one per leaf
+            group_history = hierarchy.aggregate(level, np.asarray(history, dtype=np.float64))
+            group_forecasts = await self._forecast_aggregates(
+                group_history, sales_store.start_date, horizon, model, generation
+            )
+            shares = hierarchy.proportions(level, history[:, -self.proportion_days:])
+            reconciled = hierarchy.reconcile(
+                level, {name: group_forecasts[name] for name in ARRAYS}, shares
+            )
+            
+            logger.info(
+                f"Reconciled {len(hierarchy.leaves)} leaf forecasts from "
+                f"{len(hierarchy.keys[level])} {level} models ({method})"
+            )
+            return {
+                'method': method,
+                'level': level,
+                'model': model,
+                'horizon': horizon,
+                'models_fitted': len(hierarchy.keys[level]),
+                'leaves': len(hierarchy.leaves),
+                'levels': {
+                    name: {'keys': hierarchy.keys[name], **arrays}
+                    for name, arrays in reconciled.items()
+                }
+            }
             
+        except Exception as e:
+            logger.error(f"Error generating hierarchical forecast: {e}")
+            raise
+    
+    async def _build_hierarchy(
+        self,
+        product_ids: Optional[List[str]],
+        store_id: Optional[str],
+        category: Optional[str]
+    ) -> ForecastHierarchy:
+        """Store x product leaves matching the filters, with their regions and categories"""
+        product_ids = product_ids or await self.get_active_products()
+        store_regions = await self.get_active_stores()
+        product_categories = await self.get_product_categories(product_ids)
+        
+        store_ids = [store_id] if store_id else list(store_regions)
+        if category:
+            product_ids = [p for p in product_ids if product_categories[p] == category]
+        
+        leaves = [(s, p) for s in store_ids for p in product_ids]
+        return ForecastHierarchy(leaves, store_regions, product_categories)
+    
+    async def _forecast_aggregates(
+        self,
+        history: np.ndarray,
+        start_date: pd.Timestamp,
+        horizon: int,
+        model: str,
+        generation: ModelGeneration
+    ) -> Dict[str, np.ndarray]:
+        """Daily forecasts for aggregated (group x day) series with any model"""
+        if model in BATCH_MODELS:
+            batch_forecaster = engines.get(model)
+            return await asyncio.to_thread(batch_forecaster.forecast_batch, history, horizon, model)
+        if model in GLOBAL_MODELS:
+            global_model = await self._get_global_model(generation)
+            return await asyncio.to_thread(global_model.forecast, history, start_date, horizon)
+        
+        forecast_prophet = engines.get('prophet').forecast_prophet
+        dates = pd.date_range(start=start_date, periods=history.shape[1], freq='D')
+        per_group = await asyncio.gather(*(
+            self.engine.run(forecast_prophet, pd.DataFrame({'ds': dates, 'y': series}), horizon)
+            for series in history
+        ))
+        return {name: np.stack([group[name] for group in per_group]) for name in ARRAYS}
+    
+    async def materialize_forecasts(
+        self,
+        model: Optional[str] = None,
+        generation: Optional[ModelGeneration] = None
+    ) -> Dict[str, Any]:
+        """Precompute forecasts for every active product and publish them to the forecast store"""
+        try:
+            model = model or os.getenv('MATERIALIZE_MODEL', 'ets')
+            generation = generation or self.generation
+            started = time.perf_counter()
+            
+            product_ids = await self.get_active_products()
+            logger.info(f"Materializing {model} forecasts for {len(product_ids)} products")
+            
+            forecast_ids, arrays, _ = await self._forecast_daily(
+                product_ids, MAX_FORECAST_HORIZON, model, generation
+            )
+            await asyncio.to_thread(
+                self.forecasts.publish, forecast_ids, arrays, model, generation.versions[model]
+            )
+            
+            elapsed = time.perf_counter() - started
+            logger.info(f"Materialized {len(forecast_ids)}/{len(product_ids)} forecasts in {elapsed:.2f}s")
+            return self.forecasts.stats()
+            
+        except Exception as e:
+            logger.error(f"Error materializing forecasts: {e}")
+            raise
+    
+    async def run_materialization_schedule(self):
+        """Materialize forecasts now if none exist, then every night at MATERIALIZE_HOUR"""
+        hour = int(os.getenv('MATERIALIZE_HOUR', '2'))
+        
+        def next_run_after(now: datetime) -> datetime:
+            next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+            return next_run if next_run > now else next_run + timedelta(days=1)
+        
+        if self.forecasts.snapshot is None:
+            await self._materialize_with_retry(next_run_after(datetime.now()))
+        
+        while True:
+            now = datetime.now()
+            next_run = next_run_after(now)
+            await asyncio.sleep((next_run - now).total_seconds())
+            # The previous snapshot keeps serving while a failed run is retried
+            await self._materialize_with_retry(next_run_after(next_run))
+    
+    async def _materialize_with_retry(self, deadline: datetime):
+        """Materialize forecasts, retrying failures with exponential backoff until deadline"""
+        delay = float(os.getenv('MATERIALIZE_RETRY_SECONDS', '60'))
+        while True:
+            try:
+                await self.materialize_forecasts()
+                return
+            except Exception as e:
+                if datetime.now() + timedelta(seconds=delay) >= deadline:
+                    logger.error(f"Giving up on forecast materialization until the next nightly run: {e}")
+                    return
+                logger.warning(f"Forecast materialization failed; retrying in {delay:g}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 3600)
+    
+    def start_materialization_schedule(self):
+        """Run the nightly materialization loop in the background"""
+        if self._materialization_task is None or self._materialization_task.done():
+            with background_work():
+                self._materialization_task = asyncio.create_task(self.run_materialization_schedule())
+    
+    async def _get_global_model(self, generation: ModelGeneration) -> Any:
+        """Return the generation's cross-SKU XGBoost model, training it once over the active catalogue"""
+        if generation.global_model is None:
+            return await self.inflight.do(
+                ('global', generation.number), lambda: self._fit_global_model(generation)
+            )
+        return generation.global_model
+    
+    async def _fit_global_model(self, generation: ModelGeneration) -> Any:
+        """Train a cross-SKU XGBoost model on the active catalogue's history and attach it to generation"""
+        product_ids = await self.get_active_products()
+        history, start_date = await self._get_history_matrix(product_ids)
+        
+        global_model = engines.get('xgboost').GlobalXGBoostForecaster()
+        await asyncio.to_thread(global_model.fit, history, start_date)
+        # Attached here rather than by the caller, which a latency budget may cancel first
+        generation.global_model = global_model
+        return global_model
+    
+    async def _apply_external_signals(
+        self,
+        product_id: str,
+        base_forecast: float,
+        include_external_signals: bool,
+        adjustments: Optional[Dict[str, float]] = None,
+        confidence_level: float = DEFAULT_CONFIDENCE
+    ) -> MultiSignalForecast:
+        """Combine a base forecast with external signal adjustments"""
+        try:
             # Apply external signals if requested
             social_adjustment = 0.0
             weather_adjustment = 0.0
             event_adjustment = 0.0
             
             if include_external_signals:
-                social_adjustment = await self._calculate_social_adjustment(product_id)
-                weather_adjustment = await self._calculate_weather_adjustment(product_id)
-                event_adjustment = await self._calculate_event_adjustment(product_id)
+                if adjustments is None:
+                    adjustments = (await self._get_signal_adjustments([product_id]))[product_id]
+                social_adjustment = adjustments['social']
+                weather_adjustment = adjustments['weather']
+                event_adjustment = adjustments['events']
             
             # Calculate final forecast
             final_forecast = (
@@ -90,7 +718,8 @@ class ForecastingService:
             
             # Calculate confidence intervals
             confidence_interval = self._calculate_confidence_interval(
-                base_forecast, social_adjustment, weather_adjustment, event_adjustment
+                base_forecast, social_adjustment, weather_adjustment, event_adjustment,
+                confidence_level
             )
             
             return MultiSignalForecast(
@@ -106,171 +735,597 @@ class ForecastingService:
             )
             
         except Exception as e:
-            logger.error(f"Error generating forecast for product {product_id}: {e}")
+            logger.error(f"Error applying signals for product {product_id}: {e}")
             raise
     
-    async def _get_historical_data(self, product_id: str) -> pd.DataFrame:
-        """Get historical sales data for a product"""
-        # Mock data - in real implementation, this would fetch from database
-        dates = pd.date_range(start='2023-01-01', end=datetime.now().date(), freq='D')
-        np.random.seed(hash(product_id) % 2**32)
+    async def _get_historical_data(
+        self,
+        product_id: str,
+        store_id: str = DEFAULT_STORE_ID
+    ) -> pd.DataFrame:
+        """Get historical sales data for a product, through the last closed day"""
+        # Live sales stay out of training until their day ends, so the fingerprint holds all day
+        sales_store = get_sales_store()
+        end = sales_store.last_closed_day()
+        return pd.DataFrame({
+            'ds': sales_store.get_dates(end=end),
+            'y': sales_store.get_series(product_id, store_id, end=end)
+        })
+    
+    async def _get_history_matrix(
+        self,
+        product_ids: List[str],
+        store_id: str = DEFAULT_STORE_ID
+    ) -> Tuple[np.ndarray, pd.Timestamp]:
+        """Get a (product x day) sales matrix and its first date for vectorized models"""
+        sales_store = get_sales_store()
+        history = await asyncio.to_thread(
+            sales_store.get_matrix, product_ids, store_id, None, sales_store.last_closed_day()
+        )
+        return history, sales_store.start_date
+    
+    async def _get_fitted_model(
+        self,
+        product_id: str,
+        data: pd.DataFrame,
+        generation: ModelGeneration
+    ) -> Dict[str, Any]:
+        """Return the cached Prophet model for this product and history, fitting it on a miss"""
+        fingerprint = ModelCache.fingerprint(data)
+        version = generation.versions['prophet']
+        key = ModelCache.make_key(product_id, fingerprint, version)
+        entry = self.models.get(key)
+        if entry is not None:
+            return entry
         
-        # Generate realistic sales data with seasonality
-        base_sales = 100
-        seasonal_factor = 1 + 0.3 * np.sin(2 * np.pi * dates.dayofyear / 365)
-        trend_factor = 1 + 0.001 * np.arange(len(dates))
-        noise = np.random.normal(0, 0.1, len(dates))
+        # Concurrent misses for the same model share one load or fit; a background
+        # fit nobody waits for any more (its job was cancelled) is dropped
+        return await self.inflight.do(
+            ('fit',) + key,
+            lambda: self._load_or_fit_model(product_id, data, fingerprint, version),
+            cancel_when_abandoned=in_background()
+        )
+    
+    async def _load_or_fit_model(
+        self,
+        product_id: str,
+        data: pd.DataFrame,
+        fingerprint: str,
+        version: str
+    ) -> Dict[str, Any]:
+        """Load a persisted Prophet model or fit a new one, then cache it"""
+        # Warm start from a model persisted by an earlier process before refitting
+        model = await asyncio.to_thread(
+            self.artifacts.load, 'prophet', version, product_id, fingerprint
+        )
+        drift = 0.0
+        if model is None:
+            init, drift = self._prophet_warm_start(product_id, data, version)
+            model = await self.engine.run(engines.get('prophet').fit_prophet_model, data, init)
+            try:
+                await asyncio.to_thread(
+                    self.artifacts.save, 'prophet', version, product_id, fingerprint, model
+                )
+            except Exception as e:
+                logger.warning(f"Could not persist model for product {product_id}: {e}")
         
-        sales = base_sales * seasonal_factor * trend_factor * (1 + noise)
-        sales = np.maximum(sales, 0)  # Ensure non-negative sales
+        warm_start = {
+            'init': engines.get('prophet').warm_start_params(model),
+            'n_days': len(data),
+            'drift': drift,
+            'forecast': None
+        }
+        self.warm_starts[(product_id, version)] = warm_start
+        entry = {'model': model, 'forecast': None, 'period_means': {}, 'warm_start': warm_start}
+        self.models.set(ModelCache.make_key(product_id, fingerprint, version), entry)
+        return entry
+    
+    def _prophet_warm_start(
+        self,
+        product_id: str,
+        data: pd.DataFrame,
+        version: str
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Previous fit's parameters to start from (None when a full refit is due) and the drift so far"""
+        previous = self.warm_starts.get((product_id, version))
+        if previous is None or previous['n_days'] >= len(data):
+            # No earlier fit, or history was rewritten rather than extended
+            self.update_counts['prophet_full_fit'] += 1
+            return None, 0.0
         
-        return pd.DataFrame({
-            'ds': dates,
-            'y': sales
-        })
+        # Score the days added since the previous fit against what it forecast for them
+        drift = previous['drift']
+        forecast = previous['forecast']
+        if forecast is not None:
+            first = previous['n_days']
+            new_days = min(len(data) - first, len(forecast['yhat']))
+            actual = data['y'].to_numpy()[first:first + new_days]
+            z = (actual - forecast['yhat'][:new_days]) / forecast['sigma'][:new_days]
+            drift = float(ewma_drift(drift, z))
+        
+        if abs(drift) > DRIFT_LIMIT:
+            logger.info(f"Forecast drift for product {product_id}; refitting Prophet from scratch")
+            self.update_counts['prophet_drift_refit'] += 1
+            return None, 0.0
+        
+        self.update_counts['prophet_warm_start'] += 1
+        return previous['init'], drift
+    
+    async def _predict_fitted_model(self, entry: Dict[str, Any], periods: int) -> pd.DataFrame:
+        """Predict from a cached model; one prediction out to the longest horizon serves every period"""
+        forecast = entry['forecast']
+        if forecast is None or len(forecast) < periods:
+            horizon = max(periods, MAX_FORECAST_HORIZON)
+            forecast = await self.inflight.do(
+                ('predict', id(entry['model']), horizon),
+                lambda: self._predict_horizon(entry, horizon),
+                cancel_when_abandoned=in_background()
+            )
+        return forecast.iloc[:periods]
+    
+    async def _predict_horizon(self, entry: Dict[str, Any], horizon: int) -> pd.DataFrame:
+        forecast = await self.engine.run(
+            engines.get('prophet').predict_prophet, entry['model'], horizon
+        )
+        entry['forecast'] = forecast
+        entry['period_means'] = period_means(forecast['yhat'].to_numpy())
+        
+        # Keep the forecast so the next refit can measure drift against actual sales
+        warm_start = entry.get('warm_start')
+        if warm_start is not None:
+            warm_start['forecast'] = {
+                'yhat': forecast['yhat'].to_numpy(),
+                'sigma': forecast['sigma'].to_numpy()
+            }
+        return forecast
     
-    async def _generate_prophet_forecast(self, data: pd.DataFrame, forecast_period: str) -> float:
+    async def _generate_prophet_forecast(
+        self,
+        product_id: str,
+        data: pd.DataFrame,
+        forecast_period: str,
+        generation: ModelGeneration
+    ) -> float:
         """Generate forecast using Prophet model"""
         try:
-            # Initialize and fit Prophet model
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=False,
-                seasonality_mode='multiplicative'
-            )
-            
-            model.fit(data)
-            
-            # Create future dataframe
-            if forecast_period == 'week':
-                periods = 7
-            elif forecast_period == 'month':
-                periods = 30
-            elif forecast_period == 'quarter':
-                periods = 90
-            else:  # year
-                periods = 365
-                
-            future = model.make_future_dataframe(periods=periods)
-            forecast = model.predict(future)
+            entry = await self._get_fitted_model(product_id, data, generation)
+            
+            periods = FORECAST_HORIZONS.get(forecast_period, MAX_FORECAST_HORIZON)
+            forecast = await self._predict_fitted_model(entry, periods)
             
             # Return the average forecast for the period
-            return forecast['yhat'].tail(periods).mean()
+            return entry['period_means'].get(forecast_period, float(forecast['yhat'].mean()))
             
         except Exception as e:
             logger.error(f"Error in Prophet forecast: {e}")
             # Return simple moving average as fallback
             return data['y'].tail(30).mean()
     
-    async def _calculate_social_adjustment(self, product_id: str) -> float:
-        """Calculate adjustment based on social media signals"""
+    async def _get_signal_adjustments(self, product_ids: List[str]) -> Dict[str, Dict[str, float]]:
+        """Get external signal adjustments for products, treating unavailable signals as neutral"""
         try:
-            # Mock social signals - in real implementation, fetch from social media APIs
-            sentiment_score = np.random.uniform(-0.5, 0.5)
-            trending_score = np.random.uniform(0, 1)
-            mentions_count = np.random.randint(0, 1000)
+            return await self.signals.get_adjustments(product_ids)
+        except Exception as e:
+            logger.error(f"Error calculating signal adjustments: {e}")
+            return {
+                product_id: {'social': 0.0, 'weather': 0.0, 'events': 0.0}
+                for product_id in product_ids
+            }
+    
+    def _calculate_confidence_interval(
+        self,
+        base_forecast: float,
+        social_adjustment: float,
+        weather_adjustment: float,
+        event_adjustment: float,
+        confidence_level: float = DEFAULT_CONFIDENCE
+    ) -> Dict[str, float]:
+        """Calculate confidence intervals for the forecast"""
+        # Uncertainty widens with the size of the signal adjustments
+        adjusted = apply_adjustments(
+            base_forecast, social_adjustment, weather_adjustment, event_adjustment,
+            z_score(confidence_level)
+        )
+        return {
+            'lower_bound': float(adjusted['lower_bound']),
+            'upper_bound': float(adjusted['upper_bound']),
+            'confidence_level': confidence_level
+        }
+    
+    async def get_product_forecast(
+        self,
+        product_id: str,
+        days: int = 30,
+        latency_budget: Optional[float] = None,
+        confidence_level: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Get forecast for a specific product, within latency_budget seconds if given"""
+        generation = self.generation
+        forecast = self._get_materialized_forecast(product_id, days, generation)
+        if forecast is None:
+            # Identical concurrent requests await one computation
+            latency_budget = latency_budget or self.latency_budget
+            computation = self.inflight.do(
+                ('forecast', product_id, days, generation.versions['prophet']),
+                lambda: self._compute_product_forecast(product_id, days, generation)
+            )
+            try:
+                forecast = await asyncio.wait_for(computation, latency_budget)
+            except asyncio.TimeoutError:
+                # The shielded computation keeps going and caches the fitted model for next time
+                logger.info(
+                    f"Prophet forecast for {product_id} exceeded the {latency_budget:.3f}s budget; "
+                    f"serving {self.fallback_model}"
+                )
+                forecast = await self._fallback_product_forecast(product_id, days, generation)
+        
+        return self._with_confidence_level(forecast, confidence_level)
+    
+    def _with_confidence_level(
+        self,
+        forecast: Dict[str, Any],
+        confidence_level: Optional[float]
+    ) -> Dict[str, Any]:
+        """A copy of a product forecast with its interval restated at confidence_level"""
+        # Results may be shared with other callers, so they are copied rather than changed
+        confidence_level = confidence_level or DEFAULT_CONFIDENCE
+        if confidence_level == DEFAULT_CONFIDENCE:
+            return {**forecast, 'confidence_level': confidence_level}
+        lower, upper = interval_bounds(forecast['predictions'], forecast['sigma'], confidence_level)
+        return {
+            **forecast,
+            'confidence_intervals': {'lower': lower, 'upper': upper},
+            'confidence_level': confidence_level
+        }
+    
+    async def _fallback_product_forecast(
+        self,
+        product_id: str,
+        days: int,
+        generation: ModelGeneration
+    ) -> Dict[str, Any]:
+        """Product forecast from the fallback model, shaped like an on-demand one"""
+        arrays = await self._fallback_forecast([product_id], max(days, MAX_FORECAST_HORIZON), generation)
+        return {
+            'period_forecasts': period_means(arrays['yhat'][0]),
+            'predictions': arrays['yhat'][0, :days],
+            'confidence_intervals': {
+                'lower': arrays['yhat_lower'][0, :days],
+                'upper': arrays['yhat_upper'][0, :days]
+            },
+            'sigma': arrays['sigma'][0, :days],
+            'model': self.fallback_model,
+            'model_version': generation.versions[self.fallback_model],
+            'generated_at': datetime.now(),
+            'source': 'fallback'
+        }
+    
+    def _get_materialized_forecast(
+        self,
+        product_id: str,
+        days: int,
+        generation: ModelGeneration
+    ) -> Optional[Dict[str, Any]]:
+        """Serve a product forecast from the nightly snapshot if it is fresh and from the serving generation"""
+        snapshot = self.forecasts.snapshot
+        if snapshot is None or snapshot.age_seconds() > self.max_forecast_age:
+            return None
+        # A snapshot from before a hot-swap keeps its age but no longer reflects the serving models
+        if snapshot.meta['model_version'] != generation.versions.get(snapshot.meta['model']):
+            return None
+        stored = self.forecasts.get(product_id, max(days, min(snapshot.horizon, MAX_FORECAST_HORIZON)))
+        if stored is None or len(stored['yhat']) < days:
+            return None
+        
+        return {
+            'period_forecasts': period_means(stored['yhat']),
+            'predictions': stored['yhat'][:days],
+            'confidence_intervals': {
+                'lower': stored['yhat_lower'][:days],
+                'upper': stored['yhat_upper'][:days]
+            },
+            'sigma': stored['sigma'][:days],
+            'model': stored['model'],
+            'model_version': stored['model_version'],
+            'generated_at': stored['generated_at'],
+            'source': 'materialized'
+        }
+    
+    async def get_batch_forecasts(
+        self,
+        product_ids: List[str],
+        days: int = 30,
+        model: str = 'prophet',
+        latency_budget: Optional[float] = None,
+        confidence_level: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Get daily forecasts for many products as (product x day) arrays"""
+        try:
+            generation = self.generation
+            latency_budget = latency_budget or self.latency_budget
+            product_ids = list(dict.fromkeys(product_ids))
+            
+            # Materialized forecasts are gathered with one fancy-indexed read per array,
+            # but only when the snapshot came from the model version this response uses
+            snapshot = self.forecasts.snapshot
+            hits = []
+            if (
+                snapshot is not None
+                and snapshot.age_seconds() <= self.max_forecast_age
+                and days <= snapshot.horizon
+                and snapshot.meta['model'] == model
+                and snapshot.meta['model_version'] == generation.versions[model]
+            ):
+                hits = [product_id for product_id in product_ids if product_id in snapshot.index]
+            hit_set = set(hits)
+            misses = [product_id for product_id in product_ids if product_id not in hit_set]
             
-            # Calculate adjustment factor
-            adjustment = (
-                sentiment_score * 0.3 +
-                trending_score * 0.4 +
-                min(mentions_count / 1000, 1) * 0.3
-            ) * 0.2  # Scale factor
+            # Misses are computed in parallel (process pool or one vectorized pass)
+            computed_ids, computed, late = [], {}, []
+            if misses:
+                computed_ids, computed, late = await self._forecast_daily(
+                    misses, days, model, generation, latency_budget
+                )
+            
+            # Products that ran over budget get the fallback model in one vectorized pass
+            fallback = {}
+            if late:
+                logger.info(
+                    f"{len(late)} {model} forecasts exceeded the {latency_budget:.3f}s budget; "
+                    f"serving {self.fallback_model}"
+                )
+                fallback = await self._fallback_forecast(late, days, generation)
             
-            return adjustment
+            rows = [snapshot.index[product_id] for product_id in hits]
+            arrays = {}
+            for name in ARRAYS:
+                parts = []
+                if hits:
+                    parts.append(np.asarray(snapshot.arrays[name][rows, :days], dtype=np.float64))
+                if computed_ids:
+                    parts.append(np.asarray(computed[name][:, :days], dtype=np.float64))
+                if late:
+                    parts.append(fallback[name])
+                arrays[name] = np.concatenate(parts) if parts else np.empty((0, days))
+            
+            # Stored bounds are at the default coverage; other levels follow from sigma
+            confidence_level = confidence_level or DEFAULT_CONFIDENCE
+            if confidence_level != DEFAULT_CONFIDENCE:
+                arrays['yhat_lower'], arrays['yhat_upper'] = interval_bounds(
+                    arrays['yhat'], arrays['sigma'], confidence_level
+                )
+            
+            answered = set(computed_ids) | set(late)
+            return {
+                'product_ids': hits + computed_ids + late,
+                'sources': (
+                    ['materialized'] * len(hits) + ['on_demand'] * len(computed_ids)
+                    + ['fallback'] * len(late)
+                ),
+                'failed': [product_id for product_id in misses if product_id not in answered],
+                'model': model,
+                'model_version': generation.versions[model],
+                'fallback_model': self.fallback_model if late else None,
+                'fallback_model_version': generation.versions[self.fallback_model] if late else None,
+                'days': days,
+                'confidence_level': confidence_level,
+                **arrays
+            }
             
         except Exception as e:
-            logger.error(f"Error calculating social adjustment: {e}")
-            return 0.0
+            logger.error(f"Error getting batch forecasts: {e}")
+            raise
     
-    async def _calculate_weather_adjustment(self, product_id: str) -> float:
-        """Calculate adjustment based on weather signals"""
+    async def _compute_product_forecast(
+        self,
+        product_id: str,
+        days: int,
+        generation: ModelGeneration
+    ) -> Dict[str, Any]:
+        """Build daily predictions for a product from its cached model"""
         try:
-            # Mock weather data - in real implementation, fetch from weather APIs
-            temperature = np.random.uniform(0, 100)
-            humidity = np.random.uniform(0, 100)
-            precipitation = np.random.uniform(0, 10)
-            
-            # Simple weather impact model
-            temp_impact = (temperature - 50) / 100  # Normalize temperature
-            humidity_impact = (humidity - 50) / 100  # Normalize humidity
-            precip_impact = -precipitation / 10  # Negative impact of precipitation
-            
-            adjustment = (temp_impact + humidity_impact + precip_impact) / 3 * 0.15
+            # Generate daily predictions from the cached model
+            historical_data = await self._get_historical_data(product_id)
+            entry = await self._get_fitted_model(product_id, historical_data, generation)
+            predictions = await self._predict_fitted_model(entry, days)
             
-            return adjustment
+            return {
+                'period_forecasts': entry['period_means'],
+                'predictions': predictions['yhat'].to_numpy(),
+                'confidence_intervals': {
+                    'lower': predictions['yhat_lower'].to_numpy(),
+                    'upper': predictions['yhat_upper'].to_numpy()
+                },
+                'sigma': predictions['sigma'].to_numpy(),
+                'model': 'prophet',
+                'model_version': generation.versions['prophet'],
+                'generated_at': datetime.now(),
+                'source': 'on_demand'
+            }
             
         except Exception as e:
-            logger.error(f"Error calculating weather adjustment: {e}")
-            return 0.0
+            logger.error(f"Error getting product forecast: {e}")
+            raise
     
-    async def _calculate_event_adjustment(self, product_id: str) -> float:
-        """Calculate adjustment based on event signals"""
+    async def run_scenarios(
+        self,
+        scenarios: List[Dict[str, Any]],
+        product_ids: Optional[List[str]] = None,
+        forecast_period: str = 'month',
+        model: str = 'ets',
+        confidence_level: float = DEFAULT_CONFIDENCE
+    ) -> Dict[str, Any]:
+        """Final forecasts and intervals for every product under each what-if signal scenario"""
         try:
-            # Mock event data - in real implementation, fetch from event calendars
-            upcoming_events = np.random.randint(0, 5)
-            event_impact = np.random.uniform(-0.3, 0.3)
+            product_ids = list(product_ids or await self.get_active_products())
+            if len(set(product_ids)) != len(product_ids):
+                raise ValueError("product_ids must be unique so scenario values line up with them")
+            
+            # Base forecasts are fitted once; each scenario only re-applies the signal arithmetic
+            version = self.generation.versions[model]
+            key = ('scenario', forecast_period, model, version, tuple(product_ids))
+            base = self.scenario_bases.get(key)
+            cached = base is not None
+            if base is None:
+                base = await self.inflight.do(
+                    key, lambda: self._build_scenario_base(product_ids, forecast_period, model)
+                )
+                self.scenario_bases.set(key, base)
             
-            adjustment = upcoming_events * event_impact * 0.1
+            started = time.perf_counter()
+            z = z_score(confidence_level)
+            adjustments = scenario_adjustments(
+                base['signals'], scenarios, len(product_ids), base['positions']
+            )
+            results = apply_adjustments(
+                base['base_forecast'], adjustments['social'], adjustments['weather'], adjustments['events'], z
+            )
+            baseline = apply_adjustments(
+                base['base_forecast'], base['signals']['social'], base['signals']['weather'], base['signals']['events'], z
+            )
+            baseline_total = baseline['final_forecast'].sum()
+            totals = results['final_forecast'].sum(axis=1)
+            compute_ms = (time.perf_counter() - started) * 1000
             
-            return adjustment
+            return {
+                'product_ids': base['product_ids'],
+                'failed': base['failed'],
+                'forecast_period': forecast_period,
+                'model': model,
+                'model_version': version,
+                'confidence_level': confidence_level,
+                'base_forecast': base['base_forecast'],
+                'baseline': {**baseline, **base['signals'], 'total_forecast': float(baseline_total)},
+                'scenarios': [
+                    {
+                        'name': scenario['name'],
+                        **{name: values[i] for name, values in results.items()},
+                        **{signal: adjustments[signal][i] for signal in SIGNALS},
+                        'total_forecast': float(totals[i]),
+                        'change_vs_baseline': float(totals[i] - baseline_total),
+                        'change_pct': float((totals[i] / baseline_total - 1) * 100) if baseline_total else 0.0
+                    }
+                    for i, scenario in enumerate(scenarios)
+                ],
+                'base_generated_at': base['generated_at'],
+                'cached': cached,
+                'compute_ms': compute_ms
+            }
             
         except Exception as e:
-            logger.error(f"Error calculating event adjustment: {e}")
-            return 0.0
+            logger.error(f"Error running forecast scenarios: {e}")
+            raise
     
-    def _calculate_confidence_interval(
+    async def _build_scenario_base(
         self,
-        base_forecast: float,
-        social_adjustment: float,
-        weather_adjustment: float,
-        event_adjustment: float
-    ) -> Dict[str, float]:
-        """Calculate confidence intervals for the forecast"""
-        # Calculate uncertainty based on signal adjustments
-        total_adjustment = abs(social_adjustment) + abs(weather_adjustment) + abs(event_adjustment)
-        uncertainty_factor = 1 + total_adjustment
-        
-        confidence_level = 0.95
-        z_score = 1.96  # 95% confidence interval
-        
-        margin_of_error = base_forecast * 0.1 * uncertainty_factor * z_score
+        product_ids: List[str],
+        forecast_period: str,
+        model: str
+    ) -> Dict[str, Any]:
+        """Period base forecasts and current signal adjustments as SKU-aligned arrays"""
+        days = FORECAST_HORIZONS.get(forecast_period, MAX_FORECAST_HORIZON)
+        batch = await self.get_batch_forecasts(product_ids, days, model)
+        rows = {product_id: i for i, product_id in enumerate(batch['product_ids'])}
+        positions = np.array([i for i, product_id in enumerate(product_ids) if product_id in rows], dtype=np.intp)
+        kept = [product_ids[i] for i in positions]
         
+        signals = await self._get_signal_adjustments(kept)
         return {
-            'lower_bound': max(0, base_forecast - margin_of_error),
-            'upper_bound': base_forecast + margin_of_error,
-            'confidence_level': confidence_level
+            'product_ids': kept,
+            'positions': positions,
+            'failed': batch['failed'],
+            'base_forecast': batch['yhat'][[rows[product_id] for product_id in kept]].mean(axis=1),
+            'signals': {
+                signal: np.array([signals[product_id][signal] for product_id in kept], dtype=np.float64)
+                for signal in SIGNALS
+            },
+            'generated_at': datetime.now()
         }
+
+    async def get_demand_quantiles(
+        self,
+        product_ids: List[str],
+        days: int = 7,
+        service_levels: Sequence[float] = (0.8, 0.9, 0.95, 0.99),
+        model: str = 'ets'
+    ) -> Dict[str, Any]:
+        """Lead-time demand quantiles and safety stock per product at each service level"""
+        try:
+            if any(not 0.5 < level < 1 for level in service_levels):
+                raise ValueError("service_levels must be between 0.5 and 1")
+            
+            # One read of the daily forecasts serves every level; no model is refitted
+            batch = await self.get_batch_forecasts(product_ids, days, model)
+            quantiles = lead_time_quantiles(batch['yhat'], batch['sigma'], service_levels)
+            return {
+                'product_ids': batch['product_ids'],
+                'sources': batch['sources'],
+                'failed': batch['failed'],
+                'days': days,
+                'service_levels': list(service_levels),
+                **quantiles
+            }
+            
+        except Exception as e:
+            logger.error(f"Error computing demand quantiles: {e}")
+            raise
     
-    async def get_product_forecast(self, product_id: str, days: int = 30) -> Dict[str, Any]:
-        """Get forecast for a specific product"""
+    async def record_sales(self, events: List[SaleEvent]) -> Dict[str, Any]:
+        """Add live sales to the history and screen each one for a demand spike
+
+        The whole batch is validated before anything is written, so a rejected
+        batch can be corrected and retried without counting any sale twice.
+        """
         try:
-            # Generate forecast
-            forecast = await self._generate_single_forecast(
-                product_id, 'month', include_external_signals=True
-            )
+            sales_store = get_sales_store()
+            now = datetime.now()
+            latest = now + timedelta(seconds=self.sale_clock_skew)
+            sold = [event.timestamp or now for event in events]
+            invalid = [
+                f"event {i}: {sold_at.isoformat()}"
+                for i, sold_at in enumerate(sold)
+                if not sales_store.start_date <= pd.Timestamp(sold_at) <= pd.Timestamp(latest)
+            ]
+            if invalid:
+                raise ValueError(
+                    f"Sale timestamps must fall between {sales_store.start_date.date()} and now: "
+                    + ", ".join(invalid)
+                )
             
-            # Generate daily predictions
-            historical_data = await self._get_historical_data(product_id)
-            model = Prophet(yearly_seasonality=True, weekly_seasonality=True)
-            model.fit(historical_data)
+            for event, sold_at in zip(events, sold):
+                if (event.store_id, event.product_id) not in self.spike_detector:
+                    await asyncio.to_thread(self._prime_spike_detector, event.store_id, event.product_id, sold_at)
             
-            future = model.make_future_dataframe(periods=days)
-            predictions = model.predict(future)
+            # No awaits from here on, so other requests never see part of the batch
+            spikes = []
+            for event, sold_at in zip(events, sold):
+                # Store series and the chain-wide series both receive the sale
+                sales_store.append(event.store_id, event.product_id, sold_at, event.quantity)
+                sales_store.append(DEFAULT_STORE_ID, event.product_id, sold_at, event.quantity)
+                
+                spike = self.spike_detector.observe(
+                    event.store_id, event.product_id, event.quantity, sold_at.timestamp()
+                )
+                if spike is not None:
+                    spikes.append(spike)
             
-            return {
-                'predictions': predictions['yhat'].tail(days).tolist(),
-                'confidence_intervals': {
-                    'lower': predictions['yhat_lower'].tail(days).tolist(),
-                    'upper': predictions['yhat_upper'].tail(days).tolist()
-                }
-            }
+            return {'accepted': len(events), 'spikes': spikes}
             
         except Exception as e:
-            logger.error(f"Error getting product forecast: {e}")
+            logger.error(f"Error recording sales events: {e}")
             raise
     
+    def _prime_spike_detector(self, store_id: str, product_id: str, sold_at: datetime):
+        """Seed a new series' spike baseline from its last four weeks of daily sales"""
+        sales_store = get_sales_store()
+        end = pd.Timestamp(sold_at).normalize() - pd.Timedelta(days=1)
+        if end < sales_store.start_date:
+            return
+        start = max(end - pd.Timedelta(days=27), sales_store.start_date)
+        self.spike_detector.prime(
+            store_id, product_id, sales_store.get_series(product_id, store_id, start, end)
+        )
+    
     async def analyze_trends(
         self,
         product_ids: Optional[List[str]] = None,
@@ -279,55 +1334,70 @@ class ForecastingService:
     ) -> TrendAnalysis:
         """Analyze trends for products or categories"""
         try:
-            # Mock trend analysis
-            trends = []
-            for i in range(5):
-                trends.append({
-                    'trend_name': f'Trend {i+1}',
-                    'direction': np.random.choice(['increasing', 'decreasing', 'stable']),
-                    'strength': np.random.uniform(0.1, 0.9),
-                    'confidence': np.random.uniform(0.7, 0.95)
-                })
-            
-            seasonality = {
-                'weekly': np.random.uniform(0.8, 1.2),
-                'monthly': np.random.uniform(0.9, 1.1),
-                'yearly': np.random.uniform(0.7, 1.3)
-            }
+            window_days = parse_time_period(time_period)
+            if product_ids is None:
+                product_ids = await self.get_active_products()
+                if category:
+                    categories = await self.get_product_categories(product_ids)
+                    product_ids = [p for p in product_ids if categories[p] == category]
+            if not product_ids:
+                raise ValueError(f"No products found for category {category}")
             
-            anomalies = [
+            # Results are reused until the sales data gains a new day
+            key = (category, time_period, tuple(product_ids), datetime.now().date())
+            analysis = self.trend_cache.get(key)
+            if analysis is None:
+                analysis = await self.inflight.do(
+                    ('trends',) + key,
+                    lambda: self._compute_trend_analysis(product_ids, window_days)
+                )
+                self.trend_cache.set(key, analysis)
+            
+            # Spikes caught from live sales since the batch analysis are never cached
+            streaming = [
                 {
-                    'date': (datetime.now() - timedelta(days=i)).isoformat(),
-                    'severity': np.random.uniform(0.1, 0.9),
-                    'description': f'Anomaly {i+1}'
+                    'date': spike['bucket_start'],
+                    'product_id': spike['product_id'],
+                    'store_id': spike['store_id'],
+                    'actual': spike['quantity'],
+                    'expected': spike['expected'],
+                    'z_score': spike['z_score'],
+                    'severity': float(min(spike['z_score'] / (2 * self.spike_detector.z_threshold), 1.0)),
+                    'description': f"Live demand spike for {spike['product_id']} at {spike['store_id']}",
+                    'source': 'streaming'
                 }
-                for i in range(3)
+                for spike in self.spike_detector.recent_spikes(
+                    max_age_seconds=window_days * 86400, product_ids=product_ids
+                )
             ]
             
             return TrendAnalysis(
-                product_ids=product_ids or [],
+                product_ids=product_ids,
                 category=category,
                 time_period=time_period,
-                trends=trends,
-                seasonality=seasonality,
-                anomalies=anomalies,
-                confidence_score=np.random.uniform(0.7, 0.95),
-                generated_at=datetime.now()
+                **{**analysis, 'anomalies': streaming + analysis['anomalies']}
             )
             
         except Exception as e:
             logger.error(f"Error analyzing trends: {e}")
             raise
     
+    async def _compute_trend_analysis(self, product_ids: List[str], window_days: int) -> Dict[str, Any]:
+        """Decompose, trend-test and scan for anomalies across the product x day matrix in one pass"""
+        sales_store = get_sales_store()
+        # Today's partial sales would read as a drop in the last window
+        end = sales_store.last_closed_day()
+        history = await asyncio.to_thread(sales_store.get_matrix, product_ids, DEFAULT_STORE_ID, None, end)
+        analysis = await asyncio.to_thread(
+            analyze_matrix, history, sales_store.get_dates(end=end), product_ids, window_days
+        )
+        return {**analysis, 'generated_at': datetime.now()}
+    
     async def get_social_signals(self, product_id: str) -> Dict[str, Any]:
         """Get social media signals for a product"""
         try:
-            # Mock social signals
-            return {
-                'sentiment': np.random.uniform(-0.5, 0.5),
-                'trending': np.random.uniform(0, 1),
-                'mentions': np.random.randint(0, 1000)
-            }
+            signals = await self.signals.get_signals('social', [product_id])
+            return signals[product_id]
         except Exception as e:
             logger.error(f"Error getting social signals: {e}")
             raise
@@ -335,71 +1405,418 @@ class ForecastingService:
     async def get_weather_signals(self, location: str, product_id: str) -> Dict[str, Any]:
         """Get weather signals for a location and product"""
         try:
-            # Mock weather data
+            signals = await self.signals.get_signals('weather', [location])
             return {
-                'impact': np.random.uniform(-0.3, 0.3),
-                'forecast': {
-                    'temperature': np.random.uniform(0, 100),
-                    'humidity': np.random.uniform(0, 100),
-                    'precipitation': np.random.uniform(0, 10)
-                },
+                'impact': weather_adjustment(signals[location]),
+                'forecast': signals[location],
                 'correlation': np.random.uniform(0.1, 0.8)
             }
         except Exception as e:
             logger.error(f"Error getting weather signals: {e}")
             raise
     
-    async def get_accuracy_metrics(self) -> Dict[str, float]:
-        """Get forecast accuracy metrics"""
-        try:
-            # Mock accuracy metrics
-            return {
-                'mape': np.random.uniform(5, 15),
-                'rmse': np.random.uniform(10, 30),
-                'mae': np.random.uniform(8, 25),
-                'overall_accuracy': np.random.uniform(0.8, 0.95)
+    def _accuracy_records(self) -> Dict[str, ModelAccuracy]:
+        """Backtest results keyed by model and version, loaded from disk on first use"""
+        if self._accuracy is None:
+            self._accuracy = {
+                key: ModelAccuracy(**record)
+                for key, record in self.artifacts.load_accuracy().items()
             }
+        return self._accuracy
+    
+    async def run_backtests(self, models: Optional[List[str]] = None) -> List[ModelAccuracy]:
+        """Backtest models on the active catalogue and persist their accuracy"""
+        try:
+            models = models or ['prophet', 'ets', 'seasonal_naive', 'xgboost']
+            generation = self.generation
+            product_ids = await self.get_active_products()
+            history, start_date = await self._get_history_matrix(product_ids)
+            
+            records = self._accuracy_records()
+            evaluated = []
+            for model_name in models:
+                version = generation.versions[model_name]
+                result = await self.backtester.backtest(model_name, history, start_date)
+                record = ModelAccuracy(
+                    model_name=model_name,
+                    model_version=version,
+                    last_evaluation=datetime.now(),
+                    **result
+                )
+                records[f"{model_name}@{version}"] = record
+                evaluated.append(record)
+            
+            await asyncio.to_thread(
+                self.artifacts.save_accuracy,
+                {key: record.model_dump(mode='json') for key, record in records.items()}
+            )
+            return evaluated
+            
+        except Exception as e:
+            logger.error(f"Error running backtests: {e}")
+            raise
+    
+    def schedule_backtests(self):
+        """Start a background backtest unless one is already running"""
+        if self._backtest_task is None or self._backtest_task.done():
+            with background_work():
+                self._backtest_task = asyncio.create_task(self.run_backtests())
+    
+    async def get_accuracy_metrics(self, model_name: str = 'prophet') -> Dict[str, Any]:
+        """Get precomputed backtest accuracy metrics for the current model version"""
+        try:
+            version = self.model_versions[model_name]
+            record = self._accuracy_records().get(f"{model_name}@{version}")
+            if record is None:
+                self.schedule_backtests()
+                raise LookupError(f"Accuracy for {model_name} {version} is being computed")
+            return record.model_dump()
+            
         except Exception as e:
             logger.error(f"Error getting accuracy metrics: {e}")
             raise
     
+    async def get_active_products(self) -> List[str]:
+        """Get IDs of all products currently being forecast"""
+        # Mock catalogue - in real implementation, fetch from product database
+        return [f'PROD_{i:03d}' for i in range(20)]
+    
+    async def get_active_stores(self) -> Dict[str, str]:
+        """Get active store IDs and the region each belongs to"""
+        # Mock store directory - in real implementation, fetch from store database
+        regions = ('north', 'south', 'east', 'west')
+        return {f'STORE_{i:03d}': regions[i % len(regions)] for i in range(1, 11)}
+    
+    async def get_product_categories(self, product_ids: List[str]) -> Dict[str, str]:
+        """Get the category of each product"""
+        # Mock catalogue - in real implementation, fetch from product database
+        categories = ('grocery', 'electronics', 'apparel', 'home', 'health')
+        return {
+            product_id: categories[zlib.crc32(product_id.encode()) % len(categories)]
+            for product_id in product_ids
+        }
+    
     async def get_recent_forecasts(self) -> List[Dict[str, Any]]:
         """Get recent forecasts for dashboard"""
         try:
-            # Mock recent forecasts
+            snapshot = self.forecasts.snapshot
+            if snapshot is None:
+                return []
+            
+            # Monthly outlook, with confidence taken from the relative interval width
+            days = min(FORECAST_HORIZONS['month'], snapshot.horizon)
+            product_ids = snapshot.meta['product_ids'][:10]
+            yhat = np.asarray(snapshot.arrays['yhat'][:len(product_ids), :days])
+            width = np.asarray(
+                snapshot.arrays['yhat_upper'][:len(product_ids), :days]
+                - snapshot.arrays['yhat_lower'][:len(product_ids), :days]
+            )
+            forecast_values = yhat.mean(axis=1)
+            confidences = np.clip(1 - width.mean(axis=1) / (2 * np.maximum(forecast_values, 1e-6)), 0, 1)
+            
             return [
                 {
-                    'product_id': f'PROD_{i:03d}',
-                    'forecast_value': np.random.uniform(50, 200),
-                    'confidence': np.random.uniform(0.7, 0.95),
-                    'generated_at': (datetime.now() - timedelta(hours=i)).isoformat()
+                    'product_id': product_id,
+                    'forecast_value': float(forecast_value),
+                    'confidence': float(confidence),
+                    'generated_at': snapshot.generated_at.isoformat(),
+                    'age_seconds': snapshot.age_seconds()
                 }
-                for i in range(10)
+                for product_id, forecast_value, confidence in zip(
+                    product_ids, forecast_values, confidences
+                )
             ]
         except Exception as e:
             logger.error(f"Error getting recent forecasts: {e}")
             raise
     
-    async def retrain_models(self):
-        """Retrain all forecasting models"""
+    def start_retraining(self) -> Dict[str, Any]:
+        """Start building the next model generation in the background unless one is being built"""
+        if self._retrain_task is None or self._retrain_task.done():
+            candidate = self._new_candidate()
+            self._retrain_task = asyncio.create_task(self.retrain_models(candidate))
+        return dict(self.retrain_status)
+    
+    def _new_candidate(self) -> ModelGeneration:
+        candidate = self.generation.successor()
+        self.retrain_status = {
+            'state': 'training',
+            'generation': candidate.number,
+            'versions': dict(candidate.versions),
+            'started_at': datetime.now()
+        }
+        return candidate
+    
+    async def retrain_models(self, candidate: Optional[ModelGeneration] = None) -> Dict[str, Any]:
+        """Build a new model generation off the serving path, validate it and swap it in
+        
+        Each model is trained on all but the last retrain_holdout_days of history
+        and the trained model itself is scored on those days. It is then brought
+        up to date the way serving advances models: ETS states smooth the holdout
+        days and Prophet warm-starts from the scored fit. The global model is
+        served as scored, since it reads recent sales as features at forecast time.
+        The serving generation is scored on the same days to decide the swap.
+        """
+        current = self.generation
+        candidate = candidate or self._new_candidate()
         try:
-            logger.info("Starting model retraining...")
+            logger.info(f"Retraining models as generation {candidate.number}")
+            started = time.perf_counter()
+            
+            product_ids = await self.get_active_products()
+            history, start_date = await self._get_history_matrix(product_ids)
+            history = np.asarray(history, dtype=np.float64)
+            holdout = self.retrain_holdout_days
+            train, actual = history[:, :-holdout], history[:, -holdout:]
+            
+            # Every model is trained under the candidate's versions, which no request can see yet.
+            # XGBoost trains on the retraining workers with their thread count, off the serving process
+            global_model = await self.retrain_engine.run(
+                engines.get('xgboost').fit_global_model, train, start_date, self.retrain_engine.max_workers
+            )
+            predicted = await asyncio.to_thread(global_model.forecast, train, start_date, holdout)
+            self._record_holdout(candidate, 'xgboost', train, actual, predicted['yhat'])
+            candidate.global_model = global_model
+            
+            predicted = await asyncio.to_thread(
+                self._retrain_ets_states, product_ids, candidate.versions['ets'], train, actual
+            )
+            self._record_holdout(candidate, 'ets', train, actual, predicted)
+            
+            predicted = await asyncio.to_thread(
+                engines.get('seasonal_naive').forecast_batch, train, holdout, 'seasonal_naive'
+            )
+            self._record_holdout(candidate, 'seasonal_naive', train, actual, predicted['yhat'])
             
-            # Simulate retraining process
-            await asyncio.sleep(2)
+            prophet_ids, predicted = await self._prefit_prophet_models(product_ids, candidate, holdout)
+            rows = [product_ids.index(product_id) for product_id in prophet_ids]
+            if prophet_ids:
+                self._record_holdout(candidate, 'prophet', train[rows], actual[rows], predicted)
             
-            # Update model versions
-            for model_name in self.model_versions:
-                version_parts = self.model_versions[model_name].split('.')
-                version_parts[2] = str(int(version_parts[2]) + 1)
-                self.model_versions[model_name] = '.'.join(version_parts)
+            self.retrain_status['state'] = 'validating'
+            baseline = await self._score_serving_generation(
+                current, prophet_ids, train, actual, rows, start_date
+            )
+            records = self._accuracy_records()
+            for record in candidate.accuracy.values():
+                records[f"{record.model_name}@{record.model_version}"] = record
+            await asyncio.to_thread(
+                self.artifacts.save_accuracy,
+                {key: record.model_dump(mode='json') for key, record in records.items()}
+            )
+            
+            regressions = candidate.regressions(baseline, self.retrain_tolerance)
+            if regressions:
+                logger.warning(
+                    f"Keeping generation {current.number}; generation {candidate.number} "
+                    f"regressed: {'; '.join(regressions)}"
+                )
+                self.retrain_status.update(
+                    state='rejected', regressions=regressions, finished_at=datetime.now()
+                )
+                return dict(self.retrain_status)
+            
+            self._activate_generation(candidate, current)
+            elapsed = time.perf_counter() - started
+            self.retrain_status.update(state='activated', finished_at=datetime.now())
+            logger.info(f"Model generation {candidate.number} serving after {elapsed:.1f}s of retraining")
             
-            logger.info("Model retraining completed")
+            # Requests still on the retired generation refit if its artifacts are gone
+            try:
+                removed = await asyncio.to_thread(self.artifacts.prune, candidate.versions)
+                logger.info(f"Removed {removed} retired model artifact directories")
+            except Exception as e:
+                logger.warning(f"Could not remove retired model artifacts: {e}")
+            
+            # Republish precomputed forecasts from the new generation
+            try:
+                await self.materialize_forecasts(generation=candidate)
+            except Exception:
+                # Already logged; the previous snapshot stays valid until the nightly run
+                pass
+            return dict(self.retrain_status)
             
         except Exception as e:
             logger.error(f"Error retraining models: {e}")
+            self.retrain_status.update(state='failed', error=str(e), finished_at=datetime.now())
             raise
     
+    def _record_holdout(
+        self,
+        generation: ModelGeneration,
+        model_name: str,
+        train: np.ndarray,
+        actual: np.ndarray,
+        predicted: np.ndarray
+    ):
+        """Score a generation's trained model on the holdout days it never saw"""
+        generation.accuracy[model_name] = self._holdout_accuracy(
+            model_name, generation.versions[model_name], train, actual, predicted
+        )
+    
+    @staticmethod
+    def _holdout_accuracy(
+        model_name: str,
+        version: str,
+        train: np.ndarray,
+        actual: np.ndarray,
+        predicted: np.ndarray
+    ) -> ModelAccuracy:
+        return ModelAccuracy(
+            model_name=model_name,
+            model_version=version,
+            last_evaluation=datetime.now(),
+            training_data_size=int(train.size),
+            test_data_size=int(actual.size),
+            **compute_metrics(actual, np.maximum(predicted, 0))
+        )
+    
+    async def _score_serving_generation(
+        self,
+        generation: ModelGeneration,
+        prophet_ids: List[str],
+        train: np.ndarray,
+        actual: np.ndarray,
+        prophet_rows: List[int],
+        start_date: Any
+    ) -> Dict[str, ModelAccuracy]:
+        """Score the serving generation on the candidate's holdout days, so the gate compares like with like
+        
+        Serving models have already seen those days, so each model is refit on the
+        same training days the way its serving version fits: the global model with
+        the serving model's parameters, and Prophet from the serving fit's warm start.
+        """
+        holdout = actual.shape[1]
+        scores = {}
+        
+        params = generation.global_model.params if generation.global_model is not None else None
+        global_model = await self.retrain_engine.run(
+            engines.get('xgboost').fit_global_model, train, start_date, self.retrain_engine.max_workers, params
+        )
+        predicted = await asyncio.to_thread(global_model.forecast, train, start_date, holdout)
+        scores['xgboost'] = self._holdout_accuracy(
+            'xgboost', generation.versions['xgboost'], train, actual, predicted['yhat']
+        )
+        
+        for model_name in BATCH_MODELS:
+            predicted = await asyncio.to_thread(engines.get(model_name).forecast_batch, train, holdout, model_name)
+            scores[model_name] = self._holdout_accuracy(
+                model_name, generation.versions[model_name], train, actual, predicted['yhat']
+            )
+        
+        if prophet_ids:
+            version = generation.versions['prophet']
+            prophet_engine = engines.get('prophet')
+            
+            async def refit(product_id: str) -> np.ndarray:
+                data = await self._get_historical_data(product_id)
+                warm_start = self.warm_starts.get((product_id, version))
+                model = await self.retrain_engine.run(
+                    prophet_engine.fit_prophet_model, data.iloc[:-holdout], warm_start['init'] if warm_start else None
+                )
+                predicted = await self.retrain_engine.run(prophet_engine.predict_prophet, model, holdout)
+                return predicted['yhat'].to_numpy()
+            
+            try:
+                predicted = np.stack(await asyncio.gather(*(refit(product_id) for product_id in prophet_ids)))
+                scores['prophet'] = self._holdout_accuracy(
+                    'prophet', version, train[prophet_rows], actual[prophet_rows], predicted
+                )
+            except Exception as e:
+                logger.warning(f"Could not score serving Prophet models on the holdout; not gating on Prophet: {e}")
+        return scores
+    
+    def _retrain_ets_states(
+        self,
+        product_ids: List[str],
+        version: str,
+        train: np.ndarray,
+        actual: np.ndarray
+    ) -> np.ndarray:
+        """Fit a generation's ETS states on train, forecast the holdout, then smooth it in"""
+        batch_forecaster = engines.get('ets')
+        state = batch_forecaster.HoltWintersState.initialize(train)
+        predicted = state.forecast(actual.shape[1])['yhat']
+        states = state.update(actual).split()
+        with self._ets_lock:
+            for product_id, product_state in zip(product_ids, states):
+                self.ets_states[(product_id, DEFAULT_STORE_ID, version)] = product_state
+        self.update_counts['ets_full_fit'] += len(product_ids)
+        return predicted
+    
+    async def _prefit_prophet_models(
+        self,
+        product_ids: List[str],
+        generation: ModelGeneration,
+        holdout: int
+    ) -> Tuple[List[str], np.ndarray]:
+        """Fit, score and persist a generation's Prophet model for every product on the retraining workers
+        
+        Returns the products that were fitted and their (product x day) holdout predictions.
+        """
+        version = generation.versions['prophet']
+        prophet_engine = engines.get('prophet')
+        
+        async def prefit(product_id: str) -> np.ndarray:
+            data = await self._get_historical_data(product_id)
+            model = await self.retrain_engine.run(prophet_engine.fit_prophet_model, data.iloc[:-holdout])
+            predicted = await self.retrain_engine.run(prophet_engine.predict_prophet, model, holdout)
+            
+            # The scored fit warm-starts the fit over the full history
+            model = await self.retrain_engine.run(
+                prophet_engine.fit_prophet_model, data, prophet_engine.warm_start_params(model)
+            )
+            # Persisted rather than cached, so retraining never evicts models that are serving
+            await asyncio.to_thread(
+                self.artifacts.save, 'prophet', version, product_id, ModelCache.fingerprint(data), model
+            )
+            self.warm_starts[(product_id, version)] = {
+                'init': prophet_engine.warm_start_params(model),
+                'n_days': len(data),
+                'drift': 0.0,
+                'forecast': None
+            }
+            return predicted['yhat'].to_numpy()
+        
+        results = await asyncio.gather(
+            *(prefit(product_id) for product_id in product_ids), return_exceptions=True
+        )
+        fitted = [
+            (product_id, result) for product_id, result in zip(product_ids, results)
+            if not isinstance(result, Exception)
+        ]
+        failed = len(product_ids) - len(fitted)
+        if failed:
+            logger.warning(f"Could not prefit Prophet for {failed} products; they will fit on first request")
+        if not fitted:
+            return [], np.empty((0, holdout))
+        return [product_id for product_id, _ in fitted], np.stack([predicted for _, predicted in fitted])
+    
+    def _activate_generation(self, candidate: ModelGeneration, previous: ModelGeneration):
+        """Swap in a validated generation and drop model state older than the one it replaces"""
+        # The replaced generation's state stays until the next swap, for requests still using it.
+        # Pruning comes first so nothing can fail once the new generation is serving
+        live = {
+            model_name: {previous.versions[model_name], candidate.versions[model_name]}
+            for model_name in candidate.versions
+        }
+        with self._ets_lock:
+            for key in [key for key in self.ets_states if key[2] not in live['ets']]:
+                del self.ets_states[key]
+        for key in [key for key in self.warm_starts if key[1] not in live['prophet']]:
+            del self.warm_starts[key]
+        
+        candidate.activated_at = datetime.now()
+        # A single assignment: requests already running keep the generation they started with
+        self.generation = candidate
+    
+    def get_model_generation(self) -> Dict[str, Any]:
+        """Describe the generation serving requests and the latest retraining run"""
+        return {
+            'serving': self.generation.describe(),
+            'retraining': dict(self.retrain_status)
+        }
+    
     async def _store_forecasts(self, forecasts: List[MultiSignalForecast]):
         """Store forecasts in database"""
         try:
@@ -409,4 +1826,30 @@ class ForecastingService:
             
         except Exception as e:
             logger.error(f"Error storing forecasts: {e}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get fitted-model cache statistics"""
+        return {
+            **self.models.stats(),
+            'artifact_store': self.artifacts.stats(),
+            'single_flight': self.inflight.stats(),
+            'forecast_store': self.forecasts.stats(),
+            'signal_cache': self.signals.stats(),
+            'scenario_cache': self.scenario_bases.stats(),
+            'model_updates': dict(self.update_counts),
+            'model_generation': self.generation.number,
+            'fallback_forecasts': self.fallback_count,
+            'spike_detector': self.spike_detector.stats(),
+            'scheduler': self.scheduler.stats()
+        }
+    
+    def shutdown(self):
+        """Release the forecasting and retraining worker pools"""
+        if self._materialization_task is not None:
+            self._materialization_task.cancel()
+        if self._retrain_task is not None:
+            self._retrain_task.cancel()
+        self.scheduler.shutdown()
+        self.engine.shutdown()
+        self.retrain_engine.shutdown() 
\ No newline at end of file
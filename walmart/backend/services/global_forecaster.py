@@ -0,0 +1,130 @@
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from services.forecast_engine import interval_bounds
+
+logger = logging.getLogger(__name__)
+
+# Every feature is at least MIN_LAG days old, so a whole block of MIN_LAG days
+# can be scored in one predict call during recursive forecasting
+MIN_LAG = 7
+LAGS = (7, 14, 28)
+ROLLING_WINDOWS = (7, 28)
+WARMUP_DAYS = MIN_LAG + max(max(LAGS), max(ROLLING_WINDOWS))
+
+FEATURE_NAMES = (
+    [f'lag_{lag}' for lag in LAGS]
+    + [f'rolling_mean_{window}' for window in ROLLING_WINDOWS]
+    + ['day_of_week', 'month', 'day_of_year']
+)
+
+def build_features(
+    series: np.ndarray,
+    scale: np.ndarray,
+    dates: pd.DatetimeIndex,
+    targets: np.ndarray
+) -> np.ndarray:
+    """Build lag, rolling and calendar features for every SKU at each target day index"""
+    n_skus = series.shape[0]
+    cumsum = np.concatenate([np.zeros((n_skus, 1)), np.cumsum(series, axis=1)], axis=1)
+    relative = 1 / scale[:, None]
+
+    columns = [series[:, targets - lag] * relative for lag in LAGS]
+
+    # Rolling means over the window ending MIN_LAG days before the target
+    window_end = targets - MIN_LAG + 1
+    for window in ROLLING_WINDOWS:
+        window_sum = cumsum[:, window_end] - cumsum[:, window_end - window]
+        columns.append(window_sum / window * relative)
+
+    target_dates = dates[targets]
+    for calendar in (target_dates.dayofweek, target_dates.month, target_dates.dayofyear):
+        columns.append(np.broadcast_to(np.asarray(calendar, dtype=np.float64), (n_skus, len(targets))))
+
+    return np.stack(columns, axis=-1).reshape(-1, len(columns))
+
+class GlobalXGBoostForecaster:
+    """One gradient-boosted model shared by all SKUs, trained on scale-normalised demand"""
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None, train_days: int = 365):
+        self.params = {
+            'n_estimators': 200,
+            'max_depth': 6,
+            'learning_rate': 0.1,
+            'subsample': 0.8,
+            'tree_method': 'hist',
+            **(params or {})
+        }
+        self.train_days = train_days
+        self.model = None
+        self.relative_sigma = 0.0
+        self.training_rows = 0
+
+    @staticmethod
+    def _scale(history: np.ndarray) -> np.ndarray:
+        return np.maximum(history.mean(axis=1), 1e-6)
+
+    def fit(self, history: np.ndarray, start_date: Any) -> "GlobalXGBoostForecaster":
+        """Train on the last train_days of every SKU's (SKU x day) history"""
+        history = np.asarray(history, dtype=np.float64)
+        n_skus, n_days = history.shape
+        if n_days <= WARMUP_DAYS:
+            raise ValueError(f"Need more than {WARMUP_DAYS} days of history, got {n_days}")
+
+        scale = self._scale(history)
+        dates = pd.date_range(start=start_date, periods=n_days, freq='D')
+        targets = np.arange(max(WARMUP_DAYS, n_days - self.train_days), n_days)
+
+        features = build_features(history, scale, dates, targets)
+        target = (history[:, targets] / scale[:, None]).reshape(-1)
+
+        self.model = xgb.XGBRegressor(**self.params)
+        self.model.fit(features, target)
+
+        residuals = self.model.predict(features) - target
+        self.relative_sigma = float(np.std(residuals))
+        self.training_rows = len(target)
+        logger.info(f"Trained global XGBoost model on {n_skus} SKUs ({self.training_rows} rows)")
+        return self
+
+    def forecast(self, history: np.ndarray, start_date: Any, horizon: int) -> Dict[str, np.ndarray]:
+        """Forecast every SKU recursively, scoring one MIN_LAG-day block per predict call"""
+        if self.model is None:
+            raise RuntimeError("Global model has not been trained")
+
+        history = np.asarray(history, dtype=np.float64)
+        n_skus, n_days = history.shape
+        scale = self._scale(history)
+        dates = pd.date_range(start=start_date, periods=n_days + horizon, freq='D')
+
+        buffer = np.concatenate([history, np.zeros((n_skus, horizon))], axis=1)
+        for block_start in range(n_days, n_days + horizon, MIN_LAG):
+            targets = np.arange(block_start, min(block_start + MIN_LAG, n_days + horizon))
+            features = build_features(buffer, scale, dates, targets)
+            predicted = self.model.predict(features).reshape(n_skus, len(targets))
+            buffer[:, targets] = np.maximum(predicted, 0) * scale[:, None]
+
+        yhat = buffer[:, n_days:]
+        blocks_ahead = np.arange(horizon) // MIN_LAG + 1
+        sigma = self.relative_sigma * scale[:, None] * np.sqrt(blocks_ahead)
+        yhat_lower, yhat_upper = interval_bounds(yhat, sigma)
+
+        return {
+            'yhat': yhat,
+            'yhat_lower': yhat_lower,
+            'yhat_upper': yhat_upper,
+            'sigma': sigma
+        }
+
+def fit_global_model(
+    history: np.ndarray,
+    start_date: Any,
+    n_jobs: int,
+    params: Optional[Dict[str, Any]] = None
+) -> GlobalXGBoostForecaster:
+    """Train a global model on at most n_jobs threads (runs in a worker process)"""
+    return GlobalXGBoostForecaster({**(params or {}), 'n_jobs': n_jobs}).fit(history, start_date)
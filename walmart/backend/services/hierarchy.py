@@ -0,0 +1,111 @@
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Aggregation levels above the (store, product) leaves; category crosses the
+# store branch, so the hierarchy is grouped rather than strictly nested
+LEVELS = ('total', 'region', 'category', 'store', 'store_category')
+
+LeafKey = Tuple[str, str]
+
+class ForecastHierarchy:
+    """Store x product leaves and the region, store and category groups above them
+
+    Each level's summing matrix S is applied through integer group indices,
+    so the (group x leaf) matrices are never materialized.
+    """
+
+    def __init__(
+        self,
+        leaves: Sequence[LeafKey],
+        store_regions: Dict[str, str],
+        product_categories: Dict[str, str]
+    ):
+        self.leaves = list(leaves)
+        self.keys: Dict[str, List[str]] = {}
+        self.index: Dict[str, np.ndarray] = {}
+        self._order: Dict[str, np.ndarray] = {}
+        self._starts: Dict[str, np.ndarray] = {}
+
+        for level in LEVELS:
+            labels = [
+                self._label(level, store_id, product_id, store_regions, product_categories)
+                for store_id, product_id in self.leaves
+            ]
+            keys, index = np.unique(labels, return_inverse=True)
+            self.keys[level] = keys.tolist()
+            self.index[level] = index
+
+            # Leaves sorted by group let np.add.reduceat sum each group in one pass
+            order = np.argsort(index, kind='stable')
+            self._order[level] = order
+            self._starts[level] = np.searchsorted(index[order], np.arange(len(keys)))
+
+        self.keys['leaf'] = [f"{store_id}/{product_id}" for store_id, product_id in self.leaves]
+
+    @staticmethod
+    def _label(
+        level: str,
+        store_id: str,
+        product_id: str,
+        store_regions: Dict[str, str],
+        product_categories: Dict[str, str]
+    ) -> str:
+        if level == 'total':
+            return 'total'
+        if level == 'region':
+            return store_regions.get(store_id, 'unknown')
+        if level == 'store':
+            return store_id
+        category = product_categories.get(product_id, 'uncategorized')
+        if level == 'category':
+            return category
+        return f"{store_id}/{category}"
+
+    def aggregate(self, level: str, leaf_values: np.ndarray) -> np.ndarray:
+        """Sum leaf rows into one row per group of a level (S_level @ leaf_values)"""
+        if level == 'leaf':
+            return leaf_values
+        return np.add.reduceat(leaf_values[self._order[level]], self._starts[level], axis=0)
+
+    def proportions(self, level: str, leaf_history: np.ndarray) -> np.ndarray:
+        """Each leaf's share of its group's sales over a (leaf x day) history window"""
+        index = self.index[level]
+        leaf_totals = np.asarray(leaf_history, dtype=np.float64).sum(axis=1)
+        group_totals = self.aggregate(level, leaf_totals)[index]
+
+        # Groups with no sales in the window are split evenly
+        even_split = 1 / np.bincount(index)[index]
+        return np.divide(
+            leaf_totals, group_totals, out=even_split, where=group_totals > 0
+        )
+
+    def disaggregate(self, level: str, group_values: np.ndarray, shares: np.ndarray) -> np.ndarray:
+        """Split (group x day) values over leaves by their shares (P_level @ group_values)"""
+        return shares[:, None] * group_values[self.index[level]]
+
+    def reconcile(
+        self,
+        level: str,
+        group_forecasts: Dict[str, np.ndarray],
+        shares: np.ndarray
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """Coherent forecasts at every level (S @ P @ forecasts) from forecasts fitted at one level
+
+        Interval bounds are split and summed like the point forecasts, which
+        reproduces the fitted level's intervals exactly and treats levels above
+        it as fully correlated (a conservative width).
+        """
+        leaf = {
+            name: self.disaggregate(level, values, shares)
+            for name, values in group_forecasts.items()
+        }
+        reconciled = {
+            target: {name: self.aggregate(target, values) for name, values in leaf.items()}
+            for target in LEVELS
+        }
+        reconciled['leaf'] = leaf
+        return reconciled
@@ -8,6 +8,8 @@ from models.inventory_models import (
     InventoryStatus, ReorderRequest, ThresholdUpdate, PerishableItem,
     MarkdownTrigger, WasteReductionMetrics, DynamicThreshold
 )
+from services.sales_store import get_sales_store
+from services.spike_detector import get_spike_detector
 
 logger = logging.getLogger(__name__)
 
@@ -72,16 +74,21 @@ class InventoryService:
     ) -> List[Dict[str, Any]]:
         """Get dynamic replenishment thresholds"""
         try:
-            # Mock dynamic thresholds - in real implementation, calculate based on demand patterns
+            # Mock base thresholds - demand factors come from the historical sales store
             thresholds = []
+            sales_store = get_sales_store()
+            recent_start = datetime.now().date() - timedelta(days=27)
             
             for i in range(10):
                 product_id_val = product_id or f"PROD_{i:03d}"
                 
                 # Calculate dynamic threshold based on historical data
                 base_threshold = np.random.randint(20, 50)
-                demand_variability = np.random.uniform(0.1, 0.3)
-                seasonality_factor = 1 + 0.2 * np.sin(2 * np.pi * datetime.now().dayofyear / 365)
+                history = sales_store.get_series(product_id_val)
+                recent = sales_store.get_series(product_id_val, start=recent_start)
+                recent_mean = max(float(recent.mean()), 1e-6)
+                demand_variability = float(recent.std()) / recent_mean
+                seasonality_factor = recent_mean / max(float(history.mean()), 1e-6)
                 
                 calculated_threshold = int(base_threshold * seasonality_factor * (1 + demand_variability))
                 
@@ -157,6 +164,23 @@ class InventoryService:
                     "created_at": datetime.now() - timedelta(hours=np.random.randint(1, 24))
                 })
             
+            # Live demand spikes put stock at risk before the next forecast sees them
+            for spike in get_spike_detector().recent_spikes(max_age_seconds=86400):
+                alerts.append({
+                    "alert_id": f"SPIKE_{spike['store_id']}_{spike['product_id']}_{spike['bucket_start']}",
+                    "product_id": spike['product_id'],
+                    "store_id": spike['store_id'],
+                    "alert_type": "demand_spike",
+                    "severity": "high",
+                    "message": (
+                        f"Demand spike for {spike['product_id']}: {spike['quantity']:.0f} units "
+                        f"vs {spike['expected']:.1f} expected"
+                    ),
+                    "current_value": spike['quantity'],
+                    "threshold_value": spike['expected'],
+                    "created_at": datetime.fromisoformat(spike['detected_at'])
+                })
+            
             return alerts
             
         except Exception as e:
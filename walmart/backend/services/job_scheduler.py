@@ -0,0 +1,215 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from models.forecast_models import ForecastJob, JobPriority, JobStatus
+from services.forecast_jobs import ForecastJobRegistry
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first
+PRIORITY_ORDER = (JobPriority.INTERACTIVE, JobPriority.REPLENISHMENT, JobPriority.BATCH)
+
+class _ScheduledJob:
+    def __init__(
+        self,
+        job: ForecastJob,
+        chunks: List[List[str]],
+        context: Dict[str, Any],
+        sequence: int
+    ):
+        self.forecast_id = job.forecast_id
+        self.priority = job.priority
+        self.tenant_id = job.tenant_id
+        self.deadline = job.deadline
+        self.pending: Deque[List[str]] = deque(chunks)
+        self.running: Set[asyncio.Task] = set()
+        self.context = context
+        self.sequence = sequence
+        self.submitted = time.monotonic()
+        self.started: Optional[float] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.finished = False
+
+    def sort_key(self) -> tuple:
+        # Earliest deadline first within a tenant, then submission order
+        deadline = self.deadline.timestamp() if self.deadline else math.inf
+        return (deadline, self.sequence)
+
+class ForecastJobScheduler:
+    """Runs forecast jobs chunk by chunk, by priority class and fairly across tenants
+
+    Jobs are split into small chunks of products and at most `slots` chunks
+    run at once. A free slot goes to the highest class with work queued;
+    within a class, tenants take turns a chunk at a time and each tenant's
+    jobs run earliest deadline first. The last `reserved_slots` free slots
+    only ever go to interactive work, so a small urgent request never waits
+    for a slot behind large batches. Its model fits do not queue behind
+    theirs either: the service runs other classes' chunks as background
+    work, which the process pool caps to leave workers free.
+    """
+
+    def __init__(
+        self,
+        registry: ForecastJobRegistry,
+        run_chunk: Callable[..., Awaitable[None]],
+        slots: Optional[int] = None,
+        reserved_slots: Optional[int] = None
+    ):
+        self.registry = registry
+        self.run_chunk = run_chunk
+        self.slots = slots or int(os.getenv('SCHEDULER_SLOTS', '4'))
+        self.reserved_slots = min(
+            reserved_slots if reserved_slots is not None else int(os.getenv('SCHEDULER_RESERVED_SLOTS', '1')),
+            self.slots - 1
+        )
+        self._jobs: Dict[str, _ScheduledJob] = {}
+        # Per class: each tenant's heap of jobs, and the tenants' turn order
+        self._queues: Dict[JobPriority, "OrderedDict[str, list]"] = {p: OrderedDict() for p in PRIORITY_ORDER}
+        self._turns: Dict[JobPriority, Deque[str]] = {p: deque() for p in PRIORITY_ORDER}
+        self._running = 0
+        self._sequence = itertools.count()
+        self._queue_seconds: Dict[JobPriority, Deque[float]] = {p: deque(maxlen=100) for p in PRIORITY_ORDER}
+
+    def submit(self, job: ForecastJob, chunks: List[List[str]], context: Dict[str, Any]):
+        """Queue a registered job; context is passed to run_chunk with every chunk"""
+        scheduled = _ScheduledJob(job, [chunk for chunk in chunks if chunk], context, next(self._sequence))
+        if not scheduled.pending:
+            self.registry.mark_started(job.forecast_id)
+            self.registry.mark_completed(job.forecast_id)
+            return
+
+        self._jobs[job.forecast_id] = scheduled
+        if job.deadline is not None:
+            delay = max((job.deadline - datetime.now()).total_seconds(), 0)
+            scheduled.timer = asyncio.get_running_loop().call_later(
+                delay, self.cancel, job.forecast_id, JobStatus.EXPIRED, "Deadline exceeded"
+            )
+
+        tenants = self._queues[job.priority]
+        if job.tenant_id not in tenants:
+            tenants[job.tenant_id] = []
+            # Ahead of the tenant served last, which sits at the back after its turn
+            turns = self._turns[job.priority]
+            turns.insert(max(len(turns) - 1, 0), job.tenant_id)
+        heapq.heappush(tenants[job.tenant_id], (scheduled.sort_key(), scheduled))
+        logger.info(
+            f"Queued {job.priority.value} job {job.forecast_id} for tenant {job.tenant_id} "
+            f"in {len(scheduled.pending)} chunks"
+        )
+        self._dispatch()
+
+    def cancel(
+        self,
+        forecast_id: str,
+        status: JobStatus = JobStatus.CANCELLED,
+        reason: str = "Cancelled by request"
+    ) -> bool:
+        """Stop a queued or running job; False if it is unknown or already finished"""
+        scheduled = self._jobs.get(forecast_id)
+        if scheduled is None:
+            return False
+        self._finish(scheduled, status, reason)
+        self._dispatch()
+        return True
+
+    def _dispatch(self):
+        """Start chunks until every slot is busy or nothing eligible is queued"""
+        while self._running < self.slots:
+            scheduled = self._next_job(self.slots - self._running)
+            if scheduled is None:
+                return
+            self._start_chunk(scheduled)
+
+    def _next_job(self, free_slots: int) -> Optional[_ScheduledJob]:
+        for priority in PRIORITY_ORDER:
+            if priority is not JobPriority.INTERACTIVE and free_slots <= self.reserved_slots:
+                return None
+            tenants, turns = self._queues[priority], self._turns[priority]
+            while turns:
+                tenant_id = turns.popleft()
+                heap = tenants[tenant_id]
+                # Jobs that finished or have every chunk started are dropped lazily
+                while heap and (heap[0][1].finished or not heap[0][1].pending):
+                    heapq.heappop(heap)
+                if not heap:
+                    del tenants[tenant_id]
+                    continue
+                turns.append(tenant_id)
+                return heap[0][1]
+        return None
+
+    def _start_chunk(self, scheduled: _ScheduledJob):
+        chunk = scheduled.pending.popleft()
+        if scheduled.started is None:
+            scheduled.started = time.monotonic()
+            self._queue_seconds[scheduled.priority].append(scheduled.started - scheduled.submitted)
+            self.registry.mark_started(scheduled.forecast_id)
+
+        self._running += 1
+        task = asyncio.create_task(self.run_chunk(scheduled.forecast_id, chunk, **scheduled.context))
+        scheduled.running.add(task)
+        task.add_done_callback(lambda done: self._chunk_done(scheduled, done))
+
+    def _chunk_done(self, scheduled: _ScheduledJob, task: asyncio.Task):
+        self._running -= 1
+        scheduled.running.discard(task)
+        if not scheduled.finished and not task.cancelled():
+            error = task.exception()
+            if error is not None:
+                logger.error(f"Error in forecast job {scheduled.forecast_id}: {error}")
+                self._finish(scheduled, JobStatus.FAILED, str(error))
+            elif not scheduled.pending and not scheduled.running:
+                self._finish(scheduled, JobStatus.COMPLETED)
+        self._dispatch()
+
+    def _finish(self, scheduled: _ScheduledJob, status: JobStatus, reason: Optional[str] = None):
+        scheduled.finished = True
+        scheduled.pending.clear()
+        if scheduled.timer is not None:
+            scheduled.timer.cancel()
+        for task in list(scheduled.running):
+            task.cancel()
+        del self._jobs[scheduled.forecast_id]
+
+        if status is JobStatus.COMPLETED:
+            self.registry.mark_completed(scheduled.forecast_id)
+        elif status is JobStatus.FAILED:
+            self.registry.mark_failed(scheduled.forecast_id, reason)
+        else:
+            if scheduled.started is None:
+                self.registry.mark_started(scheduled.forecast_id)
+            self.registry.mark_cancelled(scheduled.forecast_id, status, reason)
+        logger.info(f"Forecast job {scheduled.forecast_id} {status.value}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Slots in use, and queued jobs and recent queueing delay per priority class"""
+        classes = {}
+        for priority in PRIORITY_ORDER:
+            waits = self._queue_seconds[priority]
+            jobs = [s for s in self._jobs.values() if s.priority is priority]
+            classes[priority.value] = {
+                'jobs': len(jobs),
+                'queued_chunks': sum(len(s.pending) for s in jobs),
+                'tenants': len(self._queues[priority]),
+                'mean_queue_seconds': sum(waits) / len(waits) if waits else None,
+                'max_queue_seconds': max(waits) if waits else None
+            }
+        return {
+            'slots': self.slots,
+            'reserved_slots': self.reserved_slots,
+            'running_chunks': self._running,
+            'classes': classes
+        }
+
+    def shutdown(self):
+        """Cancel every queued and running job"""
+        for scheduled in list(self._jobs.values()):
+            self._finish(scheduled, JobStatus.CANCELLED, "Service shutting down")
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class ModelCache:
+    """Size-bounded LRU cache of fitted models with per-entry TTL"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size or int(os.getenv('MODEL_CACHE_SIZE', '1024'))
+        self.ttl_seconds = ttl_seconds or float(os.getenv('MODEL_CACHE_TTL', '3600'))
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fingerprint(data: pd.DataFrame) -> str:
+        """Hash the training data so a model is reused only for identical history"""
+        row_hashes = pd.util.hash_pandas_object(data, index=False).values
+        return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+    @staticmethod
+    def make_key(product_id: str, fingerprint: str, model_version: str) -> Tuple[str, str, str]:
+        """Build the cache key for a product's fitted model"""
+        return (product_id, fingerprint, model_version)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached model, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a model, evicting the least recently used entries beyond max_size"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            logger.debug(f"Evicted fitted model {evicted_key} from cache")
+
+    def invalidate(self, product_id: Optional[str] = None):
+        """Drop cached models for one product, or all of them"""
+        if product_id is None:
+            self._entries.clear()
+            return
+
+        for key in [k for k in self._entries if k[0] == product_id]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
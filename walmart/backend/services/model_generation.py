@@ -0,0 +1,64 @@
+import logging
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+from models.forecast_models import ModelAccuracy
+
+logger = logging.getLogger(__name__)
+
+def bump_patch(version: str) -> str:
+    """Next patch release of a semantic version string"""
+    parts = version.split('.')
+    parts[2] = str(int(parts[2]) + 1)
+    return '.'.join(parts)
+
+class ModelGeneration:
+    """One complete set of model versions, and the global model trained for them
+
+    Requests read the service's current generation once and use it for every
+    model they touch, so swapping in a new generation never mixes versions
+    within a response and never disturbs requests already running.
+    """
+
+    def __init__(self, number: int, versions: Mapping[str, str], global_model: Any = None):
+        self.number = number
+        self.versions = MappingProxyType(dict(versions))
+        self.global_model = global_model
+        # Holdout scores of the models trained for this generation
+        self.accuracy: Dict[str, ModelAccuracy] = {}
+        self.created_at = datetime.now()
+        self.activated_at: Optional[datetime] = None
+
+    def successor(self) -> "ModelGeneration":
+        """An untrained generation with every model version moved to its next patch release"""
+        return ModelGeneration(
+            self.number + 1,
+            {model: bump_patch(version) for model, version in self.versions.items()}
+        )
+
+    def regressions(
+        self,
+        baseline: Dict[str, ModelAccuracy],
+        tolerance: float
+    ) -> List[str]:
+        """Models whose holdout MAPE is worse than the baseline's by more than tolerance (relative)"""
+        regressed = []
+        for model, record in self.accuracy.items():
+            previous = baseline.get(model)
+            if previous is None:
+                continue
+            if record.mape > previous.mape * (1 + tolerance):
+                regressed.append(
+                    f"{model} MAPE {record.mape:.2f}% vs {previous.mape:.2f}% serving now"
+                )
+        return regressed
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'number': self.number,
+            'versions': dict(self.versions),
+            'created_at': self.created_at,
+            'activated_at': self.activated_at,
+            'accuracy': {model: record.mape for model, record in self.accuracy.items()}
+        }
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import quote
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent / 'model_artifacts'
+
+class ModelArtifactStore:
+    """On-disk store of fitted Prophet models, versioned like ForecastingService.model_versions"""
+
+    # Parameter arrays at least this large are memory-mapped instead of read into memory
+    MMAP_MIN_SIZE = 1024
+
+    def __init__(self, root_dir: Optional[str] = None):
+        self.root_dir = Path(root_dir or os.getenv('MODEL_STORE_DIR') or DEFAULT_STORE_DIR)
+
+    def _product_dir(self, model_name: str, version: str, product_id: str) -> Path:
+        return self.root_dir / model_name / version / quote(product_id, safe='')
+
+    def save(
+        self,
+        model_name: str,
+        version: str,
+        product_id: str,
+        fingerprint: str,
+        model: Any
+    ):
+        """Persist a fitted model, replacing older artifacts for the same product and version"""
+        from prophet.serialize import model_to_dict
+
+        product_dir = self._product_dir(model_name, version, product_id)
+        product_dir.mkdir(parents=True, exist_ok=True)
+
+        model_dict = model_to_dict(model)
+        params = model_dict.pop('params')
+
+        # Parameter arrays go to .npy files so large ones can be memory-mapped on load
+        for name, values in params.items():
+            self._atomic_write(
+                product_dir / f"{fingerprint}.{name}.npy",
+                lambda f, values=values: np.save(f, np.asarray(values))
+            )
+
+        # The JSON document is written last and marks the artifact as complete
+        model_dict['artifact'] = {
+            'product_id': product_id,
+            'model_name': model_name,
+            'model_version': version,
+            'fingerprint': fingerprint,
+            'params': list(params)
+        }
+        self._atomic_write(
+            product_dir / f"{fingerprint}.json",
+            lambda f: f.write(json.dumps(model_dict).encode())
+        )
+
+        for stale in product_dir.iterdir():
+            if not stale.name.startswith(f"{fingerprint}."):
+                stale.unlink(missing_ok=True)
+
+    def load(
+        self,
+        model_name: str,
+        version: str,
+        product_id: str,
+        fingerprint: str
+    ) -> Optional[Any]:
+        """Load a fitted model trained on the given data fingerprint, if one was persisted"""
+        from prophet.serialize import model_from_dict
+
+        product_dir = self._product_dir(model_name, version, product_id)
+        model_path = product_dir / f"{fingerprint}.json"
+        if not model_path.exists():
+            return None
+
+        try:
+            model_dict = json.loads(model_path.read_text())
+            artifact = model_dict.pop('artifact')
+            model_dict['params'] = {}
+            model = model_from_dict(model_dict)
+            model.params = {
+                name: self._load_array(product_dir / f"{fingerprint}.{name}.npy")
+                for name in artifact['params']
+            }
+            return model
+
+        except Exception as e:
+            logger.warning(f"Discarding unreadable model artifact {model_path}: {e}")
+            return None
+
+    def prune(self, versions: Mapping[str, str]) -> int:
+        """Delete artifacts of every version but the given one per model; returns the directories removed"""
+        if not self.root_dir.exists():
+            return 0
+        removed = 0
+        for model_dir in self.root_dir.iterdir():
+            if not model_dir.is_dir():
+                continue
+            for version_dir in model_dir.iterdir():
+                if version_dir.is_dir() and version_dir.name != versions.get(model_dir.name):
+                    shutil.rmtree(version_dir, ignore_errors=True)
+                    removed += 1
+        return removed
+
+    def _load_array(self, path: Path) -> np.ndarray:
+        array = np.load(path, mmap_mode='r')
+        if array.size < self.MMAP_MIN_SIZE:
+            return np.array(array)
+        return array
+
+    def _atomic_write(self, path: Path, write: Any):
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    def save_accuracy(self, records: Dict[str, Dict[str, Any]]):
+        """Persist backtest accuracy records keyed by model name and version"""
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self._atomic_write(
+            self.root_dir / 'accuracy.json',
+            lambda f: f.write(json.dumps(records, default=str).encode())
+        )
+
+    def load_accuracy(self) -> Dict[str, Dict[str, Any]]:
+        """Load persisted backtest accuracy records"""
+        path = self.root_dir / 'accuracy.json'
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text())
+        except Exception as e:
+            logger.warning(f"Discarding unreadable accuracy records {path}: {e}")
+            return {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Report where artifacts live and how many are stored"""
+        artifacts = list(self.root_dir.glob('*/*/*/*.json')) if self.root_dir.exists() else []
+        return {
+            'root_dir': str(self.root_dir),
+            'artifacts': len(artifacts)
+        }
@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+
+from services.forecast_engine import interval_bounds, z_score
+
+def fit_prophet_model(data: pd.DataFrame, init: Optional[Dict[str, Any]] = None) -> Prophet:
+    """Fit a Prophet model on historical sales, optionally warm-started (runs in a worker process)"""
+    model = Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=True,
+        daily_seasonality=False,
+        seasonality_mode='multiplicative'
+    )
+    if init is not None:
+        # Starting the optimizer at the previous fit's optimum needs far fewer iterations
+        model.fit(data, init=init)
+    else:
+        model.fit(data)
+    return model
+
+def warm_start_params(model: Prophet) -> Dict[str, Any]:
+    """A fitted model's parameters in the form accepted by Prophet.fit(init=...)"""
+    params = {name: float(model.params[name][0][0]) for name in ('k', 'm', 'sigma_obs')}
+    for name in ('delta', 'beta'):
+        params[name] = np.asarray(model.params[name][0], dtype=np.float64)
+    return params
+
+def predict_prophet(model: Prophet, periods: int) -> pd.DataFrame:
+    """Predict the next periods days from a fitted model (runs in a worker process)
+
+    Prophet samples its interval at a fixed interval_width. That interval is
+    turned into a normal-equivalent sigma, and the bounds are restated at the
+    default coverage so every model's intervals mean the same thing.
+    """
+    future = model.make_future_dataframe(periods=periods, include_history=False)
+    forecast = model.predict(future)
+    forecast = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].reset_index(drop=True)
+    width = (forecast['yhat_upper'] - forecast['yhat_lower']).to_numpy()
+    forecast['sigma'] = np.maximum(width / (2 * z_score(model.interval_width)), 1e-9)
+    forecast['yhat_lower'], forecast['yhat_upper'] = interval_bounds(
+        forecast['yhat'].to_numpy(), forecast['sigma'].to_numpy()
+    )
+    return forecast
+
+def forecast_prophet(data: pd.DataFrame, periods: int) -> Dict[str, np.ndarray]:
+    """Fit a model and return its daily forecast arrays (runs in a worker process)"""
+    forecast = predict_prophet(fit_prophet_model(data), periods)
+    return {name: forecast[name].to_numpy() for name in ('yhat', 'yhat_lower', 'yhat_upper', 'sigma')}
+
+def backtest_prophet(data: pd.DataFrame, origins: List[int], horizon: int) -> np.ndarray:
+    """Refit Prophet at each origin and return (fold x day) predictions (runs in a worker process)"""
+    predictions = []
+    for origin in origins:
+        model = fit_prophet_model(data.iloc[:origin])
+        predictions.append(predict_prophet(model, horizon)['yhat'].to_numpy())
+    return np.stack(predictions)
@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent / 'sales_store'
+DEFAULT_STORE_ID = 'ALL'
+DEFAULT_START_DATE = '2023-01-01'
+DEFAULT_MAX_DAYS = 2048
+# Days past today a series may hold; later dates are rejected instead of widening the store
+MAX_FUTURE_DAYS = 1
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+SeriesKey = Tuple[str, str]
+
+class HistoricalSalesStore:
+    """Daily sales per (store, product) in one memory-mapped float32 matrix, one row per series
+
+    Rows and day columns both grow by doubling when a new series or a day
+    past the last column arrives, so the store never runs out of dates.
+    Writes and remaps happen under one lock, since request handlers and
+    worker threads share the maps.
+    """
+
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        start_date: DateLike = DEFAULT_START_DATE,
+        max_days: int = DEFAULT_MAX_DAYS,
+        initial_capacity: int = 256
+    ):
+        self.root_dir = Path(root_dir or os.getenv('SALES_STORE_DIR') or DEFAULT_STORE_DIR)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.start_date = pd.Timestamp(start_date).normalize()
+        self.max_days = max_days
+
+        self._lock = threading.Lock()
+        self._values_path = self.root_dir / 'values.f32'
+        self._last_day_path = self.root_dir / 'last_day.i32'
+        self._index_path = self.root_dir / 'index.json'
+        self._grown_path = self._values_path.with_suffix('.grow')
+
+        self.index: Dict[SeriesKey, int] = {}
+        if self._index_path.exists():
+            meta = json.loads(self._index_path.read_text())
+            if meta['start_date'] == self.start_date.isoformat():
+                self.index = {tuple(key): row for row, key in enumerate(meta['keys'])}
+                # The stored width wins; it may have grown past the default
+                self.max_days = meta['max_days']
+            else:
+                logger.warning("Sales store layout changed; rebuilding it")
+        self._recover_growth()
+        self.dates = pd.date_range(start=self.start_date, periods=self.max_days, freq='D')
+
+        self.capacity = max(initial_capacity, len(self.index))
+        self._open(self.capacity, reset=not self.index)
+
+        # A generated dataset is extended with the generator that wrote it, so days after
+        # its end date continue the same series instead of switching to the default mock
+        self.dataset: Optional[Dict[str, Any]] = None
+        manifest_path = self.root_dir / 'manifest.json'
+        if self.index and manifest_path.exists():
+            self.dataset = json.loads(manifest_path.read_text())
+        self._generator = None
+
+    def _open(self, capacity: int, reset: bool = False):
+        """Map the value and last-day files, growing them to hold capacity series"""
+        mode = 'w+' if reset or not self._values_path.exists() else 'r+'
+        if mode == 'r+':
+            for path, itemsize, width in (
+                (self._values_path, 4, self.max_days),
+                (self._last_day_path, 4, 1)
+            ):
+                with open(path, 'r+b') as f:
+                    f.truncate(capacity * width * itemsize)
+
+        self.values = np.memmap(
+            self._values_path, dtype=np.float32, mode=mode, shape=(capacity, self.max_days)
+        )
+        self.last_day = np.memmap(
+            self._last_day_path, dtype=np.int32, mode=mode, shape=(capacity,)
+        )
+        if mode == 'w+':
+            self.last_day[:] = -1
+        self.capacity = capacity
+
+    def _save_index(self):
+        keys = sorted(self.index, key=self.index.get)
+        # Replaced in one step, so a crash never leaves a partly written index
+        staged = self._index_path.with_suffix('.tmp')
+        staged.write_text(json.dumps({
+            'start_date': self.start_date.isoformat(),
+            'max_days': self.max_days,
+            'keys': [list(key) for key in keys]
+        }))
+        os.replace(staged, self._index_path)
+
+    def _recover_growth(self):
+        """Finish or discard a widening of the value file that a crash interrupted"""
+        if not self._grown_path.exists():
+            return
+        # The index records the new width only once the wider file is complete
+        if self.index and self._last_day_path.exists() and (
+            self._grown_path.stat().st_size == self._last_day_path.stat().st_size * self.max_days
+        ):
+            logger.warning("Completing an interrupted sales store widening")
+            os.replace(self._grown_path, self._values_path)
+        else:
+            self._grown_path.unlink()
+
+    def last_closed_day(self) -> pd.Timestamp:
+        """Most recent day whose sales are final; today's live sales are still arriving"""
+        return pd.Timestamp(datetime.now().date()) - pd.Timedelta(days=1)
+
+    def day_index(self, day: DateLike) -> int:
+        """Column of a calendar day in the matrix, widening it for days past the last column"""
+        day = pd.Timestamp(day).normalize()
+        offset = (day - self.start_date).days
+        if offset < 0:
+            raise ValueError(f"{day.date()} is before the sales store start date")
+        if day > pd.Timestamp(datetime.now().date()) + pd.Timedelta(days=MAX_FUTURE_DAYS):
+            raise ValueError(f"{day.date()} is too far in the future for the sales store")
+        if offset >= self.max_days:
+            self._grow_days(offset + 1)
+        return offset
+
+    def _grow_days(self, days: int):
+        """Rewrite the value file with room for at least days columns, doubling like rows do"""
+        with self._lock:
+            if days <= self.max_days:
+                return
+            max_days = self.max_days
+            while max_days < days:
+                max_days *= 2
+
+            # Rows are contiguous, so the wider matrix is written to a new file and swapped in
+            logger.info(f"Widening sales store from {self.max_days} to {max_days} days")
+            self.values.flush()
+            self.last_day.flush()
+            grown = np.memmap(self._grown_path, dtype=np.float32, mode='w+', shape=(self.capacity, max_days))
+            for first in range(0, self.capacity, 4096):
+                grown[first:first + 4096, :self.max_days] = self.values[first:first + 4096]
+            grown.flush()
+            del grown
+
+            # Saving the index commits the new width; _recover_growth completes the swap after a crash
+            self.max_days = max_days
+            self._save_index()
+            os.replace(self._grown_path, self._values_path)
+            self.dates = pd.date_range(start=self.start_date, periods=max_days, freq='D')
+            self._open(self.capacity)
+
+    def _row(self, store_id: str, product_id: str) -> int:
+        key = (store_id, product_id)
+        row = self.index.get(key)
+        if row is not None:
+            return row
+
+        with self._lock:
+            row = self.index.get(key)
+            if row is None:
+                row = len(self.index)
+                if row >= self.capacity:
+                    self.values.flush()
+                    self.last_day.flush()
+                    self._open(self.capacity * 2)
+                self.values[row] = 0
+                self.last_day[row] = -1
+                self.index[key] = row
+                self._save_index()
+        return row
+
+    def write(
+        self,
+        store_id: str,
+        product_id: str,
+        start: DateLike,
+        values: Sequence[float]
+    ):
+        """Write consecutive daily values for a series starting at start"""
+        values = np.asarray(values, dtype=np.float32)
+        if not len(values):
+            return
+        row = self._row(store_id, product_id)
+        first = self.day_index(start)
+        last = self.day_index(self.start_date + pd.Timedelta(days=first + len(values) - 1))
+        with self._lock:
+            self.values[row, first:last + 1] = values
+            self.last_day[row] = max(int(self.last_day[row]), last)
+
+    def append(self, store_id: str, product_id: str, day: DateLike, quantity: float):
+        """Add units sold on one day to a series"""
+        column = self.day_index(day)
+        # Load earlier days first so a live sale does not mark the gap before it as filled
+        if column > 0:
+            self._ensure(store_id, product_id, self.dates[column - 1])
+        row = self._row(store_id, product_id)
+        with self._lock:
+            self.values[row, column] += quantity
+            self.last_day[row] = max(int(self.last_day[row]), column)
+
+    def last_date(self, store_id: str, product_id: str) -> Optional[pd.Timestamp]:
+        """Last day with data for a series, or None if it has none"""
+        row = self.index.get((store_id, product_id))
+        if row is None or self.last_day[row] < 0:
+            return None
+        return self.dates[self.last_day[row]]
+
+    def _ensure(self, store_id: str, product_id: str, end: DateLike):
+        """Backfill a series through end if it is missing days"""
+        row = self._row(store_id, product_id)
+        end_column = self.day_index(end)
+        if self.last_day[row] >= end_column:
+            return
+
+        # Mock backfill - in real implementation, this would load from the sales warehouse
+        first = int(self.last_day[row]) + 1
+        history = self._mock_sales(product_id, self.dates[first:end_column + 1], store_id)
+        with self._lock:
+            # Days filled meanwhile, by live sales or another backfill, are kept
+            filled = int(self.last_day[row]) + 1
+            if filled <= end_column:
+                self.values[row, filled:end_column + 1] = history[filled - first:]
+                self.last_day[row] = end_column
+
+    def _mock_sales(self, product_id: str, dates: pd.DatetimeIndex, store_id: str) -> np.ndarray:
+        """Generate realistic sales data with seasonality"""
+        # Each series has its own seeded stream, so any thread or process sees the same history
+        from services.synthetic_data import SyntheticDataGenerator, get_synthetic_generator, store_ids
+
+        if self.dataset is None:
+            return get_synthetic_generator().sales(
+                product_id, dates, None if store_id == DEFAULT_STORE_ID else store_id
+            )
+
+        if self._generator is None:
+            self._generator = SyntheticDataGenerator(**self.dataset['generator'])
+        if store_id != DEFAULT_STORE_ID:
+            return self._generator.sales(product_id, dates, store_id)
+        # A generated dataset's chain-wide row is the sum of its stores
+        return np.sum(
+            [self._generator.sales(product_id, dates, store) for store in store_ids(self.dataset['stores'])],
+            axis=0
+        )
+
+    def get_series(
+        self,
+        product_id: str,
+        store_id: str = DEFAULT_STORE_ID,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None
+    ) -> np.ndarray:
+        """Zero-copy view of a series' daily sales between start and end (inclusive)"""
+        end = end if end is not None else datetime.now().date()
+        self._ensure(store_id, product_id, end)
+        row = self.index[(store_id, product_id)]
+        first = self.day_index(start) if start is not None else 0
+        return self.values[row, first:self.day_index(end) + 1]
+
+    def get_dates(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> pd.DatetimeIndex:
+        """Calendar days matching get_series for the same start and end"""
+        end = end if end is not None else datetime.now().date()
+        first = self.day_index(start) if start is not None else 0
+        return self.dates[first:self.day_index(end) + 1]
+
+    def get_matrix(
+        self,
+        product_ids: List[str],
+        store_id: str = DEFAULT_STORE_ID,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None
+    ) -> np.ndarray:
+        """Gather several series into a (product x day) matrix"""
+        return self.get_series_matrix(
+            [(store_id, product_id) for product_id in product_ids], start, end
+        )
+
+    def get_series_matrix(
+        self,
+        keys: Sequence[SeriesKey],
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None
+    ) -> np.ndarray:
+        """Gather (store, product) series from any stores into a (series x day) matrix"""
+        end = end if end is not None else datetime.now().date()
+        for store_id, product_id in keys:
+            self._ensure(store_id, product_id, end)
+        rows = [self.index[key] for key in keys]
+        first = self.day_index(start) if start is not None else 0
+        return self.values[rows, first:self.day_index(end) + 1]
+
+    def flush(self):
+        """Write pending changes to disk"""
+        self.values.flush()
+        self.last_day.flush()
+
+_default_store: Optional[HistoricalSalesStore] = None
+
+def get_sales_store() -> HistoricalSalesStore:
+    """Shared sales store for all services in this process"""
+    global _default_store
+    if _default_store is None:
+        _default_store = HistoricalSalesStore()
+    return _default_store
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SIGNALS = ('social', 'weather', 'events')
+DEFAULT_LOCATION = 'national'
+
+def social_adjustment(signal: Dict[str, Any]) -> float:
+    """Calculate adjustment based on social media signals"""
+    return (
+        signal['sentiment'] * 0.3 +
+        signal['trending'] * 0.4 +
+        min(signal['mentions'] / 1000, 1) * 0.3
+    ) * 0.2  # Scale factor
+
+def weather_adjustment(signal: Dict[str, Any]) -> float:
+    """Calculate adjustment based on weather signals"""
+    temp_impact = (signal['temperature'] - 50) / 100  # Normalize temperature
+    humidity_impact = (signal['humidity'] - 50) / 100  # Normalize humidity
+    precip_impact = -signal['precipitation'] / 10  # Negative impact of precipitation
+    return (temp_impact + humidity_impact + precip_impact) / 3 * 0.15
+
+def event_adjustment(signal: Dict[str, Any]) -> float:
+    """Calculate adjustment based on event signals"""
+    return signal['upcoming_events'] * signal['event_impact'] * 0.1
+
+# Relative error of a base forecast before any signal adjustment widens it
+BASE_FORECAST_ERROR = 0.1
+
+def apply_adjustments(
+    base_forecast: Any,
+    social: Any,
+    weather: Any,
+    events: Any,
+    z_score: float = 1.96
+) -> Dict[str, Any]:
+    """Final forecast and interval bounds for base forecasts under signal adjustments
+
+    Works on scalars or broadcastable arrays, so (scenario x SKU) adjustments
+    against a (SKU,) base are evaluated in a single pass. The interval is
+    centred on the adjusted forecast, so it always contains it.
+    """
+    final_forecast = base_forecast * (1 + social + weather + events)
+    uncertainty_factor = 1 + np.abs(social) + np.abs(weather) + np.abs(events)
+    margin_of_error = np.abs(final_forecast) * BASE_FORECAST_ERROR * uncertainty_factor * z_score
+    return {
+        'final_forecast': final_forecast,
+        'lower_bound': np.maximum(0, final_forecast - margin_of_error),
+        'upper_bound': final_forecast + margin_of_error
+    }
+
+def scenario_adjustments(
+    current: Dict[str, np.ndarray],
+    scenarios: List[Dict[str, Any]],
+    n_requested: int,
+    positions: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """(scenario x SKU) adjustments for each signal: overridden, shifted or left at its current value
+
+    A scenario gives each signal as None (keep current), one value for every
+    SKU, or n_requested values aligned with the requested products, of which
+    the SKUs at positions are kept. Relative scenarios add to current values.
+    """
+    matrices = {}
+    for signal in SIGNALS:
+        rows = []
+        for scenario in scenarios:
+            value = scenario.get(signal)
+            if value is None:
+                rows.append(current[signal])
+                continue
+            value = np.asarray(value, dtype=np.float64)
+            if value.ndim > 1 or value.size not in (1, n_requested):
+                raise ValueError(
+                    f"Scenario {scenario['name']}: {signal} needs 1 or {n_requested} values, got {value.size}"
+                )
+            value = value[positions] if value.ndim == 1 and value.size == n_requested else value.reshape(())
+            if scenario.get('relative'):
+                rows.append(current[signal] + value)
+            else:
+                rows.append(np.broadcast_to(value, current[signal].shape))
+        matrices[signal] = np.stack(rows)
+    return matrices
+
+class SignalService:
+    """Fetches external signals in batches, concurrently, behind a TTL and LRU-bounded cache
+
+    Keys already being fetched for another caller are awaited instead of fetched again.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = None,
+        bucket_seconds: float = None,
+        max_batch_size: int = 100,
+        max_entries: int = 100000
+    ):
+        self.ttl_seconds = ttl_seconds or float(os.getenv('SIGNAL_CACHE_TTL', '900'))
+        self.bucket_seconds = bucket_seconds or float(os.getenv('SIGNAL_BUCKET_SECONDS', '3600'))
+        self.max_batch_size = max_batch_size
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, Hashable, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, Hashable, int], asyncio.Task] = {}
+        self._fetchers: Dict[str, Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]] = {
+            'social': self._fetch_social,
+            'weather': self._fetch_weather,
+            'events': self._fetch_events
+        }
+        self.fetch_calls = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_adjustments(
+        self,
+        product_ids: List[str],
+        location: str = DEFAULT_LOCATION
+    ) -> Dict[str, Dict[str, float]]:
+        """Get social, weather and event adjustments for many products at once"""
+        social, weather, events = await asyncio.gather(
+            self.get_signals('social', product_ids),
+            self.get_signals('weather', [location]),
+            self.get_signals('events', [location])
+        )
+        weather_value = weather_adjustment(weather[location])
+        event_value = event_adjustment(events[location])
+
+        return {
+            product_id: {
+                'social': social_adjustment(social[product_id]),
+                'weather': weather_value,
+                'events': event_value
+            }
+            for product_id in product_ids
+        }
+
+    async def get_signals(self, signal: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get raw signal values, fetching only cache misses in batched calls"""
+        bucket = int(time.time() // self.bucket_seconds)
+        now = time.monotonic()
+
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            cache_key = (signal, key, bucket)
+            entry = self._cache.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(cache_key)
+                found[key] = entry[1]
+                self.hits += 1
+            else:
+                missing.append(key)
+                self.misses += 1
+
+        if missing:
+            tasks = set()
+            to_fetch = []
+            for key in missing:
+                task = self._pending.get((signal, key, bucket))
+                if task is None:
+                    to_fetch.append(key)
+                else:
+                    tasks.add(task)
+                    self.coalesced += 1
+            for i in range(0, len(to_fetch), self.max_batch_size):
+                batch = to_fetch[i:i + self.max_batch_size]
+                task = asyncio.ensure_future(self._fetch_batch(signal, batch, bucket))
+                for key in batch:
+                    self._pending[(signal, key, bucket)] = task
+                tasks.add(task)
+
+            # Shielded so one caller giving up does not cancel a fetch others are waiting on
+            wanted = set(missing)
+            for fetched in await asyncio.gather(*(asyncio.shield(task) for task in tasks)):
+                found.update((key, value) for key, value in fetched.items() if key in wanted)
+
+        return found
+
+    async def _fetch_batch(self, signal: str, batch: List[str], bucket: int) -> Dict[str, Dict[str, Any]]:
+        """Fetch one batch upstream and cache its values"""
+        try:
+            fetched = await self._fetchers[signal](batch)
+            self.fetch_calls[signal] += 1
+            expires_at = time.monotonic() + self.ttl_seconds
+            for key, value in fetched.items():
+                self._cache[(signal, key, bucket)] = (expires_at, value)
+                self._cache.move_to_end((signal, key, bucket))
+            self._prune()
+            return fetched
+        finally:
+            for key in batch:
+                self._pending.pop((signal, key, bucket), None)
+
+    def _prune(self):
+        """Drop expired entries, then least recently used ones, once the cache grows past max_entries"""
+        if len(self._cache) <= self.max_entries:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[key]
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _fetch_social(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch social media signals for a batch of products"""
+        # Mock social signals - in real implementation, fetch from social media APIs
+        return {
+            product_id: {
+                'sentiment': np.random.uniform(-0.5, 0.5),
+                'trending': np.random.uniform(0, 1),
+                'mentions': np.random.randint(0, 1000)
+            }
+            for product_id in product_ids
+        }
+
+    async def _fetch_weather(self, locations: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch weather conditions for a batch of locations"""
+        # Mock weather data - in real implementation, fetch from weather APIs
+        return {
+            location: {
+                'temperature': np.random.uniform(0, 100),
+                'humidity': np.random.uniform(0, 100),
+                'precipitation': np.random.uniform(0, 10)
+            }
+            for location in locations
+        }
+
+    async def _fetch_events(self, locations: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch upcoming events for a batch of locations"""
+        # Mock event data - in real implementation, fetch from event calendars
+        return {
+            location: {
+                'upcoming_events': np.random.randint(0, 5),
+                'event_impact': np.random.uniform(-0.3, 0.3)
+            }
+            for location in locations
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache size, hit/miss counters and upstream calls per signal"""
+        return {
+            'size': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'in_flight': len(set(self._pending.values())),
+            'fetch_calls': dict(self.fetch_calls)
+        }
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one in-flight computation"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        cancel_when_abandoned: bool = False
+    ) -> Any:
+        """Await func() for key, sharing the result with callers that arrive while it runs
+
+        The computation normally outlives callers that give up, so its result
+        still lands in caches. With cancel_when_abandoned it is cancelled once
+        every caller waiting on it has been cancelled.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.started += 1
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            self._waiters[future] = 0
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shielded so one caller giving up does not cancel the work for the others
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if cancel_when_abandoned and self._waiters.get(future) == 1 and not future.done():
+                self.abandoned += 1
+                future.cancel()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters[future] -= 1
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        self._waiters.pop(future, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"In-flight computation {key} failed: {future.exception()}")
+
+    def stats(self) -> Dict[str, int]:
+        """Report computations started, callers coalesced onto them, those abandoned and those still running"""
+        return {
+            'started': self.started,
+            'coalesced': self.coalesced,
+            'abandoned': self.abandoned,
+            'in_flight': len(self._inflight)
+        }
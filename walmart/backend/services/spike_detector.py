@@ -0,0 +1,205 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SeriesKey = Tuple[str, str]
+
+class StreamingSpikeDetector:
+    """Online demand-spike detection over sales events, one EWMA state row per (store, product)
+
+    Sales are summed into fixed time buckets. A finished bucket is folded into
+    an exponentially weighted mean and variance, and the bucket in progress is
+    tested against them on every event, so each event costs O(1) whatever the
+    history length. A spike must also exceed the baseline by min_excess units,
+    since slow series expect a fraction of a unit per bucket and one ordinary
+    basket would otherwise sit many standard deviations above it.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: Optional[float] = None,
+        half_life_hours: Optional[float] = None,
+        z_threshold: Optional[float] = None,
+        min_ratio: float = 3.0,
+        min_excess: Optional[float] = None,
+        warmup_buckets: int = 96,
+        initial_capacity: int = 1024,
+        max_spikes: int = 1000
+    ):
+        self.bucket_seconds = bucket_seconds or float(os.getenv('SPIKE_BUCKET_SECONDS', '900'))
+        half_life_hours = half_life_hours or float(os.getenv('SPIKE_HALF_LIFE_HOURS', '24'))
+        self.z_threshold = z_threshold or float(os.getenv('SPIKE_Z_THRESHOLD', '4'))
+        self.min_ratio = min_ratio
+        self.min_excess = min_excess if min_excess is not None else float(os.getenv('SPIKE_MIN_EXCESS', '10'))
+        self.warmup_buckets = warmup_buckets
+        self.alpha = 1 - 0.5 ** (self.bucket_seconds / (half_life_hours * 3600))
+
+        self.index: Dict[SeriesKey, int] = {}
+        self._lock = threading.Lock()
+        self._allocate(initial_capacity)
+        self.spikes: Deque[Dict[str, Any]] = deque(maxlen=max_spikes)
+        self.events = 0
+
+    def _allocate(self, capacity: int):
+        """Create or grow the state arrays to hold capacity series"""
+        old = getattr(self, 'mean', None)
+        arrays = {
+            'mean': np.zeros(capacity),
+            'var': np.zeros(capacity),
+            'buckets': np.zeros(capacity, dtype=np.int64),
+            'bucket': np.full(capacity, -1, dtype=np.int64),
+            'current': np.zeros(capacity),
+            'flagged': np.zeros(capacity, dtype=bool)
+        }
+        if old is not None:
+            for name, array in arrays.items():
+                array[:len(old)] = getattr(self, name)
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def _row(self, key: SeriesKey) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.index)
+            if row >= self.capacity:
+                self._allocate(self.capacity * 2)
+            self.index[key] = row
+        return row
+
+    def __contains__(self, key: SeriesKey) -> bool:
+        return key in self.index
+
+    def prime(self, store_id: str, product_id: str, daily_sales: Iterable[float]):
+        """Start a series from its recent daily sales instead of waiting out the warm-up"""
+        daily = np.asarray(list(daily_sales), dtype=np.float64)
+        if daily.size == 0:
+            return
+        buckets_per_day = 86400 / self.bucket_seconds
+        with self._lock:
+            row = self._row((store_id, product_id))
+            self.mean[row] = daily.mean() / buckets_per_day
+            # Intraday buckets vary at least as much as Poisson counts
+            self.var[row] = max(daily.var() / buckets_per_day, self.mean[row])
+            self.buckets[row] = max(self.buckets[row], self.warmup_buckets)
+
+    def observe(
+        self,
+        store_id: str,
+        product_id: str,
+        quantity: float,
+        timestamp: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Record a sale and return a spike if the bucket in progress is abnormally high"""
+        timestamp = timestamp if timestamp is not None else time.time()
+        bucket = int(timestamp // self.bucket_seconds)
+
+        with self._lock:
+            self.events += 1
+            row = self._row((store_id, product_id))
+            if self.bucket[row] < 0:
+                self.bucket[row] = bucket
+            elif bucket > self.bucket[row]:
+                self._roll(row, bucket)
+            elif bucket < self.bucket[row]:
+                # Late events for a bucket already folded into the averages are not re-scored
+                return None
+
+            self.current[row] += quantity
+            if self.flagged[row] or self.buckets[row] < self.warmup_buckets:
+                return None
+
+            mean = self.mean[row]
+            std = math.sqrt(self.var[row]) or 1.0
+            z_score = (self.current[row] - mean) / std
+            if (
+                z_score < self.z_threshold
+                or self.current[row] < self.min_ratio * max(mean, 1e-9)
+                or self.current[row] - mean < self.min_excess
+            ):
+                return None
+
+            self.flagged[row] = True
+            spike = {
+                'store_id': store_id,
+                'product_id': product_id,
+                'bucket_start': datetime.fromtimestamp(bucket * self.bucket_seconds).isoformat(),
+                'quantity': float(self.current[row]),
+                'expected': float(mean),
+                'z_score': float(z_score),
+                'detected_at': datetime.now().isoformat()
+            }
+            self.spikes.append(spike)
+
+        logger.warning(
+            f"Demand spike for {product_id} at {store_id}: {spike['quantity']:.0f} units "
+            f"vs {spike['expected']:.1f} expected (z={z_score:.1f})"
+        )
+        return spike
+
+    def _roll(self, row: int, bucket: int):
+        """Fold the finished bucket, and any empty buckets since, into the EWMA state"""
+        alpha = self.alpha
+        diff = self.current[row] - self.mean[row]
+        self.mean[row] += alpha * diff
+        self.var[row] = (1 - alpha) * (self.var[row] + alpha * diff ** 2)
+
+        # Closed form for n empty buckets: mean decays by (1 - alpha)^n and the
+        # variance picks up the shrinking mean, without looping over the gap
+        empty = bucket - self.bucket[row] - 1
+        if empty > 0:
+            decay = (1 - alpha) ** empty
+            self.var[row] = decay * (self.var[row] + self.mean[row] ** 2 * (1 - decay))
+            self.mean[row] *= decay
+
+        self.buckets[row] += empty + 1
+        self.bucket[row] = bucket
+        self.current[row] = 0.0
+        self.flagged[row] = False
+
+    def recent_spikes(
+        self,
+        max_age_seconds: float = 86400,
+        product_ids: Optional[Iterable[str]] = None,
+        store_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Spikes detected within max_age_seconds, newest first, optionally filtered"""
+        cutoff = datetime.fromtimestamp(time.time() - max_age_seconds).isoformat()
+        wanted = set(product_ids) if product_ids is not None else None
+        return [
+            spike for spike in reversed(self.spikes)
+            if spike['detected_at'] >= cutoff
+            and (wanted is None or spike['product_id'] in wanted)
+            and (store_id is None or spike['store_id'] == store_id)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Describe the detector state"""
+        return {
+            'series': len(self.index),
+            'capacity': self.capacity,
+            'events': self.events,
+            'spikes': len(self.spikes),
+            'bucket_seconds': self.bucket_seconds,
+            'alpha': self.alpha,
+            'z_threshold': self.z_threshold,
+            'min_excess': self.min_excess
+        }
+
+_default_detector: Optional[StreamingSpikeDetector] = None
+
+def get_spike_detector() -> StreamingSpikeDetector:
+    """Shared spike detector for all services in this process"""
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = StreamingSpikeDetector()
+    return _default_detector
@@ -0,0 +1,357 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.sales_store import DEFAULT_MAX_DAYS, DEFAULT_START_DATE, DEFAULT_STORE_ID
+
+logger = logging.getLogger(__name__)
+
+ORDER_DTYPE = np.dtype([
+    ('store', 'i4'), ('product', 'i4'), ('supplier', 'i4'),
+    ('order_day', 'i4'), ('delivery_day', 'i4'), ('quantity', 'i4')
+])
+PREORDER_DTYPE = np.dtype([
+    ('store', 'i4'), ('product', 'i4'), ('customer', 'i4'),
+    ('created_day', 'i4'), ('available_day', 'i4'), ('quantity', 'i2')
+])
+
+class SyntheticDataGenerator:
+    """Deterministic synthetic retail data with an independent random stream per key
+
+    Every (kind, store, product) key seeds its own numpy Generator from a
+    SeedSequence, so a series is identical whichever thread, process or chunk
+    produces it, and in whatever order.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        start_date: str = DEFAULT_START_DATE,
+        base_sales: float = 100.0,
+        store_sales_range: Tuple[float, float] = (5.0, 25.0),
+        product_spread: float = 0.0,
+        yearly_amplitude: float = 0.3,
+        weekly_amplitude: float = 0.0,
+        trend_per_day: float = 0.001,
+        noise: float = 0.1
+    ):
+        self.seed = seed if seed is not None else int(os.getenv('SYNTHETIC_SEED', '0'))
+        self.start_date = pd.Timestamp(start_date).normalize()
+        self.base_sales = base_sales
+        self.store_sales_range = tuple(store_sales_range)
+        self.product_spread = product_spread
+        self.yearly_amplitude = yearly_amplitude
+        self.weekly_amplitude = weekly_amplitude
+        self.trend_per_day = trend_per_day
+        self.noise = noise
+
+    def config(self) -> Dict[str, Any]:
+        """Constructor arguments, so worker processes can rebuild the same generator"""
+        return {
+            'seed': self.seed,
+            'start_date': self.start_date.date().isoformat(),
+            'base_sales': self.base_sales,
+            'store_sales_range': list(self.store_sales_range),
+            'product_spread': self.product_spread,
+            'yearly_amplitude': self.yearly_amplitude,
+            'weekly_amplitude': self.weekly_amplitude,
+            'trend_per_day': self.trend_per_day,
+            'noise': self.noise
+        }
+
+    def rng(self, kind: str, *key: str) -> np.random.Generator:
+        """The random stream for one key, e.g. rng('sales', store_id, product_id)"""
+        spawn_key = tuple(zlib.crc32(part.encode()) for part in (kind, *key))
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=spawn_key)))
+
+    def _offsets(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        offsets = np.asarray((dates - self.start_date).days)
+        if len(offsets) and offsets.min() < 0:
+            raise ValueError(f"Dates before {self.start_date.date()} are outside the synthetic history")
+        return offsets
+
+    def profile(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        """Shared seasonality and trend multiplier for each date"""
+        offsets = self._offsets(dates)
+        yearly = 1 + self.yearly_amplitude * np.sin(2 * np.pi * dates.dayofyear / 365)
+        weekly = 1 + self.weekly_amplitude * np.sin(2 * np.pi * dates.dayofweek / 7)
+        trend = 1 + self.trend_per_day * offsets
+        return np.asarray(yearly * weekly * trend, dtype=np.float64)
+
+    def store_level(self, store_id: Optional[str]) -> float:
+        """Average daily units of a product in one store, or chain-wide when store_id is None"""
+        if store_id is None:
+            return self.base_sales
+        return float(self.rng('store', store_id).uniform(*self.store_sales_range))
+
+    def product_scale(self, product_id: str) -> float:
+        if not self.product_spread:
+            return 1.0
+        return float(self.rng('product', product_id).lognormal(0, self.product_spread))
+
+    def sales(
+        self,
+        product_id: str,
+        dates: pd.DatetimeIndex,
+        store_id: Optional[str] = None
+    ) -> np.ndarray:
+        """Daily sales for one series; a given date always gets the same value"""
+        return self.series(product_id, store_id, self._offsets(dates), self.profile(dates))
+
+    def series(
+        self,
+        product_id: str,
+        store_id: Optional[str],
+        offsets: np.ndarray,
+        profile: np.ndarray
+    ) -> np.ndarray:
+        """Daily sales for one series at precomputed day offsets and seasonal profile"""
+        stream = self.rng('sales', store_id or '', product_id)
+        # Noise is drawn from the start of the history so values do not depend on the range asked for
+        noise = stream.standard_normal(int(offsets.max()) + 1 if len(offsets) else 0)[offsets]
+
+        level = self.store_level(store_id) * self.product_scale(product_id)
+        sales = level * profile * (1 + self.noise * noise)
+        return np.maximum(sales, 0)  # Ensure non-negative sales
+
+    def orders(
+        self,
+        store_index: int,
+        product_index: int,
+        store_id: str,
+        product_id: str,
+        sales: np.ndarray,
+        n_suppliers: int
+    ) -> np.ndarray:
+        """Weekly replenishment orders covering a series' next week of sales"""
+        stream = self.rng('orders', store_id, product_id)
+        order_days = np.arange(stream.integers(0, 7), len(sales), 7)
+        cumulative = np.concatenate([[0.0], np.cumsum(sales)])
+        week_demand = cumulative[np.minimum(order_days + 7, len(sales))] - cumulative[order_days]
+
+        orders = np.empty(len(order_days), dtype=ORDER_DTYPE)
+        orders['store'] = store_index
+        orders['product'] = product_index
+        orders['supplier'] = zlib.crc32(product_id.encode()) % n_suppliers
+        orders['order_day'] = order_days
+        orders['delivery_day'] = order_days + stream.integers(2, 8, len(order_days))
+        orders['quantity'] = np.ceil(week_demand * stream.uniform(0.9, 1.2, len(order_days)))
+        return orders
+
+    def preorders(
+        self,
+        store_index: int,
+        product_index: int,
+        store_id: str,
+        product_id: str,
+        days: int,
+        daily_rate: float,
+        n_customers: int
+    ) -> np.ndarray:
+        """Customer pre-orders arriving as a Poisson process over the history"""
+        stream = self.rng('preorders', store_id, product_id)
+        count = stream.poisson(daily_rate * days)
+
+        preorders = np.empty(count, dtype=PREORDER_DTYPE)
+        preorders['store'] = store_index
+        preorders['product'] = product_index
+        preorders['customer'] = stream.integers(0, n_customers, count)
+        preorders['created_day'] = np.sort(stream.integers(0, days, count))
+        preorders['available_day'] = preorders['created_day'] + stream.integers(3, 31, count)
+        preorders['quantity'] = stream.integers(1, 4, count)
+        return preorders
+
+def store_ids(n_stores: int) -> List[str]:
+    return [f'STORE_{i:03d}' for i in range(1, n_stores + 1)]
+
+def product_ids(n_products: int) -> List[str]:
+    width = max(3, len(str(n_products - 1)))
+    return [f'PROD_{i:0{width}d}' for i in range(n_products)]
+
+def write_dataset(
+    out_dir: str,
+    n_stores: int,
+    n_products: int,
+    end_date: Optional[str] = None,
+    generator: Optional[SyntheticDataGenerator] = None,
+    chunk_products: int = 100,
+    workers: Optional[int] = None,
+    n_suppliers: int = 50,
+    n_customers: int = 100000,
+    preorder_rate: float = 0.02
+) -> Dict[str, Any]:
+    """Write store x product sales, orders and pre-orders to disk in product chunks
+
+    Sales are laid out as a HistoricalSalesStore directory, one row per store
+    series followed by the chain-wide total, so SALES_STORE_DIR can point
+    straight at the output. Chunks run in parallel and produce the same bytes
+    for any worker count.
+    """
+    generator = generator or SyntheticDataGenerator()
+    root = Path(out_dir)
+    (root / 'orders').mkdir(parents=True, exist_ok=True)
+    (root / 'preorders').mkdir(parents=True, exist_ok=True)
+
+    end = pd.Timestamp(end_date or datetime.now().date()).normalize()
+    days = (end - generator.start_date).days + 1
+    if days <= 0:
+        raise ValueError(f"History must cover at least 1 day, got {days}")
+    # The store widens its day dimension by doubling too, so either can extend the other's files
+    max_days = DEFAULT_MAX_DAYS
+    while max_days < days:
+        max_days *= 2
+
+    stores = store_ids(n_stores)
+    products = product_ids(n_products)
+    n_rows = n_products * (n_stores + 1)
+
+    # Size the memory-mapped files up front; each chunk fills its own rows
+    values = np.memmap(root / 'values.f32', dtype=np.float32, mode='w+', shape=(n_rows, max_days))
+    del values
+    last_day = np.memmap(root / 'last_day.i32', dtype=np.int32, mode='w+', shape=(n_rows,))
+    last_day[:] = days - 1
+    last_day.flush()
+    del last_day
+
+    keys = [[store_id, product_id] for product_id in products for store_id in (*stores, DEFAULT_STORE_ID)]
+    (root / 'index.json').write_text(json.dumps({
+        'start_date': generator.start_date.isoformat(),
+        'max_days': max_days,
+        'keys': keys
+    }))
+
+    chunks = [
+        (generator.config(), str(root), start, min(start + chunk_products, n_products), n_products,
+         n_stores, days, max_days, n_suppliers, n_customers, preorder_rate)
+        for start in range(0, n_products, chunk_products)
+    ]
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        counts = [_write_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            counts = list(executor.map(_write_chunk, *zip(*chunks)))
+
+    manifest = {
+        'generator': generator.config(),
+        'stores': n_stores,
+        'products': n_products,
+        'series': n_rows,
+        'days': days,
+        'end_date': end.date().isoformat(),
+        'orders': sum(count[0] for count in counts),
+        'preorders': sum(count[1] for count in counts),
+        'chunks': len(chunks),
+        'seconds': time.perf_counter() - started
+    }
+    (root / 'manifest.json').write_text(json.dumps(manifest, indent=2))
+    logger.info(
+        f"Wrote {n_rows} series x {days} days, {manifest['orders']} orders and "
+        f"{manifest['preorders']} pre-orders to {root} in {manifest['seconds']:.1f}s"
+    )
+    return manifest
+
+def _write_chunk(
+    config: Dict[str, Any],
+    root: str,
+    product_start: int,
+    product_end: int,
+    n_products: int,
+    n_stores: int,
+    days: int,
+    max_days: int,
+    n_suppliers: int,
+    n_customers: int,
+    preorder_rate: float
+) -> Tuple[int, int]:
+    """Generate one range of products for every store (runs in a worker process)"""
+    generator = SyntheticDataGenerator(**config)
+    root_path = Path(root)
+    dates = pd.date_range(start=generator.start_date, periods=days, freq='D')
+    offsets = np.arange(days)
+    profile = generator.profile(dates)
+    stores = store_ids(n_stores)
+    products = product_ids(n_products)
+
+    rows_per_product = n_stores + 1
+    values = np.memmap(root_path / 'values.f32', dtype=np.float32, mode='r+', shape=(n_products * rows_per_product, max_days))
+    orders, preorders = [], []
+
+    # Rows go straight into the memory map, so a worker holds one series at a time
+    for j in range(product_start, product_end):
+        product_id = products[j]
+        first_row = j * rows_per_product
+        total = np.zeros(days)
+        for i, store_id in enumerate(stores):
+            series = generator.series(product_id, store_id, offsets, profile)
+            values[first_row + i, :days] = series
+            total += series
+            orders.append(generator.orders(i, j, store_id, product_id, series, n_suppliers))
+            preorders.append(generator.preorders(i, j, store_id, product_id, days, preorder_rate, n_customers))
+        # The chain-wide row is the sum of its stores, keeping the hierarchy coherent
+        values[first_row + n_stores, :days] = total
+    values.flush()
+
+    chunk_name = f"chunk-{product_start:08d}.npy"
+    order_array = np.concatenate(orders) if orders else np.empty(0, dtype=ORDER_DTYPE)
+    preorder_array = np.concatenate(preorders) if preorders else np.empty(0, dtype=PREORDER_DTYPE)
+    np.save(root_path / 'orders' / chunk_name, order_array)
+    np.save(root_path / 'preorders' / chunk_name, preorder_array)
+    return len(order_array), len(preorder_array)
+
+_default_generator: Optional[SyntheticDataGenerator] = None
+
+def get_synthetic_generator() -> SyntheticDataGenerator:
+    """Shared generator for mock data in this process"""
+    global _default_generator
+    if _default_generator is None:
+        _default_generator = SyntheticDataGenerator()
+    return _default_generator
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic sales, orders and pre-orders dataset")
+    parser.add_argument('out_dir', help="Output directory (usable as SALES_STORE_DIR)")
+    parser.add_argument('--stores', type=int, default=100)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--end-date', default=None, help="Last day of history (default: today)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-products', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--yearly-amplitude', type=float, default=0.3)
+    parser.add_argument('--weekly-amplitude', type=float, default=0.0)
+    parser.add_argument('--trend-per-day', type=float, default=0.001)
+    parser.add_argument('--noise', type=float, default=0.1)
+    parser.add_argument('--product-spread', type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    generator = SyntheticDataGenerator(
+        seed=args.seed,
+        product_spread=args.product_spread,
+        yearly_amplitude=args.yearly_amplitude,
+        weekly_amplitude=args.weekly_amplitude,
+        trend_per_day=args.trend_per_day,
+        noise=args.noise
+    )
+    manifest = write_dataset(
+        args.out_dir, args.stores, args.products, args.end_date, generator,
+        chunk_products=args.chunk_products, workers=args.workers
+    )
+    print(json.dumps(manifest, indent=2))
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
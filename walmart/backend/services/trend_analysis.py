@@ -0,0 +1,177 @@
+import logging
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+logger = logging.getLogger(__name__)
+
+PERIOD_UNITS = {'d': 1, 'w': 7, 'm': 30, 'y': 365}
+ANOMALY_THRESHOLD = 3.5
+SIGNIFICANCE_LEVEL = 0.05
+SEASONAL_PERIOD = 7
+# Decomposition needs every weekday at least twice
+MIN_WINDOW_DAYS = 2 * SEASONAL_PERIOD
+
+def parse_time_period(time_period: str) -> int:
+    """Days covered by a period such as '30d', '12w', '6m' or '1y'"""
+    match = re.fullmatch(r'\s*(\d+)\s*([dwmy])\s*', time_period.lower())
+    if match is None:
+        raise ValueError(f"Invalid time period: {time_period}")
+    days = int(match.group(1)) * PERIOD_UNITS[match.group(2)]
+    if days < MIN_WINDOW_DAYS:
+        raise ValueError(f"Time period must cover at least {MIN_WINDOW_DAYS} days, got {time_period}")
+    return days
+
+def moving_average(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving average of every row, with edges padded by their nearest values"""
+    half = window // 2
+    padded = np.pad(matrix, ((0, 0), (half, window - 1 - half)), mode='edge')
+    cumsum = np.concatenate([np.zeros((matrix.shape[0], 1)), np.cumsum(padded, axis=1)], axis=1)
+    return (cumsum[:, window:] - cumsum[:, :-window]) / window
+
+def decompose(matrix: np.ndarray, period: int = SEASONAL_PERIOD) -> Dict[str, np.ndarray]:
+    """Additive trend + seasonal + remainder decomposition of every row at once
+
+    A single STL-style pass: the trend is a centered moving average over one
+    season, the seasonal component the mean detrended value at each phase.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n_days = matrix.shape[1]
+    trend = moving_average(matrix, period)
+    detrended = matrix - trend
+
+    phase = np.arange(n_days) % period
+    counts = np.bincount(phase, minlength=period)
+    profile = np.stack([detrended[:, phase == p].sum(axis=1) for p in range(period)], axis=1) / counts
+    profile -= profile.mean(axis=1, keepdims=True)
+    seasonal = profile[:, phase]
+
+    return {'trend': trend, 'seasonal': seasonal, 'remainder': matrix - trend - seasonal}
+
+def trend_tests(series: np.ndarray) -> Dict[str, np.ndarray]:
+    """Least-squares slope of every row against time, with its t statistic and two-sided p-value"""
+    n_days = series.shape[1]
+    t = np.arange(n_days) - (n_days - 1) / 2
+    slope = series @ t / (t @ t)
+    intercept = series.mean(axis=1)
+
+    residuals = series - intercept[:, None] - slope[:, None] * t
+    dof = max(n_days - 2, 1)
+    standard_error = np.sqrt((residuals ** 2).sum(axis=1) / dof / (t @ t))
+    t_stat = np.divide(slope, standard_error, out=np.zeros_like(slope), where=standard_error > 0)
+
+    # Normal approximation to the t distribution, fine for the window lengths used here
+    p_value = 2 * ndtr(-np.abs(t_stat))
+    return {'slope': slope, 't_stat': t_stat, 'p_value': p_value, 'mean': intercept}
+
+def robust_zscores(remainder: np.ndarray) -> np.ndarray:
+    """Per-row z-scores from the median and MAD, so past anomalies do not hide new ones"""
+    median = np.median(remainder, axis=1, keepdims=True)
+    mad = np.median(np.abs(remainder - median), axis=1, keepdims=True) * 1.4826
+    return np.divide(remainder - median, mad, out=np.zeros_like(remainder), where=mad > 0)
+
+def component_strength(component: np.ndarray, remainder: np.ndarray) -> np.ndarray:
+    """Strength of a component in [0, 1]: 1 - Var(remainder) / Var(component + remainder)"""
+    total_variance = np.var(component + remainder, axis=1)
+    ratio = np.divide(np.var(remainder, axis=1), total_variance, out=np.ones_like(total_variance), where=total_variance > 0)
+    return np.clip(1 - ratio, 0, 1)
+
+def seasonal_indices(series: np.ndarray, dates: pd.DatetimeIndex) -> Dict[str, float]:
+    """Peak-to-average ratio of the weekly, monthly and yearly sales profiles"""
+    trend = moving_average(series[None, :], 7)[0]
+    ratio = series / np.maximum(trend, 1e-9)
+
+    indices = {}
+    for name, keys, min_days in (
+        ('weekly', dates.dayofweek, 14),
+        ('monthly', dates.day, 62),
+        ('yearly', dates.month, 730)
+    ):
+        if len(series) < min_days:
+            continue
+        # The yearly profile compares raw monthly levels, since a weekly trend absorbs them
+        values = series if name == 'yearly' else ratio
+        profile = pd.Series(values).groupby(np.asarray(keys)).mean()
+        indices[name] = float(profile.max() / max(profile.mean(), 1e-9))
+    return indices
+
+def analyze_matrix(
+    history: np.ndarray,
+    dates: pd.DatetimeIndex,
+    product_ids: List[str],
+    window_days: int,
+    max_trends: int = 10,
+    max_anomalies: int = 20
+) -> Dict[str, Any]:
+    """Trend, seasonality and anomaly analysis of a (product x day) sales matrix"""
+    history = np.asarray(history, dtype=np.float64)
+    window = history[:, -window_days:]
+    window_dates = dates[-window.shape[1]:]
+
+    components = decompose(window)
+    tests = trend_tests(window - components['seasonal'])
+    trend_strength = component_strength(components['trend'], components['remainder'])
+    seasonal_strength = component_strength(components['seasonal'], components['remainder'])
+    z_scores = robust_zscores(components['remainder'])
+
+    # Overall trend first, then the products with the most significant movement
+    total = window.sum(axis=0, keepdims=True)
+    total_components = decompose(total)
+    total_tests = trend_tests(total - total_components['seasonal'])
+    total_strength = component_strength(total_components['trend'], total_components['remainder'])
+    trends = [_trend_entry('Overall demand', None, total_tests, total_strength, 0, window.shape[1])]
+    for row in np.argsort(-np.abs(tests['t_stat']))[:max_trends]:
+        trends.append(_trend_entry(
+            f'{product_ids[row]} demand', product_ids[row], tests, trend_strength, row, window.shape[1]
+        ))
+
+    rows, days = np.nonzero(np.abs(z_scores) > ANOMALY_THRESHOLD)
+    top = np.argsort(-np.abs(z_scores[rows, days]))[:max_anomalies]
+    anomalies = []
+    for row, day in zip(rows[top], days[top]):
+        z = float(z_scores[row, day])
+        expected = window[row, day] - components['remainder'][row, day]
+        anomalies.append({
+            'date': window_dates[day].isoformat(),
+            'product_id': product_ids[row],
+            'actual': float(window[row, day]),
+            'expected': float(expected),
+            'z_score': z,
+            'severity': float(min(abs(z) / (2 * ANOMALY_THRESHOLD), 1.0)),
+            'description': f"Sales {'above' if z > 0 else 'below'} expected for {product_ids[row]}",
+            'source': 'batch'
+        })
+
+    explained = 1 - np.var(components['remainder'], axis=1) / np.maximum(np.var(window, axis=1), 1e-9)
+    return {
+        'trends': trends,
+        'seasonality': {
+            **seasonal_indices(history.sum(axis=0), dates),
+            'weekly_strength': float(seasonal_strength.mean())
+        },
+        'anomalies': anomalies,
+        'confidence_score': float(np.clip(explained, 0, 1).mean())
+    }
+
+def _trend_entry(
+    name: str,
+    product_id: Any,
+    tests: Dict[str, np.ndarray],
+    strength: np.ndarray,
+    row: int,
+    days: int
+) -> Dict[str, Any]:
+    slope = float(tests['slope'][row])
+    significant = tests['p_value'][row] < SIGNIFICANCE_LEVEL
+    return {
+        'trend_name': name,
+        'product_id': product_id,
+        'direction': ('increasing' if slope > 0 else 'decreasing') if significant else 'stable',
+        'strength': float(strength[row]),
+        'confidence': float(1 - tests['p_value'][row]),
+        'slope_per_day': slope,
+        'relative_change': float(slope * days / max(tests['mean'][row], 1e-9))
+    }
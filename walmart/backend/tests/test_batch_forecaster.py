@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from services.batch_forecaster import HoltWintersState, forecast_batch, holt_winters
+
+def weekly_history(n_skus: int = 5, n_days: int = 120, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    days = np.arange(n_days)
+    season = 10 * np.sin(2 * np.pi * days / 7)
+    return 100 + 0.2 * days + season + rng.normal(0, 3, (n_skus, n_days))
+
+def test_incremental_updates_match_a_full_refit():
+    history = weekly_history()
+    state = HoltWintersState.initialize(history[:, :90])
+    for day in range(90, 120, 7):
+        state.update(history[:, day:day + 7])
+
+    incremental = state.forecast(30)
+    refit = holt_winters(history, 30)
+    np.testing.assert_allclose(incremental['yhat'], refit['yhat'])
+    np.testing.assert_allclose(incremental['sigma'], refit['sigma'])
+
+def test_split_and_concatenated_states_forecast_like_the_batch():
+    state = HoltWintersState.initialize(weekly_history())
+    regrouped = HoltWintersState.concatenate(state.split()[::-1])
+
+    np.testing.assert_allclose(regrouped.forecast(14)['yhat'], state.forecast(14)['yhat'][::-1])
+
+def test_a_level_shift_is_flagged_as_drift():
+    history = weekly_history(n_skus=2)
+    state = HoltWintersState.initialize(history[:, :90])
+    shifted = history[:, 90:97].copy()
+    shifted[1] += 60
+    state.update(shifted)
+
+    assert list(state.drifted) == [False, True]
+
+def test_batch_forecasts_are_clipped_and_bracketed_by_their_intervals():
+    history = np.zeros((2, 60))
+    history[1] = weekly_history(n_skus=1, n_days=60)[0]
+
+    for model in ('ets', 'seasonal_naive'):
+        result = forecast_batch(history, 30, model)
+        assert result['yhat'].shape == (2, 30)
+        assert (result['yhat'] >= 0).all()
+        assert (result['yhat_lower'] <= result['yhat']).all()
+        assert (result['yhat'] <= result['yhat_upper']).all()
+
+def test_too_short_histories_are_rejected():
+    with pytest.raises(ValueError):
+        HoltWintersState.initialize(np.ones((1, 10)))
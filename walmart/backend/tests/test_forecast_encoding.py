@@ -0,0 +1,43 @@
+import json
+import struct
+
+import numpy as np
+import pyarrow as pa
+
+from services.forecast_encoding import (
+    ARROW_MEDIA_TYPE, FLOAT32_MEDIA_TYPE, JSON_MEDIA_TYPE, encode_arrow, encode_float32, negotiate_media_type
+)
+
+PRODUCT_IDS = ['PROD_000', 'PROD_001']
+ARRAYS = {
+    'yhat': np.array([[1.5, 2.5, 3.5], [4.0, 5.0, 6.0]]),
+    'yhat_lower': np.array([[1.0, 2.0, 3.0], [3.5, 4.5, 5.5]]),
+    'yhat_upper': np.array([[2.0, 3.0, 4.0], [4.5, 5.5, 6.5]])
+}
+METADATA = {'model': 'ets', 'model_version': '1.0.0'}
+
+def test_arrow_stream_round_trips_arrays_and_metadata():
+    table = pa.ipc.open_stream(encode_arrow(PRODUCT_IDS, ARRAYS, METADATA)).read_all()
+
+    assert table.column('product_id').to_pylist() == PRODUCT_IDS
+    for name, expected in ARRAYS.items():
+        column = np.array(table.column(name).to_pylist(), dtype=np.float32)
+        np.testing.assert_array_equal(column, expected.astype(np.float32))
+    assert json.loads(table.schema.metadata[b'model_version']) == '1.0.0'
+
+def test_float32_layout_round_trips_arrays_and_header():
+    body = encode_float32(PRODUCT_IDS, ARRAYS, METADATA)
+    (header_length,) = struct.unpack('<I', body[:4])
+    header = json.loads(body[4:4 + header_length])
+    values = np.frombuffer(body[4 + header_length:], dtype='<f4').reshape(len(header['arrays']), *header['shape'])
+
+    assert header['product_ids'] == PRODUCT_IDS
+    assert header['model'] == 'ets'
+    for name, block in zip(header['arrays'], values):
+        np.testing.assert_array_equal(block, ARRAYS[name].astype(np.float32))
+
+def test_media_type_negotiation_honours_quality_and_wildcards():
+    assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+    assert negotiate_media_type(f'{FLOAT32_MEDIA_TYPE};q=0.5, {ARROW_MEDIA_TYPE}') == ARROW_MEDIA_TYPE
+    assert negotiate_media_type('text/html, */*;q=0.1') == JSON_MEDIA_TYPE
+    assert negotiate_media_type('text/html') is None
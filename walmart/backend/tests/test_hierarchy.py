@@ -0,0 +1,47 @@
+import numpy as np
+
+from services.hierarchy import LEVELS, ForecastHierarchy
+
+STORE_REGIONS = {'S1': 'north', 'S2': 'north', 'S3': 'south'}
+PRODUCT_CATEGORIES = {'P1': 'grocery', 'P2': 'grocery', 'P3': 'home'}
+
+def build_hierarchy() -> ForecastHierarchy:
+    leaves = [(store, product) for store in STORE_REGIONS for product in PRODUCT_CATEGORIES]
+    return ForecastHierarchy(leaves, STORE_REGIONS, PRODUCT_CATEGORIES)
+
+def test_aggregation_matches_explicit_group_sums():
+    hierarchy = build_hierarchy()
+    values = np.arange(len(hierarchy.leaves) * 2, dtype=np.float64).reshape(-1, 2)
+
+    region = hierarchy.aggregate('region', values)
+    assert hierarchy.keys['region'] == ['north', 'south']
+    np.testing.assert_allclose(region[0], values[:6].sum(axis=0))
+    np.testing.assert_allclose(region[1], values[6:].sum(axis=0))
+    np.testing.assert_allclose(hierarchy.aggregate('total', values)[0], values.sum(axis=0))
+
+def test_reconciled_levels_are_coherent():
+    hierarchy = build_hierarchy()
+    rng = np.random.default_rng(0)
+    history = rng.uniform(0, 10, (len(hierarchy.leaves), 28))
+    shares = hierarchy.proportions('store', history)
+    store_forecasts = {'yhat': rng.uniform(50, 100, (len(hierarchy.keys['store']), 7))}
+
+    reconciled = hierarchy.reconcile('store', store_forecasts, shares)
+
+    # The fitted level is reproduced, and every level sums up from the same leaves
+    np.testing.assert_allclose(reconciled['store']['yhat'], store_forecasts['yhat'])
+    total = reconciled['total']['yhat'][0]
+    for level in (*LEVELS, 'leaf'):
+        np.testing.assert_allclose(reconciled[level]['yhat'].sum(axis=0), total)
+    np.testing.assert_allclose(
+        hierarchy.aggregate('region', reconciled['leaf']['yhat']), reconciled['region']['yhat']
+    )
+
+def test_groups_without_sales_are_split_evenly():
+    hierarchy = build_hierarchy()
+    history = np.ones((len(hierarchy.leaves), 7))
+    history[:3] = 0
+
+    shares = hierarchy.proportions('store', history)
+    np.testing.assert_allclose(shares[:3], 1 / 3)
+    np.testing.assert_allclose(hierarchy.aggregate('store', shares), 1)
@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from models.forecast_models import JobPriority, JobStatus
+from services.forecast_jobs import FINISHED_STATUSES, ForecastJobRegistry
+from services.job_scheduler import ForecastJobScheduler
+
+class ChunkRunner:
+    """Records the order chunks start in; each chunk runs until it is released"""
+
+    def __init__(self, auto_release: bool = True):
+        self.auto_release = auto_release
+        self.started: List[str] = []
+        self.gates: Dict[str, asyncio.Event] = {}
+        self.cancelled: List[str] = []
+
+    async def __call__(self, forecast_id: str, chunk: List[str], **context):
+        label = chunk[0]
+        self.started.append(label)
+        self.gates[label] = asyncio.Event()
+        if self.auto_release:
+            await asyncio.sleep(0)
+            return
+        try:
+            await self.gates[label].wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(label)
+            raise
+
+def make_scheduler(runner: ChunkRunner, slots: int, reserved_slots: int):
+    registry = ForecastJobRegistry()
+    return registry, ForecastJobScheduler(registry, runner, slots=slots, reserved_slots=reserved_slots)
+
+def submit(
+    registry: ForecastJobRegistry,
+    scheduler: ForecastJobScheduler,
+    name: str,
+    n_chunks: int,
+    priority: JobPriority,
+    tenant_id: str = 'default',
+    deadline: Optional[datetime] = None
+) -> str:
+    chunks = [[f"{name}{i}"] for i in range(1, n_chunks + 1)]
+    job = registry.create(
+        [chunk[0] for chunk in chunks], 'month', 'ets', priority, tenant_id, deadline
+    )
+    scheduler.submit(job, chunks, {})
+    return job.forecast_id
+
+async def wait_finished(registry: ForecastJobRegistry, *forecast_ids: str, timeout: float = 2.0):
+    async def finished():
+        while any(registry.get(forecast_id).status not in FINISHED_STATUSES for forecast_id in forecast_ids):
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(finished(), timeout)
+
+def test_higher_priority_classes_run_first():
+    async def scenario():
+        runner = ChunkRunner()
+        registry, scheduler = make_scheduler(runner, slots=1, reserved_slots=0)
+        batch = submit(registry, scheduler, 'batch', 3, JobPriority.BATCH)
+        replenishment = submit(registry, scheduler, 'repl', 1, JobPriority.REPLENISHMENT)
+        interactive = submit(registry, scheduler, 'ui', 1, JobPriority.INTERACTIVE)
+        await wait_finished(registry, batch, replenishment, interactive)
+        return runner.started, registry.get(batch).status
+
+    started, status = asyncio.run(scenario())
+    # The first batch chunk took the free slot before the others were queued
+    assert started == ['batch1', 'ui1', 'repl1', 'batch2', 'batch3']
+    assert status is JobStatus.COMPLETED
+
+def test_reserved_slot_is_kept_for_interactive_work():
+    async def scenario():
+        runner = ChunkRunner(auto_release=False)
+        registry, scheduler = make_scheduler(runner, slots=2, reserved_slots=1)
+        submit(registry, scheduler, 'batch', 4, JobPriority.BATCH)
+        await asyncio.sleep(0.01)
+        batch_running = list(runner.started)
+        interactive = submit(registry, scheduler, 'ui', 1, JobPriority.INTERACTIVE)
+        await asyncio.sleep(0.01)
+        interactive_started = 'ui1' in runner.started
+        scheduler.shutdown()
+        return batch_running, interactive_started, registry.get(interactive).status
+
+    batch_running, interactive_started, status = asyncio.run(scenario())
+    assert batch_running == ['batch1']
+    assert interactive_started
+    assert status is JobStatus.CANCELLED
+
+def test_tenants_take_turns_within_a_class():
+    async def scenario():
+        runner = ChunkRunner()
+        registry, scheduler = make_scheduler(runner, slots=1, reserved_slots=0)
+        first = submit(registry, scheduler, 'a', 3, JobPriority.BATCH, tenant_id='tenant-a')
+        second = submit(registry, scheduler, 'b', 3, JobPriority.BATCH, tenant_id='tenant-b')
+        await wait_finished(registry, first, second)
+        return runner.started
+
+    assert asyncio.run(scenario()) == ['a1', 'b1', 'a2', 'b2', 'a3', 'b3']
+
+def test_jobs_of_one_tenant_run_earliest_deadline_first():
+    async def scenario():
+        runner = ChunkRunner()
+        registry, scheduler = make_scheduler(runner, slots=1, reserved_slots=0)
+        blocker = submit(registry, scheduler, 'x', 1, JobPriority.BATCH)
+        later = submit(
+            registry, scheduler, 'late', 1, JobPriority.BATCH,
+            deadline=datetime.now() + timedelta(minutes=10)
+        )
+        sooner = submit(
+            registry, scheduler, 'soon', 1, JobPriority.BATCH,
+            deadline=datetime.now() + timedelta(minutes=5)
+        )
+        await wait_finished(registry, blocker, later, sooner)
+        return runner.started
+
+    assert asyncio.run(scenario()) == ['x1', 'soon1', 'late1']
+
+def test_deadline_expires_running_and_queued_jobs():
+    async def scenario():
+        runner = ChunkRunner(auto_release=False)
+        registry, scheduler = make_scheduler(runner, slots=1, reserved_slots=0)
+        deadline = datetime.now() + timedelta(milliseconds=50)
+        running = submit(registry, scheduler, 'run', 2, JobPriority.BATCH, deadline=deadline)
+        queued = submit(registry, scheduler, 'wait', 1, JobPriority.BATCH, tenant_id='other', deadline=deadline)
+        await wait_finished(registry, running, queued)
+        return runner, registry.get(running), registry.get(queued), scheduler.stats()
+
+    runner, running, queued, stats = asyncio.run(scenario())
+    assert running.status is JobStatus.EXPIRED
+    assert queued.status is JobStatus.EXPIRED
+    assert queued.error == "Deadline exceeded"
+    # The running chunk was stopped and nothing else started
+    assert runner.started == ['run1']
+    assert runner.cancelled == ['run1']
+    assert stats['running_chunks'] == 0
+
+def test_cancel_stops_a_job_once():
+    async def scenario():
+        runner = ChunkRunner(auto_release=False)
+        registry, scheduler = make_scheduler(runner, slots=1, reserved_slots=0)
+        job = submit(registry, scheduler, 'job', 3, JobPriority.BATCH)
+        await asyncio.sleep(0.01)
+        first = scheduler.cancel(job)
+        second = scheduler.cancel(job)
+        await asyncio.sleep(0.01)
+        return first, second, registry.get(job).status, runner.started
+
+    first, second, status, started = asyncio.run(scenario())
+    assert (first, second) == (True, False)
+    assert status is JobStatus.CANCELLED
+    assert started == ['job1']
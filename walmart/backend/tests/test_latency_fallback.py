@@ -0,0 +1,54 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from services import forecast_store, sales_store
+from services.forecast_engine import z_score
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    for name in ('FORECAST_STORE_DIR', 'SALES_STORE_DIR', 'MODEL_STORE_DIR'):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+    monkeypatch.setattr(sales_store, '_default_store', None)
+    monkeypatch.setattr(forecast_store, '_default_store', None)
+    from services.forecasting_service import ForecastingService
+
+    forecasting_service = ForecastingService(max_workers=1)
+
+    async def slow_fit(*args, **kwargs):
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(forecasting_service, '_get_fitted_model', slow_fit)
+    return forecasting_service
+
+def assert_interval_matches(lower, upper, yhat, sigma, confidence_level):
+    expected_lower = np.maximum(yhat - z_score(confidence_level) * sigma, 0)
+    np.testing.assert_allclose(lower, expected_lower)
+    np.testing.assert_allclose(upper, yhat + z_score(confidence_level) * sigma)
+    assert (np.asarray(lower) <= yhat).all() and (yhat <= np.asarray(upper)).all()
+
+@pytest.mark.parametrize('confidence_level', [None, 0.8])
+def test_product_fallback_answers_with_intervals_at_the_requested_level(service, confidence_level):
+    forecast = asyncio.run(service.get_product_forecast(
+        'PROD_001', days=30, latency_budget=0.05, confidence_level=confidence_level
+    ))
+
+    assert forecast['source'] == 'fallback'
+    assert forecast['model'] == service.fallback_model
+    assert (forecast['sigma'] > 0).all()
+    assert_interval_matches(
+        forecast['confidence_intervals']['lower'], forecast['confidence_intervals']['upper'],
+        forecast['predictions'], forecast['sigma'], confidence_level or 0.95
+    )
+
+def test_batch_fallback_rows_carry_intervals_and_the_fallback_version(service):
+    result = asyncio.run(service.get_batch_forecasts(
+        ['PROD_001', 'PROD_002'], days=14, model='prophet', latency_budget=0.05, confidence_level=0.9
+    ))
+
+    assert result['sources'] == ['fallback', 'fallback']
+    assert result['fallback_model'] == service.fallback_model
+    assert result['fallback_model_version'] == service.generation.versions[service.fallback_model]
+    assert result['yhat'].shape == (2, 14)
+    assert_interval_matches(result['yhat_lower'], result['yhat_upper'], result['yhat'], result['sigma'], 0.9)
@@ -0,0 +1,11 @@
+from services.model_store import ModelArtifactStore
+
+def test_prune_keeps_only_the_serving_versions(tmp_path):
+    store = ModelArtifactStore(str(tmp_path))
+    for version in ('1.0.0', '1.0.1', '1.0.2'):
+        (tmp_path / 'prophet' / version / 'PROD_001').mkdir(parents=True)
+    store.save_accuracy({})
+
+    assert store.prune({'prophet': '1.0.2'}) == 2
+    assert [path.name for path in (tmp_path / 'prophet').iterdir()] == ['1.0.2']
+    assert (tmp_path / 'accuracy.json').exists()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sales_store import HistoricalSalesStore
+
+def test_days_past_the_last_column_widen_the_store(tmp_path):
+    store = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8, initial_capacity=2)
+    store.write('S1', 'P1', '2024-01-01', np.arange(8))
+    store.append('S1', 'P1', '2024-01-20', 5)
+
+    assert store.max_days == 32
+    assert store.dates[-1] == pd.Timestamp('2024-02-01')
+    assert store.last_date('S1', 'P1') == pd.Timestamp('2024-01-20')
+    series = store.get_series('P1', 'S1', end='2024-01-20')
+    assert list(series[:8]) == list(range(8))
+    assert series[-1] == 5
+
+def test_a_widened_store_reopens_at_its_stored_width(tmp_path):
+    store = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8)
+    store.write('S1', 'P1', '2024-01-10', [3.0])
+    store.flush()
+
+    reopened = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8)
+    assert reopened.max_days == 16
+    assert reopened.get_series('P1', 'S1', '2024-01-10', '2024-01-10')[0] == 3.0
+
+def test_a_write_spanning_the_last_column_widens_the_store(tmp_path):
+    store = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8)
+    store.write('S1', 'P1', '2024-01-06', np.ones(6))
+
+    assert store.max_days == 16
+    assert store.last_date('S1', 'P1') == pd.Timestamp('2024-01-11')
+
+def test_days_too_far_in_the_future_are_rejected(tmp_path):
+    store = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8)
+
+    with pytest.raises(ValueError, match="future"):
+        store.day_index('9999-01-01')
+    assert store.max_days == 8
+
+def test_an_interrupted_widening_is_completed_on_reopen(tmp_path):
+    store = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8, initial_capacity=2)
+    store.write('S1', 'P1', '2024-01-01', np.arange(8))
+    store.flush()
+
+    # Crash after the index committed the new width but before the file swap
+    grown = np.memmap(tmp_path / 'values.grow', dtype=np.float32, mode='w+', shape=(2, 16))
+    grown[:, :8] = store.values
+    grown.flush()
+    del grown
+    store.max_days = 16
+    store._save_index()
+
+    reopened = HistoricalSalesStore(str(tmp_path), start_date='2024-01-01', max_days=8)
+    assert reopened.max_days == 16
+    assert not (tmp_path / 'values.grow').exists()
+    assert list(reopened.get_series('P1', 'S1', end='2024-01-08')) == list(range(8))
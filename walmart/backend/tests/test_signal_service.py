@@ -0,0 +1,60 @@
+import asyncio
+
+from services.signal_service import SignalService
+
+def counting_service(**kwargs) -> SignalService:
+    service = SignalService(**kwargs)
+    fetched = []
+
+    async def fetch(keys):
+        fetched.append(list(keys))
+        await asyncio.sleep(0.01)
+        return {key: {'value': key} for key in keys}
+
+    service._fetchers['social'] = fetch
+    service.fetched = fetched
+    return service
+
+def test_cached_signals_are_reused_until_they_expire():
+    async def scenario():
+        service = counting_service(ttl_seconds=0.05)
+        await service.get_signals('social', ['a', 'b'])
+        await service.get_signals('social', ['a', 'b'])
+        cached = len(service.fetched)
+        await asyncio.sleep(0.06)
+        await service.get_signals('social', ['a'])
+        return cached, service
+
+    cached, service = asyncio.run(scenario())
+    assert cached == 1
+    assert service.fetched == [['a', 'b'], ['a']]
+    assert service.stats()['hits'] == 2
+
+def test_least_recently_used_entries_are_evicted_past_max_entries():
+    async def scenario():
+        service = counting_service(ttl_seconds=3600, max_entries=2)
+        await service.get_signals('social', ['a', 'b'])
+        await service.get_signals('social', ['a'])
+        await service.get_signals('social', ['c'])
+        await service.get_signals('social', ['a', 'b'])
+        return service
+
+    service = asyncio.run(scenario())
+    assert service.stats()['size'] == 2
+    # 'b' was least recently used when 'c' arrived, so only it is fetched again
+    assert service.fetched == [['a', 'b'], ['c'], ['b']]
+
+def test_concurrent_requests_for_the_same_keys_share_one_fetch():
+    async def scenario():
+        service = counting_service()
+        results = await asyncio.gather(
+            service.get_signals('social', ['a', 'b']),
+            service.get_signals('social', ['b', 'c'])
+        )
+        return results, service
+
+    (first, second), service = asyncio.run(scenario())
+    assert service.fetched == [['a', 'b'], ['c']]
+    assert set(first) == {'a', 'b'} and set(second) == {'b', 'c'}
+    assert service.stats()['coalesced'] == 1
+    assert service.stats()['in_flight'] == 0
@@ -0,0 +1,55 @@
+import asyncio
+
+from services.single_flight import SingleFlight
+
+def test_work_outlives_a_caller_that_gives_up():
+    async def scenario():
+        flight = SingleFlight()
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            finished.set()
+            return 42
+
+        try:
+            await asyncio.wait_for(flight.do('key', work), 0.001)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.wait_for(finished.wait(), 1)
+        return flight.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['abandoned'] == 0
+    assert stats['in_flight'] == 0
+
+def test_abandoned_background_work_is_cancelled_once_every_caller_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [
+            asyncio.ensure_future(flight.do('key', work, cancel_when_abandoned=True))
+            for _ in range(2)
+        ]
+        await started.wait()
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        still_running = not cancelled.is_set()
+        callers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return still_running, flight.stats()
+
+    still_running, stats = asyncio.run(scenario())
+    assert still_running
+    assert stats['coalesced'] == 1
+    assert stats['abandoned'] == 1
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from services.spike_detector import StreamingSpikeDetector
+
+BUCKET = 900
+
+def detector(**kwargs) -> StreamingSpikeDetector:
+    params = {'bucket_seconds': BUCKET, 'half_life_hours': 1, 'z_threshold': 4, 'min_excess': 10, 'warmup_buckets': 4}
+    return StreamingSpikeDetector(**{**params, **kwargs})
+
+def test_empty_buckets_decay_the_baseline_like_zero_sales():
+    skipped, stepped = detector(), detector()
+    for spike_detector in (skipped, stepped):
+        spike_detector.observe('S1', 'P1', 5, 0)
+    skipped.observe('S1', 'P1', 1, 10 * BUCKET)
+    for bucket in range(1, 10):
+        stepped.observe('S1', 'P1', 0, bucket * BUCKET)
+    stepped.observe('S1', 'P1', 1, 10 * BUCKET)
+
+    assert skipped.mean[0] == pytest.approx(stepped.mean[0])
+    assert skipped.var[0] == pytest.approx(stepped.var[0])
+
+def test_ewma_tracks_a_steady_rate():
+    spike_detector = detector()
+    for bucket in range(200):
+        spike_detector.observe('S1', 'P1', 4, bucket * BUCKET)
+
+    assert spike_detector.mean[0] == pytest.approx(4, rel=1e-3)
+    assert spike_detector.var[0] == pytest.approx(0, abs=1e-3)
+
+def test_a_burst_is_flagged_once_per_bucket():
+    spike_detector = detector()
+    spike_detector.prime('S1', 'P1', np.full(28, 96.0))  # one unit per bucket
+
+    assert spike_detector.observe('S1', 'P1', 5, 0) is None
+    spike = spike_detector.observe('S1', 'P1', 20, 60)
+    assert spike is not None and spike['quantity'] == 25
+    assert spike_detector.observe('S1', 'P1', 20, 120) is None
+    assert len(spike_detector.recent_spikes()) == 1
+
+def test_small_absolute_increases_are_not_spikes():
+    spike_detector = detector()
+    spike_detector.prime('S1', 'P1', np.full(28, 1.0))
+
+    assert spike_detector.observe('S1', 'P1', 3, 0) is None
+
+def test_series_are_not_scored_during_warm_up():
+    spike_detector = detector(warmup_buckets=96)
+    spike_detector.observe('S1', 'P1', 1, 0)
+
+    assert spike_detector.observe('S1', 'P1', 500, BUCKET) is None
+
+def test_late_events_are_not_rescored_or_added_to_the_current_bucket():
+    spike_detector = detector()
+    spike_detector.prime('S1', 'P1', np.full(28, 96.0))
+    spike_detector.observe('S1', 'P1', 1, 5 * BUCKET)
+    mean = spike_detector.mean[0]
+
+    assert spike_detector.observe('S1', 'P1', 500, 2 * BUCKET) is None
+    assert spike_detector.current[0] == 1
+    assert spike_detector.mean[0] == mean
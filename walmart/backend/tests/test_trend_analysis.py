@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from services.trend_analysis import MIN_WINDOW_DAYS, parse_time_period, trend_tests
+
+def test_time_periods_parse_to_days():
+    assert parse_time_period('30d') == 30
+    assert parse_time_period('2w') == 14
+    assert parse_time_period(' 1Y ') == 365
+
+@pytest.mark.parametrize('time_period', ['0d', '1d', f'{MIN_WINDOW_DAYS - 1}d', '1w'])
+def test_windows_shorter_than_two_seasons_are_rejected(time_period):
+    with pytest.raises(ValueError, match="at least"):
+        parse_time_period(time_period)
+
+def test_trend_tests_flag_a_steady_rise_and_not_noise():
+    rng = np.random.default_rng(0)
+    rising = 100 + 2 * np.arange(60) + rng.normal(0, 1, 60)
+    flat = 100 + rng.normal(0, 1, 60)
+
+    tests = trend_tests(np.stack([rising, flat]))
+    assert tests['slope'][0] == pytest.approx(2, abs=0.1)
+    assert tests['p_value'][0] < 1e-6
+    assert tests['p_value'][1] > 0.01